@@ -10,7 +10,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 # Importer les modèles et la configuration
 from app.config.database import Base
 from app.config.settings import settings
-from app.models import *  # Import de tous les modèles
+# app/models n'a pas de __init__.py : chaque module de modèles est importé explicitement
+from app.models.category import Category  # noqa: F401
+from app.models.task import Task  # noqa: F401
+from app.models.task_stats import TaskStat  # noqa: F401
 
 # Configuration d'Alembic
 config = context.config
@@ -25,6 +28,15 @@ if config.config_file_name is not None:
 # Métadonnées pour l'autogénération
 target_metadata = Base.metadata
 
+# Objets créés par DDL brut (recherche plein texte), inconnus des métadonnées
+FULL_TEXT_OBJECTS = {"tasks_fts", "search_vector", "ix_tasks_search_vector"}
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Ignorer les objets plein texte lors de l'autogénération"""
+    if name in FULL_TEXT_OBJECTS or (type_ == "table" and name.startswith("tasks_fts_")):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Exécuter les migrations en mode 'offline'."""
     url = config.get_main_option("sqlalchemy.url")
@@ -35,6 +47,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -42,6 +55,12 @@ def run_migrations_offline() -> None:
 
 def run_migrations_online() -> None:
     """Exécuter les migrations en mode 'online'."""
+    # Connexion fournie par l'appelant (tests, scripts) via config.attributes
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
@@ -49,15 +68,21 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, 
-            target_metadata=target_metadata,
-            compare_type=True,
-            compare_server_default=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        run_migrations(connection)
+
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection, 
+        target_metadata=target_metadata,
+        compare_type=True,
+        compare_server_default=True,
+        include_object=include_object,
+        # Une transaction par migration : certaines valident leurs lots en autocommit
+        transaction_per_migration=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,65 @@
+"""Fold accents in PostgreSQL full-text search
+
+Revision ID: 0b8d3e5f9a21
+Revises: a2e6c9d4b8f3
+Create Date: 2026-10-18 14:05:51.902733
+
+La colonne search_vector utilisait la configuration "simple", qui conserve
+les accents : "tache" ne trouvait pas "Tâche" sous PostgreSQL alors que FTS5
+(remove_diacritics 2) la trouve sous SQLite. La colonne générée est recréée
+avec la configuration simple_unaccent (extension unaccent). SQLite : rien à
+faire.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b8d3e5f9a21"
+down_revision: Union[str, None] = "a2e6c9d4b8f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _search_vector(config: str) -> list:
+    """Recréer la colonne générée et son index GIN avec une configuration text search"""
+    return [
+        "DROP INDEX IF EXISTS ix_tasks_search_vector",
+        "ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector",
+        "ALTER TABLE tasks ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector('{config}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{config}', coalesce(description, '')), 'B')"
+        ") STORED",
+        "CREATE INDEX ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+    ]
+
+
+# Copie figée de app.models.task.FULL_TEXT_DDL au moment de la migration
+POSTGRESQL_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "DO $$ BEGIN "
+    "IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'simple_unaccent') THEN "
+    "CREATE TEXT SEARCH CONFIGURATION simple_unaccent (COPY = simple); "
+    "ALTER TEXT SEARCH CONFIGURATION simple_unaccent "
+    "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple; "
+    "END IF; END $$",
+    *_search_vector("simple_unaccent"),
+]
+POSTGRESQL_DOWNGRADE = [
+    *_search_vector("simple"),
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS simple_unaccent",
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in POSTGRESQL_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for statement in POSTGRESQL_DOWNGRADE:
+            op.execute(statement)
@@ -0,0 +1,36 @@
+"""Add denormalized tasks_count to categories
+
+Revision ID: a2e6c9d4b8f3
+Revises: f1c7d2e8a4b6
+Create Date: 2026-10-18 11:20:42.615390
+
+Le nombre de tâches par catégorie est maintenu par TaskService (création,
+suppression, changement de catégorie) ; scripts/category_counts.py le vérifie
+et le recalcule.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2e6c9d4b8f3"
+down_revision: Union[str, None] = "f1c7d2e8a4b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "categories",
+        sa.Column("tasks_count", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.execute(
+        "UPDATE categories SET tasks_count = "
+        "(SELECT count(*) FROM tasks WHERE tasks.category_id = categories.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("categories", "tasks_count")
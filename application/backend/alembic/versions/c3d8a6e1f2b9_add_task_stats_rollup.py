@@ -0,0 +1,35 @@
+"""Add task_stats rollup table
+
+Revision ID: c3d8a6e1f2b9
+Revises: b7e2c91d4f05
+Create Date: 2026-10-18 09:14:02.771904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d8a6e1f2b9"
+down_revision: Union[str, None] = "b7e2c91d4f05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Table vide : elle est construite au démarrage de l'application (ensure_built,
+    # ligne témoin "meta/initialized") ou par scripts/task_stats.py rebuild ;
+    # d'ici là, les lectures recalculent les compteurs sans rien écrire
+    op.create_table(
+        "task_stats",
+        sa.Column("dimension", sa.String(length=20), nullable=False),
+        sa.Column("key", sa.String(length=20), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("dimension", "key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("task_stats")
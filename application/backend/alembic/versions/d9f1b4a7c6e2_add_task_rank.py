@@ -0,0 +1,96 @@
+"""Add task rank
+
+Revision ID: d9f1b4a7c6e2
+Revises: c3d8a6e1f2b9
+Create Date: 2026-10-18 09:15:27.143518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9f1b4a7c6e2"
+down_revision: Union[str, None] = "c3d8a6e1f2b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Copie figée de app.core.ranking (spread_step, spread_key) au moment de la migration
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+KEY_WIDTH = 6
+SPREAD_SPACE = BASE ** KEY_WIDTH // 2
+
+
+def spread_step(count: int) -> int:
+    """Écart entre deux clés lorsque `count` clés sont réparties uniformément"""
+    step = SPREAD_SPACE // (count + 1)
+    if step < 1:
+        raise ValueError(f"Trop de clés à répartir : {count}")
+    return step
+
+
+def spread_key(index: int, step: int) -> str:
+    """Clé de rang `index` (à partir de 0) : KEY_WIDTH chiffres au plus, sans zéros terminaux"""
+    value, chars = step * (index + 1), []
+    for _ in range(KEY_WIDTH):
+        value, digit = divmod(value, BASE)
+        chars.append(DIGITS[digit])
+    return "".join(reversed(chars)).rstrip(DIGITS[0])
+
+
+# Tâches par lot, dans l'ordre du drag & drop : positions renseignées par
+# (position, id), puis positions NULL par id
+NEXT_POSITIONED = sa.text(
+    "SELECT id, position FROM tasks WHERE position IS NOT NULL "
+    "AND (position > :position OR (position = :position AND id > :id)) "
+    "ORDER BY position, id LIMIT :limit"
+)
+NEXT_UNPOSITIONED = sa.text(
+    "SELECT id FROM tasks WHERE position IS NULL AND id > :id ORDER BY id LIMIT :limit"
+)
+
+
+def upgrade() -> None:
+    # Colonne nullable sans défaut : ajout instantané, même sur une grande table
+    op.add_column("tasks", sa.Column("rank", sa.String(length=128), nullable=True))
+
+    # Rangs initiaux dans l'ordre actuel du drag & drop ; en mode --sql, ils
+    # seront attribués par le premier rééquilibrage
+    if op.get_context().as_sql:
+        return
+
+    # Lots validés un par un (autocommit) : aucune transaction ne verrouille
+    # toute la table, la mémoire ne dépend pas du nombre de tâches. Les tâches
+    # créées pendant la migration au-delà du décompte initial restent sans
+    # rang (placées par rebalance_ranks).
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        count = bind.execute(sa.text("SELECT count(*) FROM tasks")).scalar()
+        if not count:
+            return
+        step = spread_step(count)
+        first_position = bind.execute(sa.text("SELECT min(position) FROM tasks")).scalar()
+        index = 0
+        for statement, cursor in (
+            (NEXT_POSITIONED, {"position": (first_position or 0) - 1, "id": 0}),
+            (NEXT_UNPOSITIONED, {"id": 0}),
+        ):
+            while index < count:
+                rows = bind.execute(statement, {**cursor, "limit": min(BATCH_SIZE, count - index)}).all()
+                if not rows:
+                    break
+                bind.execute(
+                    sa.text("UPDATE tasks SET rank = :rank WHERE id = :id"),
+                    [{"id": row.id, "rank": spread_key(index + offset, step)} for offset, row in enumerate(rows)]
+                )
+                index += len(rows)
+                cursor = {key: getattr(rows[-1], key) for key in cursor}
+
+
+def downgrade() -> None:
+    op.drop_column("tasks", "rank")
@@ -0,0 +1,68 @@
+"""Add indexes for the hot task and category queries
+
+Revision ID: e5a2c8f3b1d7
+Revises: d9f1b4a7c6e2
+Create Date: 2026-10-18 09:17:51.902466
+
+Sur PostgreSQL, les index sont construits avec CREATE INDEX CONCURRENTLY, hors
+transaction : la table reste accessible en écriture pendant la construction.
+Un index interrompu reste INVALID ; relancer la migration le reconstruit
+(DROP INDEX IF EXISTS préalable).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a2c8f3b1d7"
+down_revision: Union[str, None] = "d9f1b4a7c6e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_TASK = sa.text("status != 'TERMINEE'")
+
+# (nom, table, colonnes, options)
+INDEXES = [
+    # Tâches en retard / urgentes : WHERE status != ... AND due_date < ...
+    ("ix_tasks_status_due_date", "tasks", ["status", "due_date"], {}),
+    # Tâches ouvertes par échéance (index partiel, plus petit)
+    ("ix_tasks_open_due_date", "tasks", ["due_date"], {"postgresql_where": OPEN_TASK, "sqlite_where": OPEN_TASK}),
+    # Vue tableau : une colonne par catégorie, triée par position
+    ("ix_tasks_category_id_position", "tasks", ["category_id", "position"], {}),
+    # Prochaine position (MAX) et ordre du drag & drop par rang
+    ("ix_tasks_position", "tasks", ["position"], {}),
+    ("ix_tasks_rank", "tasks", ["rank"], {}),
+    # Tâches terminées aujourd'hui
+    ("ix_tasks_completed_at", "tasks", ["completed_at"], {}),
+    # CategoryRepository.get_by_name / name_exists : lower(name) = lower(:name)
+    ("ix_categories_lower_name", "categories", [sa.text("lower(name)")], {}),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if not _is_postgresql():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, **options)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    if not _is_postgresql():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""Drop the urgent counter from task_stats
+
+Revision ID: f1c7d2e8a4b6
+Revises: e5a2c8f3b1d7
+Create Date: 2026-10-18 10:02:13.480127
+
+L'urgence dépend de l'heure courante (Task.is_urgent) : elle est comptée en SQL
+à chaque calcul des statistiques et ne fait plus partie de la table de synthèse.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c7d2e8a4b6"
+down_revision: Union[str, None] = "e5a2c8f3b1d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DELETE FROM task_stats WHERE dimension = 'urgent'")
+
+
+def downgrade() -> None:
+    # Sans la ligne témoin, la table est reconstruite (compteur urgent compris) au
+    # prochain démarrage de l'application (ensure_built) ou par scripts/task_stats.py rebuild
+    op.execute("DELETE FROM task_stats WHERE dimension = 'meta'")
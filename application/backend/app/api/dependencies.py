@@ -1,7 +1,11 @@
-from fastapi import Depends
+from typing import Optional, Sequence, Tuple
+from fastapi import Depends, Query
 from sqlalchemy.orm import Session
 from app.config.database import get_db
+from app.core.exceptions import ValidationException
+from app.schemas.category import CATEGORY_FIELDS
 from app.schemas.task import TaskFilter, TaskSort
+from app.schemas.task_rows import TASK_FIELDS, TaskFieldSet
 from app.config.settings import settings
 
 def get_task_filters(
@@ -31,12 +35,73 @@ def get_task_sort(
 
 def get_pagination_params(
     page: int = 1,
-    size: int = settings.DEFAULT_PAGE_SIZE
+    size: int = settings.DEFAULT_PAGE_SIZE,
+    mode: str = "offset",
+    cursor: str = None,
+    with_total: bool = False
 ):
-    """Dépendance pour les paramètres de pagination"""
+    """
+    Dépendance pour les paramètres de pagination.
+    
+    Le mode "cursor" (implicite dès qu'un curseur est fourni) active la
+    pagination keyset : la page suivante est demandée avec `cursor=next_cursor`.
+    En mode curseur, total et pages ne sont calculés qu'avec with_total=true
+    (COUNT sur toutes les tâches filtrées).
+    """
     if page < 1:
         page = 1
     if size < 1 or size > settings.MAX_PAGE_SIZE:
         size = settings.DEFAULT_PAGE_SIZE
+    if cursor:
+        mode = "cursor"
+    if mode not in ("offset", "cursor"):
+        mode = "offset"
     
-    return {"page": page, "size": size}
\ No newline at end of file
+    return {"page": page, "size": size, "mode": mode, "cursor": cursor or None, "with_total": with_total}
+
+def _parse_list(value: str, allowed: Sequence[str], parameter: str) -> Tuple[str, ...]:
+    """Liste séparée par des virgules, sans doublons, limitée aux valeurs autorisées"""
+    items = tuple(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise ValidationException(
+            f"Valeurs inconnues pour {parameter} : {', '.join(unknown)} "
+            f"(valeurs possibles : {', '.join(allowed)})",
+            code="INVALID_FIELDS"
+        )
+    return items
+
+def get_task_fieldset(
+    fields: Optional[str] = Query(
+        None, description="Champs à renvoyer, séparés par des virgules (ex. id,title,priority)"
+    ),
+    include: Optional[str] = Query(
+        None, description="Relations incluses : category (par défaut sans fields, sinon aucune)"
+    )
+) -> Optional[TaskFieldSet]:
+    """
+    Dépendance pour les champs partiels (sparse fieldsets).
+    
+    None : réponse complète. Sinon, seuls les champs demandés sont lus et
+    renvoyés ; la catégorie n'est jointe que si include=category.
+    """
+    if fields is None and include is None:
+        return None
+    selected = _parse_list(fields, TASK_FIELDS, "fields") if fields is not None else TASK_FIELDS
+    includes = _parse_list(include, ("category",), "include") if include is not None else ()
+    if not selected:
+        raise ValidationException("Le paramètre fields ne peut pas être vide", code="INVALID_FIELDS")
+    return TaskFieldSet(selected, include_category="category" in includes)
+
+def get_category_fields(
+    fields: Optional[str] = Query(
+        None, description="Champs à renvoyer, séparés par des virgules (ex. id,name,color)"
+    )
+) -> Optional[Tuple[str, ...]]:
+    """Dépendance pour les champs partiels des catégories (None : réponse complète)"""
+    if fields is None:
+        return None
+    selected = _parse_list(fields, CATEGORY_FIELDS, "fields")
+    if not selected:
+        raise ValidationException("Le paramètre fields ne peut pas être vide", code="INVALID_FIELDS")
+    return selected
\ No newline at end of file
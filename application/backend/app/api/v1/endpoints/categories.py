@@ -1,45 +1,60 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Request, Response, status
 
-from app.config.database import get_db
+from app.config.database import DbSession, get_session
+from app.api.dependencies import get_category_fields
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.schemas.common import MessageResponse
-from app.services.category_service import category_service
+from app.services.category_service import async_category_service
+from app.core.etag import etag_headers, etag_matches, not_modified, request_variant, set_etag
+from app.core.responses import FastJSONResponse
 from app.core.exceptions import TodoException
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 @router.get("/", response_model=List[CategoryResponse], summary="Liste des catégories")
-def get_categories(db: Session = Depends(get_db)):
-    return category_service.get_all_categories(db)
+async def get_categories(
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_session),
+    fields: Optional[Tuple[str, ...]] = Depends(get_category_fields)
+):
+    etag = await async_category_service.get_etag(db, "categories", request_variant(request))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    if fields is not None:
+        # Champs partiels : éléments réduits, sans validation response_model
+        categories = await async_category_service.get_category_fields(db, fields, etag)
+        return FastJSONResponse(categories, headers=etag_headers(etag))
+    set_etag(response, etag)
+    return await async_category_service.get_all_categories(db, etag)
 
 @router.get("/{category_id}", response_model=CategoryResponse, summary="Détails d'une catégorie")
-def get_category(category_id: int, db: Session = Depends(get_db)):
-    return category_service.get_category_by_id(db, category_id)
+async def get_category(category_id: int, db: DbSession = Depends(get_session)):
+    return await async_category_service.get_category_by_id(db, category_id)
 
 @router.post("/", 
     response_model=CategoryResponse, 
     status_code=status.HTTP_201_CREATED,
     summary="Créer une catégorie"
 )
-def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
-    return category_service.create_category(db, category)
+async def create_category(category: CategoryCreate, db: DbSession = Depends(get_session)):
+    return await async_category_service.create_category(db, category)
 
 @router.put("/{category_id}", response_model=CategoryResponse, summary="Modifier une catégorie")
-def update_category(
+async def update_category(
     category_id: int, 
     category: CategoryUpdate, 
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    return category_service.update_category(db, category_id, category)
+    return await async_category_service.update_category(db, category_id, category)
 
 @router.delete("/{category_id}", 
     response_model=MessageResponse,
     summary="Supprimer une catégorie"
 )
-def delete_category(category_id: int, db: Session = Depends(get_db)):
-    success = category_service.delete_category(db, category_id)
+async def delete_category(category_id: int, db: DbSession = Depends(get_session)):
+    success = await async_category_service.delete_category(db, category_id)
     return MessageResponse(
         message=f"Catégorie {category_id} supprimée avec succès",
         success=success
@@ -1,15 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
-from app.config.database import get_db
-from app.api.dependencies import get_task_filters, get_task_sort, get_pagination_params
+from app.config.database import DbSession, get_session
+from app.api.dependencies import get_task_filters, get_task_sort, get_pagination_params, get_task_fieldset
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskResponse, TaskBulkUpdate, 
-    TaskStatistics, TaskFilter, TaskSort
+    TaskStatistics, TaskFilter, TaskSort, TaskBulkCreate, TaskBulkCreateResponse, TaskMove,
+    TaskImportReport
 )
 from app.schemas.common import PaginatedResponse, MessageResponse
-from app.services.task_service import task_service
+from app.schemas.task_rows import TaskFieldSet
+from app.services.task_service import (
+    RANK_REBALANCE_PENDING, async_task_service, needs_rank_rebalance, rebalance_ranks_job
+)
+from app.services.task_export import EXPORT_MEDIA_TYPES, task_exporter
+from app.services.task_import import async_task_importer, task_importer
+from app.core.exceptions import ConflictException
+from app.core.etag import etag_headers, etag_matches, not_modified, request_variant, set_etag
+from app.core.responses import FastJSONResponse, accepts_gzip
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -17,44 +27,127 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
     response_model=PaginatedResponse[TaskResponse],
     summary="Liste toutes les tâches"
 )
-def get_tasks(
-    db: Session = Depends(get_db),
+async def get_tasks(
+    request: Request,
+    db: DbSession = Depends(get_session),
     filters: TaskFilter = Depends(get_task_filters),
     sort: TaskSort = Depends(get_task_sort),
-    pagination = Depends(get_pagination_params)
+    pagination = Depends(get_pagination_params),
+    fieldset: Optional[TaskFieldSet] = Depends(get_task_fieldset)
 ):
-    return task_service.get_tasks_paginated(
-        db, filters, sort, pagination["page"], pagination["size"]
-    )
+    etag = await async_task_service.get_etag(db, "tasks", request_variant(request))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    # Lecture sans ORM, sérialisée par orjson (pas de validation response_model)
+    if pagination["mode"] == "cursor":
+        page = await async_task_service.get_tasks_by_cursor(
+            db, filters, sort, pagination["cursor"], pagination["size"], fieldset,
+            with_total=pagination["with_total"]
+        )
+    else:
+        page = await async_task_service.get_tasks_paginated(
+            db, filters, sort, pagination["page"], pagination["size"], fieldset
+        )
+    return FastJSONResponse(page, headers=etag_headers(etag))
 
 @router.post("/", 
     response_model=TaskResponse, 
     status_code=status.HTTP_201_CREATED,
     summary="Crée une nouvelle tâche"
 )
-def create_task(task: TaskCreate, db: Session = Depends(get_db)):
-    return task_service.create_task(db, task)
+async def create_task(task: TaskCreate, background_tasks: BackgroundTasks, db: DbSession = Depends(get_session)):
+    created = await async_task_service.create_task(db, task)
+    # Fin de l'espace des clés de rang : rééquilibrage différé
+    if needs_rank_rebalance(created.rank):
+        background_tasks.add_task(rebalance_ranks_job)
+    return created
+
+@router.post("/bulk", 
+    response_model=TaskBulkCreateResponse,
+    summary="Crée des tâches en lot"
+)
+async def create_tasks_bulk(
+    bulk: TaskBulkCreate,
+    background_tasks: BackgroundTasks,
+    db: DbSession = Depends(get_session)
+):
+    report = await async_task_service.create_tasks_bulk(db, bulk)
+    if any(result.task is not None and needs_rank_rebalance(result.task.rank) for result in report.results):
+        background_tasks.add_task(rebalance_ranks_job)
+    return report
+
+@router.get("/export",
+    summary="Exporte les tâches filtrées (NDJSON ou CSV)"
+)
+async def export_tasks(
+    request: Request,
+    format: str = Query("ndjson", description="Format : ndjson ou csv"),
+    db: DbSession = Depends(get_session),
+    filters: TaskFilter = Depends(get_task_filters)
+):
+    # Flux lu par lots (curseur côté serveur) : mémoire constante, sans pagination ni count()
+    compress = accepts_gzip(request.headers.get("accept-encoding"))
+    body = task_exporter.stream(db, filters, format, compress)
+    headers = {
+        "Content-Disposition": f'attachment; filename="tasks.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+@router.post("/import",
+    response_model=TaskImportReport,
+    summary="Importe des tâches en flux (CSV ou NDJSON)"
+)
+async def import_tasks(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    format: str = Query("csv", description="Format : csv ou ndjson"),
+    db: DbSession = Depends(get_session)
+):
+    # Corps lu au fil de l'eau : chaque lot complet est chargé dès sa réception
+    job = task_importer.begin(format)
+    async for data in request.stream():
+        for batch in job.feed(data):
+            await async_task_importer.import_batch(db, job, batch)
+    for batch in job.close():
+        await async_task_importer.import_batch(db, job, batch)
+    # Espace des rangs épuisé pendant l'import : rééquilibrage différé
+    if not job.ranked:
+        background_tasks.add_task(rebalance_ranks_job)
+    return await async_task_importer.finish(db, job)
 
 @router.get("/{task_id}", 
     response_model=TaskResponse,
     summary="Affiche une tâche par son ID"
 )
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    return task_service.get_task_by_id(db, task_id)
+async def get_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_session)
+):
+    etag = await async_task_service.get_etag(db, "task", str(task_id))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await async_task_service.get_task_by_id(db, task_id)
 
 @router.put("/{task_id}", 
     response_model=TaskResponse,
     summary="Modifie une tâche"
 )
-def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db)):
-    return task_service.update_task(db, task_id, task)
+async def update_task(task_id: int, task: TaskUpdate, db: DbSession = Depends(get_session)):
+    return await async_task_service.update_task(db, task_id, task)
 
 @router.delete("/{task_id}", 
     response_model=MessageResponse,
     summary="Supprime une tâche"
 )
-def delete_task(task_id: int, db: Session = Depends(get_db)):
-    success = task_service.delete_task(db, task_id)
+async def delete_task(task_id: int, db: DbSession = Depends(get_session)):
+    success = await async_task_service.delete_task(db, task_id)
     return MessageResponse(
         message=f"Tâche {task_id} supprimée avec succès",
         success=success
@@ -64,46 +157,76 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     response_model=TaskResponse,
     summary="Marquer une tâche comme terminée"
 )
-def complete_task(task_id: int, db: Session = Depends(get_db)):
-    return task_service.complete_task(db, task_id)
+async def complete_task(task_id: int, db: DbSession = Depends(get_session)):
+    return await async_task_service.complete_task(db, task_id)
+
+@router.patch("/{task_id}/move", 
+    response_model=TaskResponse,
+    summary="Déplacer une tâche (drag & drop)"
+)
+async def move_task(
+    task_id: int,
+    move: TaskMove,
+    background_tasks: BackgroundTasks,
+    db: DbSession = Depends(get_session)
+):
+    try:
+        task = await async_task_service.move_task(db, task_id, move)
+    except ConflictException as exc:
+        # Pas de rang disponible : rééquilibrage après la réponse d'erreur
+        if exc.code == RANK_REBALANCE_PENDING:
+            exc.background = BackgroundTask(rebalance_ranks_job)
+        raise
+    # Clés devenues longues à force d'insertions au même endroit : rééquilibrage différé
+    if needs_rank_rebalance(task.rank):
+        background_tasks.add_task(rebalance_ranks_job)
+    return task
 
 @router.get("/urgent/list", 
     response_model=List[TaskResponse],
     summary="Tâches urgentes"
 )
-def get_urgent_tasks(db: Session = Depends(get_db)):
-    return task_service.get_urgent_tasks(db)
+async def get_urgent_tasks(db: DbSession = Depends(get_session)):
+    return FastJSONResponse(await async_task_service.get_urgent_tasks(db))
 
 @router.get("/overdue/list", 
     response_model=List[TaskResponse],
     summary="Tâches en retard"
 )
-def get_overdue_tasks(db: Session = Depends(get_db)):
-    return task_service.get_overdue_tasks(db)
+async def get_overdue_tasks(db: DbSession = Depends(get_session)):
+    return FastJSONResponse(await async_task_service.get_overdue_tasks(db))
 
 @router.get("/search/", 
     response_model=List[TaskResponse],
     summary="Recherche textuelle"
 )
-def search_tasks(
+async def search_tasks(
     q: str = Query(..., min_length=2, description="Terme de recherche"),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    return task_service.search_tasks(db, q)
+    return FastJSONResponse(await async_task_service.search_tasks(db, q))
 
 @router.get("/statistics/", 
     response_model=TaskStatistics,
     summary="Statistiques des tâches"
 )
-def get_task_statistics(db: Session = Depends(get_db)):
-    return task_service.get_task_statistics(db)
+async def get_task_statistics(
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_session)
+):
+    etag = await async_task_service.get_etag(db, "statistics")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await async_task_service.get_task_statistics(db, etag)
 
 @router.put("/reorder/", 
     response_model=MessageResponse,
     summary="Réorganiser les tâches"
 )
-def reorder_tasks(bulk_update: TaskBulkUpdate, db: Session = Depends(get_db)):
-    success = task_service.reorder_tasks(db, bulk_update)
+async def reorder_tasks(bulk_update: TaskBulkUpdate, db: DbSession = Depends(get_session)):
+    success = await async_task_service.reorder_tasks(db, bulk_update)
     return MessageResponse(
         message="Tâches réorganisées avec succès",
         success=success
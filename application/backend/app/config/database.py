@@ -1,8 +1,24 @@
+from typing import Union
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .settings import settings
 
+# Drivers asynchrones à utiliser pour chaque driver synchrone
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url() -> str:
+    """URL de connexion asynchrone (explicite ou déduite de DATABASE_URL)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    scheme, _, rest = settings.DATABASE_URL.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
 # Configuration du moteur de base de données
 engine = create_engine(
     settings.DATABASE_URL,
@@ -16,6 +32,22 @@ engine = create_engine(
 # Factory pour les sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur et sessions asynchrones (créés uniquement si la pile async est activée)
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE:
+    async_url = get_async_database_url()
+    # aiosqlite utilise un NullPool : pas de dimensionnement du pool
+    pool_options = {} if async_url.startswith("sqlite") else {"pool_size": 5, "max_overflow": 10}
+    async_engine = create_async_engine(
+        async_url,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=settings.DEBUG,
+        **pool_options
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autocommit=False, autoflush=False)
+
 # Base pour les modèles SQLAlchemy
 Base = declarative_base()
 
@@ -27,4 +59,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    Générateur de session asynchrone pour les dépendances FastAPI
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dépendance de session utilisée par les endpoints, selon ASYNC_DATABASE
+DbSession = Union[Session, AsyncSession]
+get_session = get_async_db if settings.ASYNC_DATABASE else get_db
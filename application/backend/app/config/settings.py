@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
 # Chemin racine du projet
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Pile asynchrone (AsyncSession + endpoints sans threadpool)
+    ASYNC_DATABASE: bool = False
+    # URL du driver asynchrone ; déduite de DATABASE_URL si absente
+    ASYNC_DATABASE_URL: Optional[str] = None
     
     # Application
     DEBUG: bool = False
@@ -24,6 +28,38 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
+    # Export en flux : lignes lues (et envoyées) par lot
+    EXPORT_CHUNK_SIZE: int = 1000
+    # Import en flux : lignes validées et chargées par lot (une transaction par lot)
+    IMPORT_CHUNK_SIZE: int = 5000
+    
+    # Cache des réponses (couche service)
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 256
+    CACHE_TTL_SECONDS: float = 30.0
+    # Répertoire du canal d'invalidation partagé entre workers (défaut : dossier temporaire)
+    CACHE_INVALIDATION_DIR: Optional[str] = None
+    # Tranche de temps des ETags de tâches (is_overdue, urgence suivent l'horloge)
+    ETAG_TIME_BUCKET_SECONDS: int = 60
+    
+    # Rangs des tâches : rééquilibrage en tâche de fond au-delà de cette longueur de clé
+    RANK_REBALANCE_LENGTH: int = 32
+    
+    # Compteurs task_stats construits au démarrage s'ils ne l'ont jamais été
+    # (sinon les lectures les recalculent sans rien écrire)
+    TASK_STATS_BUILD_ON_STARTUP: bool = True
+    
+    # Planificateur des flags d'urgence (un seul worker leader l'exécute)
+    URGENCY_SCHEDULER_ENABLED: bool = True
+    URGENCY_SCHEDULER_INTERVAL_SECONDS: float = 60.0
+    
+    # Instrumentation SQL par requête : en-tête Server-Timing et journal "app.sql"
+    # (nombre de requêtes, temps en base, requête la plus lente) ; aucun coût si désactivée
+    SQL_INSTRUMENTATION: bool = False
+    
+    # Métriques Prometheus (GET /metrics) ; avec gunicorn, la variable d'environnement
+    # PROMETHEUS_MULTIPROC_DIR agrège les valeurs de tous les workers (voir gunicorn.conf.py)
+    METRICS_ENABLED: bool = True
     
     # Paths
     ROOT_DIR: Path = ROOT_DIR
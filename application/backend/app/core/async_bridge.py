@@ -0,0 +1,48 @@
+"""
+Pont entre la couche d'accès aux données synchrone et la pile asynchrone
+"""
+import functools
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+async def run_with_session(db: Any, func: Callable, *args, **kwargs) -> Any:
+    """
+    Exécuter `func(session, *args, **kwargs)` sans bloquer la boucle d'événements.
+
+    - AsyncSession : le code synchrone est exécuté via `run_sync`, dans un greenlet
+      de la boucle ; chaque requête SQL est attendue de façon asynchrone par le
+      driver (asyncpg / aiosqlite), sans occuper de thread.
+    - Session : repli sur le threadpool de Starlette (comportement historique).
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: func(session, *args, **kwargs))
+    return await run_in_threadpool(func, db, *args, **kwargs)
+
+class AsyncBridge:
+    """
+    Variante asynchrone d'un repository ou d'un service.
+
+    Chaque méthode publique de l'objet enveloppé, de signature `(db, ...)`, est
+    exposée sous forme de coroutine acceptant une Session ou une AsyncSession.
+    Les requêtes restent écrites une seule fois dans la couche synchrone.
+    """
+    def __init__(self, target: Any):
+        self._target = target
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(db: Any, *args, **kwargs):
+            return await run_with_session(db, attr, *args, **kwargs)
+
+        # Mise en cache : __getattr__ n'est plus appelé pour cette méthode
+        self.__dict__[name] = method
+        return method
+
+    def __repr__(self):
+        return f"<AsyncBridge({self._target.__class__.__name__})>"
@@ -0,0 +1,179 @@
+"""
+Cache en mémoire des réponses de la couche service (LRU + TTL)
+
+Les entrées sont regroupées par espace de noms ("tasks", "categories") : une
+écriture invalide tout l'espace de noms concerné, dans le processus courant et,
+via le canal d'invalidation, dans les autres workers de la même machine.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.config.settings import settings
+
+# Espaces de noms du cache
+TASKS_NAMESPACE = "tasks"
+CATEGORIES_NAMESPACE = "categories"
+
+class LocalInvalidationChannel:
+    """Canal sans diffusion : un seul processus"""
+
+    def publish(self, namespace: str) -> None:
+        pass
+
+    def poll(self, namespaces: Iterable[str]) -> Set[str]:
+        return set()
+
+class FileInvalidationChannel:
+    """
+    Canal d'invalidation inter-processus basé sur des fichiers témoins.
+
+    Chaque espace de noms possède un fichier remplacé atomiquement (os.replace)
+    à chaque écriture ; les autres processus détectent le changement d'inode ou
+    de date de modification avec un simple stat(), sans lecture du fichier.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str) -> str:
+        return os.path.join(self.directory, f"{namespace}.stamp")
+
+    def _stamp(self, namespace: str) -> Tuple[int, int]:
+        try:
+            stat = os.stat(self._path(namespace))
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def publish(self, namespace: str) -> None:
+        temporary = f"{self._path(namespace)}.{uuid.uuid4().hex}"
+        with open(temporary, "w") as handle:
+            handle.write(uuid.uuid4().hex)
+        os.replace(temporary, self._path(namespace))
+        with self._lock:
+            # Notre propre écriture a déjà invalidé le cache local
+            self._seen[namespace] = self._stamp(namespace)
+
+    def poll(self, namespaces: Iterable[str]) -> Set[str]:
+        """Espaces de noms modifiés par un autre processus depuis le dernier appel"""
+        changed = set()
+        with self._lock:
+            for namespace in namespaces:
+                stamp = self._stamp(namespace)
+                previous = self._seen.setdefault(namespace, stamp)
+                if stamp != previous:
+                    self._seen[namespace] = stamp
+                    changed.add(namespace)
+        return changed
+
+class ResponseCache:
+    """Cache LRU borné avec expiration (TTL) et compteurs, sûr entre threads"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 30.0,
+        channel: Optional[Any] = None,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.channel = channel or LocalInvalidationChannel()
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _drop_namespace(self, namespace: str) -> None:
+        """Supprimer les entrées d'un espace de noms (verrou déjà pris)"""
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for entry_key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[entry_key]
+        self._counters["invalidations"] += 1
+
+    def get_or_set(self, namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Retourner la valeur en cache ou la calculer avec `loader`"""
+        if not self.enabled:
+            return loader()
+
+        remote_changes = self.channel.poll([namespace])
+        entry_key = (namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            for changed in remote_changes:
+                self._drop_namespace(changed)
+
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(entry_key)
+                    self._counters["hits"] += 1
+                    return value
+                del self._entries[entry_key]
+                self._counters["expirations"] += 1
+
+            self._counters["misses"] += 1
+            generation = self._generations.get(namespace, 0)
+
+        # Chargement hors verrou : les autres lectures ne sont pas bloquées
+        value = loader()
+
+        with self._lock:
+            # Une invalidation pendant le chargement rend la valeur potentiellement périmée
+            if self._generations.get(namespace, 0) == generation:
+                self._entries[entry_key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Invalider des espaces de noms ici et dans les autres processus (après commit)"""
+        with self._lock:
+            for namespace in namespaces:
+                self._drop_namespace(namespace)
+        if self.enabled:
+            for namespace in namespaces:
+                self.channel.publish(namespace)
+
+    def clear(self) -> None:
+        """Vider le cache local"""
+        with self._lock:
+            for namespace in list(self._generations) + [k[0] for k in self._entries]:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache (hits, misses, évictions...) et taux de succès"""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_ratio"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        return counters
+
+def _default_invalidation_dir() -> str:
+    """Répertoire partagé par tous les workers d'une même base de données"""
+    digest = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"todo-cache-{digest}")
+
+# Instance globale du cache
+response_cache = ResponseCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+    channel=FileInvalidationChannel(settings.CACHE_INVALIDATION_DIR or _default_invalidation_dir())
+    if settings.CACHE_ENABLED else None,
+    enabled=settings.CACHE_ENABLED
+)
@@ -0,0 +1,45 @@
+"""
+ETags forts et requêtes conditionnelles (If-None-Match)
+
+Les ETags sont calculés à partir des versions des données (table task_stats)
+et des paramètres de la requête, sans sérialiser le corps de la réponse.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+def make_etag(*parts: Any) -> str:
+    """ETag fort (entre guillemets) dérivé des éléments de version"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def time_bucket(now: datetime, seconds: int) -> int:
+    """Numéro de la tranche de `seconds` secondes contenant `now` (change avec l'horloge)"""
+    return int(now.timestamp()) // seconds
+
+def request_variant(request: Request) -> str:
+    """Paramètres de la requête sous forme canonique (l'ordre n'a pas d'importance)"""
+    return "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible de If-None-Match (RFC 9110, section 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def not_modified(etag: str) -> Response:
+    """Réponse 304 sans corps"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """En-têtes d'une réponse validable ; no-cache impose au client de revalider à chaque fois"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def set_etag(response: Response, etag: str) -> None:
+    """Ajouter l'ETag à la réponse injectée par FastAPI"""
+    response.headers.update(etag_headers(etag))
@@ -0,0 +1,105 @@
+"""
+Élection d'un worker "leader" pour les tâches périodiques
+
+Un seul des processus uvicorn/gunicorn doit exécuter une tâche planifiée. Le
+verrou est tenu tant que le processus vit : s'il s'arrête (ou perd sa connexion),
+un autre worker l'obtient au tick suivant.
+- PostgreSQL : verrou consultatif de session (pg_try_advisory_lock)
+- autres bases : verrou de fichier (flock) partagé par les workers de la machine
+"""
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de flock, un seul processus supposé
+    fcntl = None
+
+class FileLeaderLock:
+    """Verrou exclusif non bloquant sur un fichier"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle = None
+
+    def try_acquire(self) -> bool:
+        if self._handle is not None:
+            return True
+        if fcntl is None:
+            self._handle = True
+            return True
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        handle = open(self.path, "a")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        if self._handle is not None and self._handle is not True:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            self._handle.close()
+        self._handle = None
+
+class PostgresAdvisoryLock:
+    """Verrou consultatif PostgreSQL, tenu par une connexion dédiée"""
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        # Clé bigint stable dérivée du nom du verrou
+        self.key = int(hashlib.sha1(name.encode()).hexdigest()[:15], 16)
+        self._connection: Optional[Connection] = None
+
+    def try_acquire(self) -> bool:
+        if self._connection is not None:
+            try:
+                # Le verrou disparaît avec la connexion : vérifier qu'elle est vivante,
+                # puis terminer la transaction ouverte par la requête (sinon la session
+                # reste "idle in transaction" et idle_in_transaction_session_timeout
+                # la coupe) ; le verrou de session survit au commit
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return True
+            except Exception:
+                self._discard()
+
+        connection = self.engine.connect()
+        acquired = connection.execute(select(func.pg_try_advisory_lock(self.key))).scalar()
+        connection.commit()
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(select(func.pg_advisory_unlock(self.key)))
+            self._connection.commit()
+        finally:
+            self._discard()
+
+    def _discard(self) -> None:
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+def create_leader_lock(engine: Engine, name: str):
+    """Verrou adapté à la base : consultatif sur PostgreSQL, fichier sinon"""
+    if engine.dialect.name == "postgresql":
+        return PostgresAdvisoryLock(engine, name)
+    digest = hashlib.sha1(str(engine.url).encode()).hexdigest()[:12]
+    return FileLeaderLock(os.path.join(tempfile.gettempdir(), f"todo-leader-{digest}", f"{name}.lock"))
@@ -0,0 +1,206 @@
+"""
+Métriques Prometheus (GET /metrics)
+
+- Latence des requêtes HTTP par modèle de route (histogramme) et requêtes en
+  cours (jauge), mesurées par un middleware ASGI ;
+- connexions du pool SQLAlchemy utilisées et en débordement (événements
+  checkout/checkin du pool) ;
+- succès et échecs des caches (taux de succès :
+  rate(todo_cache_lookups_total{result="hit"}[5m]) / rate(todo_cache_lookups_total[5m])) ;
+- compteurs métier (tâches par statut, en retard...), lus en base à chaque collecte.
+
+Multiprocessus (gunicorn, voir gunicorn.conf.py) : si la variable
+d'environnement PROMETHEUS_MULTIPROC_DIR est définie, chaque worker écrit ses
+valeurs dans ses propres fichiers mmap (aucun verrou entre processus) et
+/metrics agrège les fichiers de tous les workers, quel que soit celui qui répond.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROCESS_DIR:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+# Requêtes sans route correspondante (404) : un seul libellé, pas un par URL
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Intervalle minimal entre deux reports des compteurs de cache (par worker)
+CACHE_SYNC_INTERVAL_SECONDS = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "todo_http_request_duration_seconds", "Durée des requêtes HTTP par route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "todo_http_requests_in_progress", "Requêtes HTTP en cours de traitement",
+    ["method"], multiprocess_mode="livesum"
+)
+POOL_SIZE = Gauge(
+    "todo_db_pool_size", "Taille du pool de connexions", ["engine"], multiprocess_mode="livesum"
+)
+POOL_CHECKED_OUT = Gauge(
+    "todo_db_pool_checked_out", "Connexions du pool en cours d'utilisation",
+    ["engine"], multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "todo_db_pool_overflow", "Connexions ouvertes au-delà de la taille du pool",
+    ["engine"], multiprocess_mode="livesum"
+)
+CACHE_LOOKUPS = Counter(
+    "todo_cache_lookups", "Consultations des caches (succès ou échec)", ["cache", "result"]
+)
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Suivre l'utilisation du pool d'un moteur (pools dimensionnés seulement, comme QueuePool)"""
+    pool = engine.pool
+    if not hasattr(pool, "overflow"):
+        # StaticPool, NullPool... : rien à mesurer
+        return
+    size = pool.size()
+    POOL_SIZE.labels(name).set(size)
+    checked_out = POOL_CHECKED_OUT.labels(name)
+    overflow = POOL_OVERFLOW.labels(name)
+    lock = threading.Lock()
+    state = {"checked_out": 0}
+
+    def update(delta: int) -> None:
+        with lock:
+            state["checked_out"] += delta
+            current = state["checked_out"]
+        checked_out.set(current)
+        # Au-delà de la taille du pool, chaque connexion utilisée est une connexion de débordement
+        overflow.set(max(0, current - size))
+
+    event.listen(engine, "checkout", lambda *args: update(1))
+    event.listen(engine, "checkin", lambda *args: update(-1))
+
+class CacheCounters:
+    """
+    Report des compteurs des caches (stats() de chaque cache) dans les métriques.
+
+    Les caches gardent leurs propres compteurs ; seules les variations depuis
+    le dernier report sont ajoutées, au plus une fois par intervalle.
+    """
+
+    def __init__(self, interval: float = CACHE_SYNC_INTERVAL_SECONDS):
+        self.interval = interval
+        self._sources: Dict[str, Callable[[], Mapping[str, Any]]] = {}
+        self._last: Dict[Tuple[str, str], int] = {}
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, stats: Callable[[], Mapping[str, Any]]) -> None:
+        self._sources[name] = stats
+
+    def maybe_sync(self) -> None:
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+
+    def sync(self) -> None:
+        # Non bloquant : un report déjà en cours suffit
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sync = time.monotonic() + self.interval
+            for name, stats in self._sources.items():
+                counters = stats()
+                for result, key in (("hit", "hits"), ("miss", "misses")):
+                    value = counters.get(key, 0)
+                    delta = value - self._last.get((name, key), 0)
+                    if delta > 0:
+                        CACHE_LOOKUPS.labels(name, result).inc(delta)
+                    self._last[(name, key)] = value
+        finally:
+            self._lock.release()
+
+cache_counters = CacheCounters()
+
+class BusinessMetrics:
+    """Jauges métier d'une collecte (valeurs globales lues en base, identiques pour tous les workers)"""
+
+    def __init__(self, snapshot: Mapping[str, Any]):
+        self.snapshot = snapshot
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        by_status = GaugeMetricFamily("todo_tasks", "Tâches par statut", labels=["status"])
+        for status, count in self.snapshot.get("tasks_by_status", {}).items():
+            by_status.add_metric([status], count)
+        yield by_status
+        by_priority = GaugeMetricFamily("todo_tasks_by_priority", "Tâches par priorité", labels=["priority"])
+        for priority, count in self.snapshot.get("tasks_by_priority", {}).items():
+            by_priority.add_metric([priority], count)
+        yield by_priority
+        for name, documentation in (
+            ("tasks_overdue", "Tâches ouvertes en retard"),
+            ("tasks_urgent", "Tâches ouvertes urgentes"),
+            ("categories", "Catégories"),
+        ):
+            if name in self.snapshot:
+                yield GaugeMetricFamily(f"todo_{name}", documentation, value=self.snapshot[name])
+
+class _ProcessMetrics:
+    """Métriques du processus courant (registre par défaut), hors multiprocessus"""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+def render_metrics(snapshot: Optional[Mapping[str, Any]] = None) -> bytes:
+    """Corps de GET /metrics (format texte Prometheus)"""
+    cache_counters.sync()
+    registry = CollectorRegistry(auto_describe=False)
+    if MULTIPROCESS_DIR:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_ProcessMetrics())
+    if snapshot is not None:
+        registry.register(BusinessMetrics(snapshot))
+    return generate_latest(registry)
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence par modèle de route (après routage) et requêtes en cours"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # La route est ajoutée au scope par le routeur : modèle ("/api/v1/tasks/{task_id}"), pas l'URL
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
+            cache_counters.maybe_sync()
+
+__all__ = [
+    "CONTENT_TYPE_LATEST", "MetricsMiddleware", "cache_counters", "instrument_pool", "render_metrics",
+]
@@ -0,0 +1,70 @@
+"""
+Pagination par curseur (keyset)
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from app.core.exceptions import ValidationException
+from app.models.task import TaskPriority, TaskStatus
+
+# Direction de parcours encodée dans le curseur
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+def _nullable(decoder):
+    """Décodeur d'une colonne de tri pouvant être NULL (null JSON -> None)"""
+    return lambda value: None if value is None else decoder(value)
+
+# Décodeurs des valeurs de tri (les valeurs sont stockées en JSON dans le curseur)
+_VALUE_DECODERS = {
+    "title": str,
+    "priority": TaskPriority,
+    "status": TaskStatus,
+    "due_date": datetime.fromisoformat,
+    "created_at": datetime.fromisoformat,
+    "position": int,
+    "rank": _nullable(str),
+}
+
+def _encode_value(value: Any) -> Any:
+    """Convertir une valeur de tri en valeur sérialisable JSON"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (TaskPriority, TaskStatus)):
+        return value.value
+    return value
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, task_id: int, direction: str) -> str:
+    """Construire un curseur opaque à partir de la dernière ligne d'une page"""
+    payload = {
+        "s": sort_by,
+        "o": sort_order,
+        "v": _encode_value(value),
+        "id": task_id,
+        "d": direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int, str]:
+    """Décoder un curseur et vérifier qu'il correspond au tri demandé"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValidationException(
+                "Le curseur ne correspond pas au tri demandé",
+                code="CURSOR_SORT_MISMATCH"
+            )
+        if payload["d"] not in (CURSOR_NEXT, CURSOR_PREV):
+            raise ValueError(payload["d"])
+
+        value = _VALUE_DECODERS[sort_by](payload["v"])
+        return value, int(payload["id"]), payload["d"]
+    except ValidationException:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValidationException("Curseur de pagination invalide", code="INVALID_CURSOR")
@@ -0,0 +1,171 @@
+"""
+Instrumentation SQL par requête HTTP (SQL_INSTRUMENTATION)
+
+Des écouteurs d'événements SQLAlchemy (before/after_cursor_execute) comptent
+les requêtes SQL, le temps passé en base et la requête la plus lente de la
+requête HTTP en cours (ContextVar, propagée au threadpool et aux greenlets
+de l'AsyncSession). Le middleware ajoute l'en-tête Server-Timing à la réponse
+et écrit une ligne de journal (logger "app.sql") avec les mêmes mesures en
+champs structurés (extra).
+
+Désactivée, l'instrumentation n'installe ni écouteur ni middleware : aucun
+coût. Hors requête HTTP (scripts, tâches de fond), les écouteurs ne font
+qu'une lecture de ContextVar.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.sql")
+
+# Longueur maximale de la requête la plus lente dans les journaux
+MAX_STATEMENT_LENGTH = 300
+
+# Champs structurés d'une ligne de journal
+LOG_FIELDS = (
+    "http_method", "http_path", "http_status", "duration_ms",
+    "db_queries", "db_time_ms", "db_slowest_ms", "db_slowest_statement",
+)
+
+class QueryStats:
+    """Mesures SQL d'une requête HTTP"""
+    __slots__ = ("count", "duration", "slowest", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        if duration > self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+    def server_timing(self, total: float) -> str:
+        """Valeur de l'en-tête Server-Timing (durées en millisecondes)"""
+        return (
+            f'db;desc="{self.count} queries";dur={self.duration * 1000:.2f}, '
+            f'db-slowest;dur={self.slowest * 1000:.2f}, '
+            f'app;dur={total * 1000:.2f}'
+        )
+
+    def log_fields(self) -> Dict[str, Any]:
+        """Champs structurés du journal"""
+        statement = self.slowest_statement
+        if statement is not None:
+            statement = " ".join(statement.split())[:MAX_STATEMENT_LENGTH]
+        return {
+            "db_queries": self.count,
+            "db_time_ms": round(self.duration * 1000, 2),
+            "db_slowest_ms": round(self.slowest * 1000, 2),
+            "db_slowest_statement": statement,
+        }
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_stats() -> Optional[QueryStats]:
+    """Mesures de la requête HTTP en cours (None hors requête ou si désactivé)"""
+    return _current_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+def instrument_engine(engine: Engine) -> None:
+    """Installer les écouteurs sur un moteur synchrone (async_engine.sync_engine pour la pile async)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def remove_instrumentation(engine: Engine) -> None:
+    """Retirer les écouteurs d'un moteur"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+class JSONLogFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement (message et champs structurés)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((field, getattr(record, field)) for field in LOG_FIELDS if hasattr(record, field))
+        return orjson.dumps(entry).decode()
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Journal "app.sql" en JSON sur la sortie d'erreur (sauf si un handler est déjà configuré)"""
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(JSONLogFormatter())
+        logger.addHandler(handler)
+        logger.propagate = False
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI : mesures SQL de chaque requête HTTP.
+
+    L'en-tête Server-Timing reflète les requêtes SQL exécutées avant l'envoi
+    des en-têtes ; la ligne de journal, écrite à la fin de la réponse, inclut
+    aussi celles d'une réponse en flux (export).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            fields = stats.log_fields()
+            logger.info(
+                "%s %s %s %.2fms db=%dq/%.2fms",
+                scope["method"], scope["path"], status_code, duration_ms,
+                fields["db_queries"], fields["db_time_ms"],
+                extra={
+                    "http_method": scope["method"],
+                    "http_path": scope["path"],
+                    "http_status": status_code,
+                    "duration_ms": duration_ms,
+                    **fields,
+                }
+            )
@@ -0,0 +1,115 @@
+"""
+Rangs fractionnaires (clés de tri lexicographiques) pour l'ordre des tâches
+
+Une clé représente une fraction en base 36 (chiffres puis minuscules, dont
+l'ordre est le même octet par octet et selon les collations usuelles) : "i"
+vaut 0.i, "i8" vaut 0.i8... Il existe toujours une clé entre deux clés
+distinctes : insérer ou déplacer une tâche ne réécrit qu'une seule ligne.
+Une clé ne se termine jamais par le chiffre zéro, sinon aucune clé ne pourrait
+s'intercaler avant elle ("a" < "a0" < ?).
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Longueur maximale d'une clé (colonne tasks.rank)
+MAX_KEY_LENGTH = 128
+# Largeur des clés produites par ajout en fin de liste et par rééquilibrage
+KEY_WIDTH = 6
+# Écart entre deux clés ajoutées en fin (ou en tête) de liste
+APPEND_STEP = BASE ** 2
+# Les répartitions (rééquilibrage) n'occupent que la première moitié des clés :
+# l'autre moitié reste aux ajouts en fin de liste, à pas fixe
+SPREAD_SPACE = BASE ** KEY_WIDTH // 2
+
+def _validate(key: str) -> None:
+    if not key or key.endswith(DIGITS[0]) or any(char not in DIGITS for char in key):
+        raise ValueError(f"Clé de rang invalide : {key!r}")
+
+def _to_int(key: str) -> int:
+    """Valeur des KEY_WIDTH premiers chiffres (la clé est tronquée ou complétée par des zéros)"""
+    value = 0
+    for char in key[:KEY_WIDTH].ljust(KEY_WIDTH, DIGITS[0]):
+        value = value * BASE + DIGITS.index(char)
+    return value
+
+def _from_int(value: int) -> str:
+    """Clé de KEY_WIDTH chiffres, sans zéros terminaux"""
+    chars = []
+    for _ in range(KEY_WIDTH):
+        value, digit = divmod(value, BASE)
+        chars.append(DIGITS[digit])
+    return "".join(reversed(chars)).rstrip(DIGITS[0])
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """Clé strictement entre low ("" = 0) et high (None = 1), la plus courte possible"""
+    if high is not None:
+        # Préfixe commun : on le recopie et on poursuit sur la suite des chiffres
+        common = 0
+        while (low[common] if common < len(low) else DIGITS[0]) == high[common]:
+            common += 1
+        if common:
+            return high[:common] + _midpoint(low[common:], high[common:])
+
+    digit_low = DIGITS.index(low[0]) if low else 0
+    digit_high = DIGITS.index(high[0]) if high is not None else BASE
+    if digit_high - digit_low > 1:
+        return DIGITS[(digit_low + digit_high) // 2]
+
+    # Chiffres consécutifs : le premier chiffre de high suffit s'il reste une suite
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[digit_low] + _midpoint(low[1:], None)
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Clé strictement comprise entre `before` et `after` (None : début ou fin de liste).
+
+    En fin ou en tête de liste, la clé avance d'un pas fixe tant que c'est
+    possible : les ajouts successifs ne font pas grandir les clés.
+    """
+    for key in (before, after):
+        if key is not None:
+            _validate(key)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Clés de rang non ordonnées : {before!r} >= {after!r}")
+
+    if before is None and after is None:
+        return DIGITS[BASE // 2]
+    if after is None:
+        value = _to_int(before) + APPEND_STEP
+        if value < BASE ** KEY_WIDTH:
+            return _from_int(value)
+        return _midpoint(before, None)
+    if before is None:
+        value = _to_int(after) - APPEND_STEP
+        # _to_int tronque : la clé obtenue est strictement inférieure à `after`
+        if value > 0:
+            return _from_int(value)
+        return _midpoint("", after)
+    return _midpoint(before, after)
+
+def keys_after(before: Optional[str], count: int) -> List[str]:
+    """`count` clés croissantes placées après `before`"""
+    keys = []
+    for _ in range(count):
+        before = key_between(before, None)
+        keys.append(before)
+    return keys
+
+def spread_step(count: int) -> int:
+    """Écart entre deux clés lorsque `count` clés sont réparties uniformément (dans SPREAD_SPACE)"""
+    step = SPREAD_SPACE // (count + 1)
+    if step < 1:
+        raise ValueError(f"Trop de clés à répartir : {count}")
+    return step
+
+def spread_key(index: int, step: int) -> str:
+    """Clé de rang `index` (à partir de 0) d'une répartition d'écart `step` (sans la liste entière)"""
+    return _from_int(step * (index + 1))
+
+def spread_keys(count: int) -> List[str]:
+    """`count` clés croissantes réparties uniformément (rééquilibrage)"""
+    step = spread_step(count)
+    return [spread_key(index, step) for index in range(count)]
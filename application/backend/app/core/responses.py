@@ -0,0 +1,42 @@
+"""
+Réponse JSON rapide (orjson) pour les lectures volumineuses
+"""
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+def _default(obj: Any) -> Any:
+    """Objets légers (app.schemas.task_rows) : sérialisés via to_dict()"""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Type non sérialisable : {type(obj).__name__}")
+    return to_dict()
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Le client accepte-t-il gzip (en-tête Accept-Encoding, q=0 : refusé) ?"""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().lower()
+            if not quality.startswith("q="):
+                return True
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Sérialisation orjson, sans validation par response_model.
+
+    Les dates UTC sont écrites avec le suffixe "Z", comme le fait Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
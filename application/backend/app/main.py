@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -7,9 +7,16 @@ import uvicorn
 from contextlib import asynccontextmanager
 
 from app.config.settings import settings
-from app.config.database import Base, engine
+from app.config.database import Base, DbSession, SessionLocal, engine, async_engine, get_session
 from app.api.v1.router import api_router
 from app.core.exceptions import TodoException
+from app.core.cache import response_cache
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, cache_counters, instrument_pool, render_metrics
+from app.core.query_stats import QueryStatsMiddleware, configure_logging, instrument_engine
+from app.repositories.category_registry import category_registry
+from app.repositories.task_stats_repository import task_stats_repository
+from app.services.task_service import async_task_service
+from app.services.urgency_scheduler import urgency_scheduler
 from app.schemas.common import ErrorResponse
 
 # Gestionnaire de contexte pour le cycle de vie de l'application
@@ -19,12 +26,30 @@ async def lifespan(app: FastAPI):
     # Démarrage : créer les tables si elles n'existent pas
     Base.metadata.create_all(bind=engine)
     
+    # Registre des catégories : validation des écritures de tâches sans requête
+    # Compteurs task_stats : construits une fois ici, jamais sur une lecture
+    db = SessionLocal()
+    try:
+        category_registry.warm(db)
+        if settings.TASK_STATS_BUILD_ON_STARTUP:
+            task_stats_repository.ensure_built(db)
+    finally:
+        db.close()
+    
+    # Flags d'urgence : mise à jour incrémentale en tâche de fond
+    if settings.URGENCY_SCHEDULER_ENABLED:
+        urgency_scheduler.start()
+    
     print(f"🚀 {settings.APP_NAME} v{settings.VERSION} démarré!")
     print(f"📚 Documentation disponible sur : http://{settings.HOST}:{settings.PORT}/docs")
     
     yield
     
-    # Arrêt : nettoyage si nécessaire
+    await urgency_scheduler.stop()
+    
+    # Arrêt : fermeture des connexions asynchrones
+    if async_engine is not None:
+        await async_engine.dispose()
     print("🛑 Arrêt de l'application...")
 
 # Création de l'application FastAPI
@@ -48,6 +73,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Instrumentation SQL par requête (Server-Timing et journal "app.sql")
+if settings.SQL_INSTRUMENTATION:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    configure_logging()
+    app.add_middleware(QueryStatsMiddleware)
+
+# Métriques Prometheus : latence par route, requêtes en cours, pool, caches
+if settings.METRICS_ENABLED:
+    instrument_pool(engine, "sync")
+    if async_engine is not None:
+        instrument_pool(async_engine.sync_engine, "async")
+    cache_counters.register("responses", response_cache.stats)
+    cache_counters.register("category_registry", category_registry.stats)
+    app.add_middleware(MetricsMiddleware)
+
 # Inclusion des routers
 app.include_router(api_router)
 
@@ -61,7 +103,9 @@ async def todo_exception_handler(request: Request, exc: TodoException):
             error=exc.__class__.__name__,
             detail=exc.detail,
             code=getattr(exc, 'code', None)
-        ).dict()
+        ).dict(),
+        # Tâche différée attachée par l'endpoint (ex. rééquilibrage des rangs)
+        background=getattr(exc, 'background', None)
     )
 
 @app.exception_handler(RequestValidationError)
@@ -118,9 +162,25 @@ def health_check():
         "status": "healthy",
         "app": settings.APP_NAME,
         "version": settings.VERSION,
-        "environment": "development" if settings.DEBUG else "production"
+        "environment": "development" if settings.DEBUG else "production",
+        "cache": response_cache.stats(),
+        "category_registry": category_registry.stats(),
+        "urgency_scheduler": urgency_scheduler.stats()
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", 
+        tags=["Health"],
+        summary="Métriques Prometheus",
+        include_in_schema=False
+    )
+    async def metrics(db: DbSession = Depends(get_session)):
+        """
+        Métriques au format texte Prometheus (agrégées sur tous les workers en multiprocessus).
+        """
+        snapshot = await async_task_service.get_metrics(db)
+        return Response(render_metrics(snapshot), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/", 
     tags=["Root"],
     summary="Point d'entrée de l'API"
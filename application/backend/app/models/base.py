@@ -1,12 +1,21 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import Column, Integer, DateTime, func
 from sqlalchemy.ext.declarative import declared_attr
 from app.config.database import Base
 
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
 class BaseModel(Base):
     __abstract__ = True
     
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Horodatage fourni par l'application (microsecondes comprises) : sous SQLite,
+    # CURRENT_TIMESTAMP s'arrête à la seconde et ne se compare pas aux valeurs
+    # liées ("... HH:MM:SS" < "... HH:MM:SS.000000"), ce qui faussait les curseurs ;
+    # le défaut serveur reste pour les chargements directs (COPY)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Integer, String, Index, func
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -9,9 +9,15 @@ class Category(BaseModel):
     name = Column(String(50), unique=True, nullable=False, index=True)
     description = Column(String(200), nullable=True)
     color = Column(String(7), default="#007bff")
+    # Nombre de tâches, dénormalisé : maintenu par TaskService dans la transaction
+    # d'écriture, vérifié et recalculé par scripts/category_counts.py
+    tasks_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relations
     tasks = relationship("Task", back_populates="category", cascade="all, delete-orphan")
     
     def __repr__(self):
-        return f"<Category(name={self.name})>"
\ No newline at end of file
+        return f"<Category(name={self.name})>"
+
+# Recherche insensible à la casse (CategoryRepository.get_by_name / name_exists)
+Index("ix_categories_lower_name", func.lower(Category.name))
\ No newline at end of file
@@ -1,5 +1,6 @@
 from .base import BaseModel
 from .category import Category
 from .task import Task, TaskPriority, TaskStatus
+from .task_stats import TaskStat
 
-__all__ = ["BaseModel", "Category", "Task", "TaskPriority", "TaskStatus"]
\ No newline at end of file
+__all__ = ["BaseModel", "Category", "Task", "TaskPriority", "TaskStatus", "TaskStat"]
\ No newline at end of file
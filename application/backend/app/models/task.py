@@ -1,9 +1,12 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Boolean, Integer
+from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey, Boolean, Integer, DDL, Index, and_, event
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from datetime import datetime, timedelta, timezone  
+from datetime import datetime, time, timedelta, timezone  
+from typing import Optional
 import enum
 
 from .base import BaseModel
+from app.core.ranking import MAX_KEY_LENGTH
 
 class TaskPriority(str, enum.Enum):
     BASSE = "Basse"
@@ -15,6 +18,18 @@ class TaskStatus(str, enum.Enum):
     TERMINEE = "Terminée"
     REPORTEE = "Reportée"
 
+# Une tâche est urgente si son échéance tombe au plus tard dans 2 jours (dates UTC)
+URGENCY_THRESHOLD_DAYS = 2
+
+def urgency_boundary(now: Optional[datetime] = None) -> datetime:
+    """Instant à partir duquel une échéance n'est plus urgente (minuit UTC, J + seuil + 1)"""
+    today = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+    return datetime.combine(today + timedelta(days=URGENCY_THRESHOLD_DAYS + 1), time.min, tzinfo=timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    """Les dates lues depuis SQLite sont naïves : elles sont en UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
 class Task(BaseModel):
     __tablename__ = "tasks"
     
@@ -26,8 +41,12 @@ class Task(BaseModel):
     status = Column(Enum(TaskStatus), nullable=False, default=TaskStatus.EN_COURS)
     
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    is_urgent = Column(Boolean, default=False) 
-    position = Column(Integer, default=0) 
+    # Flag d'urgence persisté (colonne "is_urgent") ; la valeur de référence est
+    # l'expression Task.is_urgent, calculée à partir de due_date et status
+    urgent_flag = Column("is_urgent", Boolean, default=False)
+    position = Column(Integer, default=0, index=True)
+    # Rang fractionnaire (voir app.core.ranking) : ordre du drag & drop
+    rank = Column(String(MAX_KEY_LENGTH), nullable=True, index=True)
 
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     
@@ -36,35 +55,92 @@ class Task(BaseModel):
     def __repr__(self):
         return f"<Task(title={self.title}, priority={self.priority})>"
     
-    @property
+    @hybrid_property
     def is_overdue(self) -> bool:
         """Vérifie si la tâche est en retard"""
         if self.status == TaskStatus.TERMINEE:
             return False
-        
-        now = datetime.now(timezone.utc)
-        
-        if self.due_date.tzinfo is None:
-            due_date_aware = self.due_date.replace(tzinfo=timezone.utc)
-        else:
-            due_date_aware = self.due_date
-            
-        return due_date_aware < now
+        return as_utc(self.due_date) < datetime.now(timezone.utc)
+    
+    @is_overdue.inplace.expression
+    @classmethod
+    def _is_overdue_expression(cls):
+        """Même règle en SQL (index ix_tasks_status_due_date / ix_tasks_open_due_date)"""
+        return and_(cls.status != TaskStatus.TERMINEE, cls.due_date < datetime.now(timezone.utc))
+    
+    @hybrid_property
+    def is_urgent(self) -> bool:
+        """Échéance dans moins de URGENCY_THRESHOLD_DAYS jours (ou dépassée), tâche non terminée"""
+        if self.status == TaskStatus.TERMINEE:
+            return False
+        return as_utc(self.due_date) < urgency_boundary()
+    
+    @is_urgent.inplace.expression
+    @classmethod
+    def _is_urgent_expression(cls):
+        return and_(cls.status != TaskStatus.TERMINEE, cls.due_date < urgency_boundary())
     
     @property
     def days_until_due(self) -> int:
         now = datetime.now(timezone.utc)
-        
-        if self.due_date.tzinfo is None:
-            due_date_aware = self.due_date.replace(tzinfo=timezone.utc)
-        else:
-            due_date_aware = self.due_date
-            
-        delta = due_date_aware.date() - now.date()
+        delta = as_utc(self.due_date).date() - now.date()
         return delta.days
     
     def update_urgency(self):
-        if self.status != TaskStatus.TERMINEE:
-            self.is_urgent = self.days_until_due <= 2
-        else:
-            self.is_urgent = False
\ No newline at end of file
+        """Synchroniser le flag persisté (à l'écriture uniquement)"""
+        self.urgent_flag = self.is_urgent
+# Index composites dictés par les requêtes fréquentes (migration e5a2c8f3b1d7)
+_OPEN_TASK = Task.status != TaskStatus.TERMINEE
+Index("ix_tasks_status_due_date", Task.status, Task.due_date)
+Index("ix_tasks_category_id_position", Task.category_id, Task.position)
+Index("ix_tasks_open_due_date", Task.due_date, postgresql_where=_OPEN_TASK, sqlite_where=_OPEN_TASK)
+Index("ix_tasks_completed_at", Task.completed_at)
+
+# Index plein texte natif, maintenu par la base à chaque INSERT / UPDATE :
+# - PostgreSQL : colonne tsvector générée + index GIN
+# - SQLite : table FTS5 "external content" synchronisée par triggers
+FULL_TEXT_DDL = {
+    "postgresql": [
+        # Configuration "simple" sans accents (comme remove_diacritics de FTS5) :
+        # "tache" trouve "Tâche" ; to_tsvector(regconfig, text) reste IMMUTABLE
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        "DO $$ BEGIN "
+        "IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'simple_unaccent') THEN "
+        "CREATE TEXT SEARCH CONFIGURATION simple_unaccent (COPY = simple); "
+        "ALTER TEXT SEARCH CONFIGURATION simple_unaccent "
+        "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple; "
+        "END IF; END $$",
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple_unaccent', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple_unaccent', coalesce(description, '')), 'B')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+        "title, description, content='tasks', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+    ],
+}
+
+for _dialect, _statements in FULL_TEXT_DDL.items():
+    for _statement in _statements:
+        event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, BigInteger
+from app.config.database import Base
+
+class TaskStat(Base):
+    """
+    Compteur agrégé des tâches (table de synthèse "task_stats").
+    
+    Chaque ligne est un compteur identifié par (dimension, clé), par exemple
+    ("status", "EN_COURS") ou ("completed_on", "2024-05-01"). Les compteurs sont
+    maintenus dans la même transaction que les écritures de TaskService.
+    La dimension "version" porte les numéros de version des données (ETag).
+    """
+    __tablename__ = "task_stats"
+    
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(20), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TaskStat({self.dimension}:{self.key}={self.count})>"
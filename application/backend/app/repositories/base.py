@@ -1,7 +1,8 @@
-from typing import Generic, TypeVar, Type, List, Optional, Dict, Any
+from typing import Generic, TypeVar, Type, List, Optional, Dict, Any, Iterable, Set
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc
 from app.models.base import BaseModel
+from app.core.async_bridge import AsyncBridge
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
@@ -11,10 +12,18 @@ class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
-    def create(self, db: Session, obj_data: Dict[str, Any]) -> ModelType:
-        """Créer un nouvel objet en base"""
+    def create(self, db: Session, obj_data: Dict[str, Any], commit: bool = True) -> ModelType:
+        """
+        Créer un nouvel objet en base.
+        
+        Avec commit=False, l'objet est seulement flushé : l'appelant termine
+        la transaction (écritures complémentaires dans la même transaction).
+        """
         db_obj = self.model(**obj_data)
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -27,12 +36,16 @@ class BaseRepository(Generic[ModelType]):
         """Récupérer tous les objets avec pagination"""
         return db.query(self.model).offset(skip).limit(limit).all()
 
-    def update(self, db: Session, db_obj: ModelType, update_data: Dict[str, Any]) -> ModelType:
-        """Mettre à jour un objet existant"""
+    def update(
+        self, db: Session, db_obj: ModelType, update_data: Dict[str, Any], commit: bool = True
+    ) -> ModelType:
+        """Mettre à jour un objet existant (commit=False : l'appelant termine la transaction)"""
         for field, value in update_data.items():
             if hasattr(db_obj, field) and value is not None:
                 setattr(db_obj, field, value)
         
+        if not commit:
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -52,4 +65,16 @@ class BaseRepository(Generic[ModelType]):
 
     def exists(self, db: Session, obj_id: int) -> bool:
         """Vérifier si un objet existe"""
-        return self.get_by_id(db, obj_id) is not None
\ No newline at end of file
+        return self.get_by_id(db, obj_id) is not None
+
+    def get_existing_ids(self, db: Session, obj_ids: Iterable[int]) -> Set[int]:
+        """Parmi les IDs donnés, ceux qui existent (une seule requête IN)"""
+        obj_ids = set(obj_ids)
+        if not obj_ids:
+            return set()
+        rows = db.query(self.model.id).filter(self.model.id.in_(obj_ids)).all()
+        return {row.id for row in rows}
+class AsyncBaseRepository(AsyncBridge):
+    """Variante asynchrone d'un repository : mêmes méthodes, sous forme de coroutines"""
+    def __init__(self, repository: BaseRepository):
+        super().__init__(repository)
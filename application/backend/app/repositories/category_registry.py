@@ -0,0 +1,191 @@
+"""
+Registre en mémoire des catégories (table de référence, petite et peu modifiée)
+
+Sert la validation de category_id lors des écritures de tâches et les
+catégories imbriquées dans les réponses, sans aller-retour vers la base.
+- Les écritures de catégories invalident tout le registre (invalidate).
+- Les écritures de tâches ajustent les compteurs tasks_count en mémoire
+  (apply_count_deltas) et ne les rendent périmés que dans les autres workers :
+  la validation n'en dépend pas et reste servie en mémoire.
+Les invalidations sont diffusées aux autres workers par le canal du cache de
+réponses. Une catégorie absente du registre (créée hors de l'API) est
+confirmée en base avant d'être refusée.
+"""
+import threading
+from typing import Any, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.core.cache import FileInvalidationChannel, LocalInvalidationChannel, response_cache
+from app.repositories.category_repository import category_repository
+from app.schemas.category import CategoryResponse
+
+# Espaces de noms du canal d'invalidation propres au registre
+REFS_NAMESPACE = "category_refs"
+COUNTS_NAMESPACE = "category_counts"
+
+# Catégorie en cache : schéma de réponse et sa forme sérialisable (orjson)
+Entry = Tuple[CategoryResponse, Dict[str, Any]]
+
+class CategoryRegistry:
+    """Instantané de la table des catégories, sûr entre threads"""
+
+    def __init__(self, repository: Any, channel: Optional[Any] = None, enabled: bool = True):
+        self.repository = repository
+        self.channel = channel or LocalInvalidationChannel()
+        self.enabled = enabled
+        self._entries: Dict[int, Entry] = {}
+        self._loaded = False
+        self._counts_fresh = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {"loads": 0, "hits": 0, "misses": 0, "invalidations": 0}
+
+    def _load(self, db: Session) -> Dict[int, Entry]:
+        entries = {}
+        for category in self.repository.get_all_ordered(db):
+            response = CategoryResponse.from_orm(category)
+            entries[category.id] = (response, response.model_dump())
+        return entries
+
+    def _snapshot(self, db: Session, with_counts: bool, force: bool = False) -> Dict[int, Entry]:
+        """Entrées courantes, rechargées (une requête) si elles sont périmées"""
+        if not self.enabled:
+            return self._load(db)
+
+        changes = self.channel.poll([REFS_NAMESPACE, COUNTS_NAMESPACE])
+        with self._lock:
+            if changes:
+                # Écriture dans un autre worker
+                self._generation += 1
+                self._counts_fresh = False
+                if REFS_NAMESPACE in changes:
+                    self._loaded = False
+            if not force and self._loaded and (self._counts_fresh or not with_counts):
+                self._counters["hits"] += 1
+                return self._entries
+            self._counters["misses"] += 1
+            generation = self._generation
+
+        # Chargement hors verrou : les autres lectures ne sont pas bloquées
+        entries = self._load(db)
+
+        with self._lock:
+            self._counters["loads"] += 1
+            # Une invalidation pendant le chargement rend l'instantané potentiellement périmé
+            if self._generation == generation:
+                self._entries = entries
+                self._loaded = True
+                self._counts_fresh = True
+        return entries
+
+    def warm(self, db: Session) -> int:
+        """Charger le registre (démarrage de l'application) ; retourne le nombre de catégories"""
+        return len(self._snapshot(db, with_counts=True, force=True))
+
+    def existing_ids(self, db: Session, category_ids: Iterable[int]) -> Set[int]:
+        """Parmi les IDs donnés, ceux des catégories existantes"""
+        category_ids = set(category_ids)
+        entries = self._snapshot(db, with_counts=False)
+        found = category_ids & entries.keys()
+        missing = category_ids - found
+        if missing:
+            # Absentes du registre : confirmation en base (catégorie créée hors de l'API)
+            confirmed = self.repository.get_existing_ids(db, missing)
+            if confirmed:
+                self._mark_stale()
+            found |= confirmed
+        return found
+
+    def exists(self, db: Session, category_id: int) -> bool:
+        """Vérifier qu'une catégorie existe (sans requête si elle est dans le registre)"""
+        return category_id in self.existing_ids(db, [category_id])
+
+    def get(self, db: Session, category_id: int) -> Optional[CategoryResponse]:
+        """Catégorie imbriquée d'une réponse de tâche (tasks_count à jour)"""
+        return self.responses(db, [category_id]).get(category_id)
+
+    def responses(self, db: Session, category_ids: Iterable[int]) -> Dict[int, CategoryResponse]:
+        """Catégories imbriquées de plusieurs réponses de tâches"""
+        return {category_id: entry[0] for category_id, entry in self._get_entries(db, category_ids).items()}
+
+    def payloads(self, db: Session, category_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Catégories imbriquées des listes de tâches, sous forme sérialisable"""
+        return {category_id: entry[1] for category_id, entry in self._get_entries(db, category_ids).items()}
+
+    def _get_entries(self, db: Session, category_ids: Iterable[int]) -> Dict[int, Entry]:
+        category_ids = set(category_ids)
+        entries = self._snapshot(db, with_counts=True)
+        if not category_ids <= entries.keys():
+            entries = self._snapshot(db, with_counts=True, force=True)
+        return {category_id: entries[category_id] for category_id in category_ids if category_id in entries}
+
+    def _mark_stale(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._loaded = False
+            self._counts_fresh = False
+            self._counters["invalidations"] += 1
+
+    def invalidate(self) -> None:
+        """Écriture sur les catégories (après commit) : tout le registre est rechargé"""
+        self._mark_stale()
+        if self.enabled:
+            self.channel.publish(REFS_NAMESPACE)
+
+    def apply_count_deltas(self, deltas: Mapping[int, int]) -> None:
+        """
+        Écriture sur les tâches (après commit) : variations de tasks_count par catégorie.
+        
+        Les variations validées sont reportées sur l'instantané local (la réponse
+        de l'écriture n'a pas à recharger les catégories) ; les autres workers
+        sont prévenus que leurs compteurs sont périmés.
+        """
+        with self._lock:
+            # Un chargement en cours peut précéder le commit : son résultat est écarté
+            self._generation += 1
+            if self._loaded and self._counts_fresh:
+                entries = dict(self._entries)
+                for category_id, delta in deltas.items():
+                    entry = entries.get(category_id)
+                    if entry is None or not delta:
+                        continue
+                    response = entry[0].model_copy(update={"tasks_count": entry[0].tasks_count + delta})
+                    entries[category_id] = (response, response.model_dump())
+                self._entries = entries
+            else:
+                self._counts_fresh = False
+        if self.enabled:
+            self.channel.publish(COUNTS_NAMESPACE)
+
+    def invalidate_counts(self) -> None:
+        """Compteurs tasks_count modifiés en masse (après commit) : ils sont rechargés"""
+        with self._lock:
+            self._generation += 1
+            self._counts_fresh = False
+            self._counters["invalidations"] += 1
+        if self.enabled:
+            self.channel.publish(COUNTS_NAMESPACE)
+
+    def clear(self) -> None:
+        """Vider le registre local"""
+        self._mark_stale()
+        with self._lock:
+            self._entries = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du registre (chargements, succès...)"""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["categories"] = len(self._entries)
+            counters["loaded"] = self._loaded
+        return counters
+
+# Instance globale du registre (même répertoire d'invalidation que le cache de réponses)
+category_registry = CategoryRegistry(
+    category_repository,
+    channel=FileInvalidationChannel(response_cache.channel.directory)
+    if settings.CACHE_ENABLED else None,
+    enabled=settings.CACHE_ENABLED
+)
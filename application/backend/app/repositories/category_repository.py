@@ -1,8 +1,8 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, insert, select
 
-from .base import BaseRepository
+from .base import BaseRepository, AsyncBaseRepository
 from app.models.category import Category
 from app.models.task import Task
 
@@ -18,12 +18,67 @@ class CategoryRepository(BaseRepository[Category]):
             func.lower(Category.name) == func.lower(name)
         ).first()
 
-    def get_with_task_counts(self, db: Session) -> List[tuple]:
-        """Récupérer toutes les catégories avec le nombre de tâches associées"""
-        return db.query(
-            Category,
-            func.count(Task.id).label('tasks_count')
-        ).outerjoin(Task).group_by(Category.id).all()
+    def get_ids_by_names(self, db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """IDs des catégories nommées (insensible à la casse, une requête), indexés par nom en minuscules"""
+        names = {name.lower() for name in names}
+        if not names:
+            return {}
+        rows = db.query(Category.name, Category.id).filter(func.lower(Category.name).in_(names)).all()
+        return {name.lower(): category_id for name, category_id in rows}
+
+    def create_many(self, db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """Créer des catégories à partir de leur nom (INSERT multi-lignes, sans commit)"""
+        rows = [{"name": name, "tasks_count": 0} for name in names]
+        if not rows:
+            return {}
+        result = db.execute(insert(Category).returning(Category.name, Category.id), rows)
+        return {name.lower(): category_id for name, category_id in result}
+
+    def get_all_ordered(self, db: Session) -> List[Category]:
+        """Récupérer toutes les catégories (tasks_count est une colonne : aucun agrégat)"""
+        return db.query(Category).order_by(Category.id).all()
+
+    def get_rows(self, db: Session, fields: Sequence[str]) -> List[Any]:
+        """
+        Lire les catégories colonne par colonne (champs partiels).
+        
+        Seules les colonnes demandées sont lues (tasks_count compris, sans agrégat).
+        """
+        columns = [getattr(Category, field) for field in fields]
+        return db.query(*columns).order_by(Category.id).all()
+
+    def adjust_task_counts(self, db: Session, deltas: Mapping[int, int]) -> None:
+        """
+        Appliquer des variations de tasks_count en une requête (sans commit).
+        
+        L'incrément est calculé par la base : pas de perte de mise à jour entre
+        deux écritures concurrentes sur la même catégorie.
+        """
+        deltas = {category_id: delta for category_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        db.query(Category).filter(Category.id.in_(deltas)).update(
+            {Category.tasks_count: Category.tasks_count + case(deltas, value=Category.id)},
+            synchronize_session=False
+        )
+
+    def _actual_task_count(self):
+        """Sous-requête corrélée : nombre réel de tâches de la catégorie"""
+        return select(func.count(Task.id)).where(Task.category_id == Category.id).scalar_subquery()
+
+    def get_task_count_mismatches(self, db: Session) -> List[tuple]:
+        """Catégories dont le compteur diverge : (id, nom, stocké, réel)"""
+        actual = self._actual_task_count()
+        return db.query(Category.id, Category.name, Category.tasks_count, actual).filter(
+            Category.tasks_count != actual
+        ).order_by(Category.id).all()
+
+    def reconcile_task_counts(self, db: Session) -> int:
+        """Recalculer les compteurs divergents (sans commit) ; retourne le nombre de catégories corrigées"""
+        actual = self._actual_task_count()
+        return db.query(Category).filter(Category.tasks_count != actual).update(
+            {Category.tasks_count: actual}, synchronize_session=False
+        )
 
     def name_exists(self, db: Session, name: str, exclude_id: Optional[int] = None) -> bool:
         """Vérifier si un nom de catégorie existe déjà"""
@@ -41,4 +96,7 @@ class CategoryRepository(BaseRepository[Category]):
         return db.query(Task).filter(Task.category_id == category_id).first() is not None
 
 # Instance globale du repository
-category_repository = CategoryRepository()
\ No newline at end of file
+category_repository = CategoryRepository()
+
+# Variante asynchrone (AsyncSession)
+async_category_repository = AsyncBaseRepository(category_repository)
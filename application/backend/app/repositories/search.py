@@ -0,0 +1,74 @@
+"""
+Recherche plein texte sur les tâches (index natif de la base)
+"""
+import re
+from typing import List
+
+from sqlalchemy import Float, Integer, desc, false, func, literal_column, or_, select, text
+from sqlalchemy.orm import Query, Session
+
+from app.models.task import Task
+
+# Configuration text search PostgreSQL (identique à la colonne générée search_vector) :
+# "simple" suivi de unaccent, les accents sont ignorés comme avec FTS5 sous SQLite
+POSTGRES_TS_CONFIG = "simple_unaccent"
+
+# Poids BM25 des colonnes FTS5 (title, description) : un titre compte plus qu'une description
+SQLITE_BM25_WEIGHTS = (10.0, 1.0)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(term: str) -> List[str]:
+    """Découper le terme recherché en mots (la ponctuation est ignorée)"""
+    return _TOKEN_PATTERN.findall(term.lower())
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def _sqlite_hits(tokens: List[str]):
+    """Sous-requête FTS5 (id, score BM25) ; chaque mot est recherché par préfixe"""
+    match = " ".join('"%s"*' % token.replace('"', '""') for token in tokens)
+    weights = ", ".join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+    return text(
+        f"SELECT rowid AS id, bm25(tasks_fts, {weights}) AS score "
+        "FROM tasks_fts WHERE tasks_fts MATCH :match"
+    ).bindparams(match=match).columns(id=Integer, score=Float).subquery("fts_hits")
+
+def _postgres_query(tokens: List[str]):
+    return func.to_tsquery(POSTGRES_TS_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+
+def search_predicate(db: Session, term: str):
+    """Prédicat de filtrage plein texte, composable avec les autres filtres"""
+    tokens = tokenize(term)
+    if not tokens:
+        return false()
+
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        return literal_column("tasks.search_vector").op("@@")(_postgres_query(tokens))
+    if dialect == "sqlite":
+        return Task.id.in_(select(_sqlite_hits(tokens).c.id))
+
+    # Autres bases : pas d'index plein texte, repli sur ILIKE
+    search_pattern = f"%{term}%"
+    return or_(Task.title.ilike(search_pattern), Task.description.ilike(search_pattern))
+
+def apply_ranked_search(db: Session, query: Query, term: str) -> Query:
+    """Filtrer une requête sur les tâches et la trier par pertinence décroissante"""
+    tokens = tokenize(term)
+    if not tokens:
+        return query.filter(false())
+
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        vector = literal_column("tasks.search_vector")
+        ts_query = _postgres_query(tokens)
+        return query.filter(vector.op("@@")(ts_query)).order_by(
+            desc(func.ts_rank(vector, ts_query)), Task.id
+        )
+    if dialect == "sqlite":
+        # bm25() est négatif : plus le score est bas, plus le document est pertinent
+        hits = _sqlite_hits(tokens)
+        return query.join(hits, hits.c.id == Task.id).order_by(hits.c.score, Task.id)
+
+    return query.filter(search_predicate(db, term)).order_by(Task.id)
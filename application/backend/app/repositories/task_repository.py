@@ -1,36 +1,185 @@
-from typing import List, Optional, Tuple, Dict
+import csv
+import enum
+import io
+from typing import Any, List, Optional, Sequence, Tuple, Dict
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc, asc, func
-from datetime import datetime, timedelta, timezone  # AJOUTÉ: timezone
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, and_, or_, not_, desc, asc, case, delete, func, insert, select,
+    tuple_, update
+)
+from datetime import datetime, timezone
 
-from .base import BaseRepository
-from app.models.task import Task, TaskPriority, TaskStatus
+from .base import BaseRepository, AsyncBaseRepository
+from .search import search_predicate, apply_ranked_search
+from .task_stats_repository import utc_day
+from app.models.task import Task, TaskPriority, TaskStatus, urgency_boundary
+from app.core.ranking import MAX_KEY_LENGTH, spread_key, spread_step
 from app.schemas.task import TaskFilter, TaskSort
 
+def _copy_value(value: Any) -> Any:
+    """Valeur d'une cellule COPY (CSV) : NULL pour None, nom du membre pour les enums"""
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# Colonnes des lectures de liste sans ORM, indexées par nom de champ de réponse
+TASK_ROW_COLUMNS = {
+    "id": Task.id,
+    "title": Task.title,
+    "description": Task.description,
+    "priority": Task.priority,
+    "due_date": Task.due_date,
+    "category_id": Task.category_id,
+    "status": Task.status,
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "completed_at": Task.completed_at,
+    "position": Task.position,
+    "rank": Task.rank,
+}
+
+# Colonnes de tri pouvant être NULL (tâches pas encore rangées) : NULL en fin de
+# liste en ordre croissant, en tête en ordre décroissant, sur toutes les bases
+NULLABLE_SORT_FIELDS = {"rank"}
+
+def _sort_key(column: Any, ascending: bool, nullable: bool) -> Any:
+    """Clause ORDER BY d'une colonne de tri (NULLS LAST / NULLS FIRST explicites si nullable)"""
+    ordered = asc(column) if ascending else desc(column)
+    if nullable:
+        ordered = ordered.nulls_last() if ascending else ordered.nulls_first()
+    return ordered
+
+def _keyset_predicate(column: Any, cursor: Tuple[Any, int], ascending: bool, nullable: bool) -> Any:
+    """
+    Lignes strictement après le curseur (value, id) dans l'ordre de _sort_key.
+    
+    Une comparaison de tuples ne voit jamais les NULL : pour une colonne
+    nullable, la tranche des NULL (ordonnée par id) est traitée à part.
+    """
+    value, task_id = cursor
+    key = tuple_(column, Task.id)
+    if not nullable:
+        return key > cursor if ascending else key < cursor
+    if value is None:
+        in_nulls = and_(column.is_(None), Task.id > task_id if ascending else Task.id < task_id)
+        return in_nulls if ascending else or_(column.isnot(None), in_nulls)
+    beyond = and_(column.isnot(None), key > cursor if ascending else key < cursor)
+    return or_(beyond, column.is_(None)) if ascending else beyond
+
 class TaskRepository(BaseRepository[Task]):
     """Repository pour les opérations spécifiques aux tâches"""
     
     def __init__(self):
         super().__init__(Task)
 
-    def get_with_category(self, db: Session, task_id: int) -> Optional[Task]:
-        """Récupérer une tâche avec sa catégorie chargée"""
-        return db.query(Task).options(
-            joinedload(Task.category)
-        ).filter(Task.id == task_id).first()
+    def get_row(self, db: Session, task_id: int, for_update: bool = False) -> Optional[Any]:
+        """
+        Colonnes de réponse d'une tâche (ligne simple, sans entité ORM).
+        
+        for_update=True : ligne verrouillée jusqu'à la fin de la transaction
+        (SELECT ... FOR UPDATE), pour un état "avant" qui ne peut plus changer.
+        """
+        query = self._list_query(db, tuple(TASK_ROW_COLUMNS)).filter(Task.id == task_id)
+        if for_update:
+            query = query.with_for_update()
+        return query.first()
 
-    def get_filtered(
-        self, 
-        db: Session, 
-        filters: TaskFilter,
-        sort: TaskSort,
-        skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[Task], int]:
-        """Récupérer les tâches avec filtres, tri et pagination"""
-        query = db.query(Task).options(joinedload(Task.category))
+    def get_append_slot(self, db: Session) -> Tuple[Optional[int], Optional[str]]:
+        """Plus grande position et plus grand rang, en une lecture d'index"""
+        return tuple(db.query(func.max(Task.position), func.max(Task.rank)).one())
+
+    def insert_returning(self, db: Session, values: Dict[str, Any]) -> Any:
+        """INSERT ... RETURNING des colonnes de réponse (sans commit ni rechargement)"""
+        return db.execute(insert(Task).values(values).returning(*TASK_ROW_COLUMNS.values())).one()
+
+    def update_returning(self, db: Session, task_id: int, values: Dict[str, Any], *criteria) -> Optional[Any]:
+        """
+        UPDATE ... RETURNING des colonnes de réponse (sans commit ni rechargement).
+        
+        Retourne None si aucune tâche ne correspond (ID et critères supplémentaires).
+        """
+        statement = update(Task).where(Task.id == task_id, *criteria).values(values)
+        return db.execute(
+            statement.returning(*TASK_ROW_COLUMNS.values()),
+            execution_options={"synchronize_session": False}
+        ).first()
+
+    def delete_returning(self, db: Session, task_id: int) -> Optional[Any]:
+        """
+        DELETE ... RETURNING des colonnes de réponse (sans commit).
         
-        # Application des filtres
+        Retourne la ligne supprimée, ou None si la tâche n'existe pas (ou plus) :
+        deux suppressions concurrentes ne retournent la ligne qu'une fois.
+        """
+        return db.execute(
+            delete(Task).where(Task.id == task_id).returning(*TASK_ROW_COLUMNS.values()),
+            # Entité éventuellement chargée dans la session : retirée, comme après db.delete()
+            execution_options={"synchronize_session": "evaluate"}
+        ).first()
+
+    def bulk_insert(self, db: Session, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Insérer plusieurs tâches en une requête INSERT multi-lignes (sans commit).
+        
+        Retourne les colonnes de réponse des tâches créées. Toutes les lignes
+        doivent avoir les mêmes clés et des positions distinctes : RETURNING
+        n'étant pas ordonné (SQLite), les lignes retournées sont rattachées
+        aux lignes insérées par leur position.
+        """
+        if not rows:
+            return []
+        result = db.execute(insert(Task).returning(*TASK_ROW_COLUMNS.values()), rows)
+        created_by_position = {row.position: row for row in result}
+        return [created_by_position[row["position"]] for row in rows]
+
+    def load_rows(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Charger des tâches en masse, sans RETURNING (import ; sans commit).
+        
+        PostgreSQL avec psycopg2 : COPY ... FROM STDIN au format CSV ; autres
+        bases et drivers (SQLite, asyncpg) : INSERT exécuté en executemany. Toutes les lignes
+        doivent avoir les mêmes clés (attributs du modèle Task).
+        """
+        if not rows:
+            return
+        connection = db.connection()
+        if connection.dialect.driver == "psycopg2":
+            columns = [Task.__mapper__.columns[key].name for key in rows[0]]
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([_copy_value(value) for value in row.values()])
+            buffer.seek(0)
+            with connection.connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {Task.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            return
+        db.execute(insert(Task.__table__), [
+            {Task.__mapper__.columns[key].name: value for key, value in row.items()} for row in rows
+        ])
+
+    def _list_query(self, db: Session, columns: Optional[Sequence[str]] = None):
+        """
+        Requête de base des lectures de liste.
+        
+        columns=None : entités Task avec leur catégorie (joinedload) ;
+        sinon, seules les colonnes nommées (TASK_ROW_COLUMNS) sont lues, en
+        lignes simples (les catégories sont servies par le registre).
+        """
+        if columns is None:
+            return db.query(Task).options(joinedload(Task.category))
+        return db.query(*(TASK_ROW_COLUMNS[name] for name in columns))
+
+    def _apply_filters(self, db: Session, query, filters: TaskFilter):
+        """Appliquer les filtres communs à une requête sur les tâches"""
         if filters.category_id:
             query = query.filter(Task.category_id == filters.category_id)
         
@@ -41,155 +190,338 @@ class TaskRepository(BaseRepository[Task]):
             query = query.filter(Task.status == filters.status)
             
         if filters.is_urgent is not None:
-            query = query.filter(Task.is_urgent == filters.is_urgent)
+            query = query.filter(Task.is_urgent if filters.is_urgent else not_(Task.is_urgent))
+        
+        if filters.is_overdue is not None:
+            query = query.filter(Task.is_overdue if filters.is_overdue else not_(Task.is_overdue))
             
         if filters.search:
-            search_pattern = f"%{filters.search}%"
-            query = query.filter(
-                or_(
-                    Task.title.ilike(search_pattern),
-                    Task.description.ilike(search_pattern)
-                )
-            )
+            query = query.filter(search_predicate(db, filters.search))
         
-        # Compter le total avant pagination
-        total = query.count()
+        return query
+
+    def export_query(self, db: Session, filters: TaskFilter, columns: Sequence[str]):
+        """Tâches filtrées dans l'ordre des IDs (export ; lecture par lots à la charge de l'appelant)"""
+        return self._apply_filters(db, self._list_query(db, columns), filters).order_by(Task.id)
+
+    def _count_filtered(self, db: Session, filters: TaskFilter) -> int:
+        """Nombre de tâches filtrées, compté sur la seule table des tâches"""
+        return self._apply_filters(db, db.query(func.count(Task.id)), filters).scalar()
+
+    def get_filtered(
+        self, 
+        db: Session, 
+        filters: TaskFilter,
+        sort: TaskSort,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Any], int]:
+        """Récupérer les tâches avec filtres, tri et pagination (voir _list_query pour columns)"""
+        query = self._apply_filters(db, self._list_query(db, columns), filters)
+        
+        # Compter le total avant pagination (sans les colonnes lues)
+        total = self._count_filtered(db, filters)
         
-        # Application du tri
+        # Application du tri (l'ID départage les égalités pour un ordre stable)
         if hasattr(Task, sort.sort_by):
-            order_func = asc if sort.sort_order == "asc" else desc
-            query = query.order_by(order_func(getattr(Task, sort.sort_by)))
+            ascending = sort.sort_order == "asc"
+            nullable = sort.sort_by in NULLABLE_SORT_FIELDS
+            query = query.order_by(
+                _sort_key(getattr(Task, sort.sort_by), ascending, nullable),
+                asc(Task.id) if ascending else desc(Task.id)
+            )
         
         # Pagination
         tasks = query.offset(skip).limit(limit).all()
         
         return tasks, total
 
-    def get_urgent_tasks(self, db: Session) -> List[Task]:
+    def get_keyset_page(
+        self,
+        db: Session,
+        filters: TaskFilter,
+        sort: TaskSort,
+        cursor: Optional[Tuple[Any, int]] = None,
+        backward: bool = False,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+        with_total: bool = False
+    ) -> Tuple[List[Any], Optional[int], bool]:
+        """
+        Récupérer une page de tâches par curseur (keyset) sur (colonne de tri, id).
+        
+        Le coût ne dépend pas de la profondeur de la page : la base se positionne
+        directement après (ou avant) le curseur au lieu de sauter les lignes précédentes.
+        Retourne les tâches, le total filtré (None sans with_total : le COUNT
+        parcourt toutes les lignes filtrées) et un indicateur de page suivante
+        dans la direction parcourue.
+        """
+        query = self._apply_filters(db, self._list_query(db, columns), filters)
+        total = self._count_filtered(db, filters) if with_total else None
+        
+        sort_column = getattr(Task, sort.sort_by)
+        ascending = (sort.sort_order == "asc") != backward
+        nullable = sort.sort_by in NULLABLE_SORT_FIELDS
+        
+        if cursor is not None:
+            query = query.filter(_keyset_predicate(sort_column, cursor, ascending, nullable))
+        
+        query = query.order_by(
+            _sort_key(sort_column, ascending, nullable),
+            asc(Task.id) if ascending else desc(Task.id)
+        )
+        
+        # Une ligne de plus pour savoir s'il reste des tâches dans cette direction
+        tasks = query.limit(limit + 1).all()
+        has_more = len(tasks) > limit
+        tasks = tasks[:limit]
+        
+        if backward:
+            tasks.reverse()
+        
+        return tasks, total, has_more
+
+    def get_urgent_tasks(self, db: Session, columns: Optional[Sequence[str]] = None) -> List[Any]:
         """Récupérer les tâches urgentes (échéance < 2 jours et non terminées)"""
-        return db.query(Task).options(joinedload(Task.category)).filter(
-            and_(
-                Task.is_urgent == True,
-                Task.status != TaskStatus.TERMINEE
-            )
+        return self._list_query(db, columns).filter(
+            Task.is_urgent
         ).order_by(Task.due_date).all()
 
-    def get_overdue_tasks(self, db: Session) -> List[Task]:
+    def get_overdue_tasks(self, db: Session, columns: Optional[Sequence[str]] = None) -> List[Any]:
         """Récupérer les tâches en retard"""
         # CORRECTION: Utiliser datetime avec timezone
         now = datetime.now(timezone.utc)
-        return db.query(Task).options(joinedload(Task.category)).filter(
+        return self._list_query(db, columns).filter(
             and_(
                 Task.due_date < now,
                 Task.status != TaskStatus.TERMINEE
             )
         ).order_by(Task.due_date).all()
 
-    def search_tasks(self, db: Session, search_term: str, limit: int = 10) -> List[Task]:
-        """Recherche textuelle dans les tâches (bonus)"""
-        search_pattern = f"%{search_term}%"
-        return db.query(Task).options(joinedload(Task.category)).filter(
-            or_(
-                Task.title.ilike(search_pattern),
-                Task.description.ilike(search_pattern)
-            )
-        ).limit(limit).all()
-
-    def mark_as_completed(self, db: Session, task_id: int) -> Optional[Task]:
-        """Marquer une tâche comme terminée"""
-        task = self.get_by_id(db, task_id)
-        if task and task.status != TaskStatus.TERMINEE:
-            task.status = TaskStatus.TERMINEE
-            task.completed_at = datetime.now(timezone.utc)  # CORRECTION: avec timezone
-            task.is_urgent = False
+    def count_overdue(self, db: Session) -> int:
+        """Compter les tâches en retard sans les charger"""
+        return db.query(func.count(Task.id)).filter(Task.is_overdue).scalar()
+
+    def count_deadlines(self, db: Session) -> Tuple[int, int]:
+        """
+        Compter les tâches en retard et urgentes en une requête.
+        
+        Les deux compteurs dépendent de l'heure courante : ils sont calculés sur
+        les seules tâches ouvertes d'échéance proche (index partiel ix_tasks_open_due_date).
+        """
+        row = db.query(
+            func.count(Task.id).filter(Task.is_overdue),
+            func.count(Task.id)
+        ).filter(Task.is_urgent).one()
+        return row[0], row[1]
+
+    def search_tasks(
+        self,
+        db: Session,
+        search_term: str,
+        limit: int = 10,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """Recherche plein texte dans les tâches, triée par pertinence"""
+        query = self._list_query(db, columns)
+        return apply_ranked_search(db, query, search_term).limit(limit).all()
+
+    def mark_as_completed(self, db: Session, task_id: int, commit: bool = True) -> Optional[Any]:
+        """
+        Marquer une tâche comme terminée en une requête (commit=False : l'appelant termine la transaction).
+        
+        Retourne les colonnes de réponse, ou None si la tâche est introuvable ou déjà terminée.
+        """
+        row = self.update_returning(db, task_id, {
+            "status": TaskStatus.TERMINEE,
+            "completed_at": datetime.now(timezone.utc),
+            "urgent_flag": False,
+        }, Task.status != TaskStatus.TERMINEE)
+        if commit:
             db.commit()
-            db.refresh(task)
-        return task
+        return row
 
     def update_positions(self, db: Session, position_updates: Dict[int, int]) -> bool:
-        """Mettre à jour les positions de plusieurs tâches (drag & drop)"""
+        """
+        Mettre à jour les positions de plusieurs tâches (drag & drop).
+        
+        Une seule requête UPDATE ... SET position = CASE id WHEN ... END,
+        quel que soit le nombre de tâches ; tout ou rien.
+        """
+        if not position_updates:
+            return True
         try:
-            for task_id, position in position_updates.items():
-                task = self.get_by_id(db, task_id)
-                if task:
-                    task.position = position
+            db.query(Task).filter(Task.id.in_(position_updates)).update(
+                {Task.position: case(position_updates, value=Task.id)},
+                synchronize_session=False
+            )
             db.commit()
             return True
         except Exception:
             db.rollback()
             return False
 
+    def get_last_rank(self, db: Session) -> Optional[str]:
+        """Plus grand rang (lecture de l'index, sans parcours de la table)"""
+        return db.query(func.max(Task.rank)).scalar()
+
+    def get_ranks(self, db: Session, task_ids: List[int]) -> Dict[int, Optional[str]]:
+        """Rangs de plusieurs tâches (une requête IN)"""
+        if not task_ids:
+            return {}
+        return dict(db.query(Task.id, Task.rank).filter(Task.id.in_(task_ids)).all())
+
+    def get_adjacent_rank(
+        self, db: Session, rank: str, after: bool = True, exclude_id: Optional[int] = None
+    ) -> Optional[str]:
+        """Rang immédiatement après (ou avant) `rank`, hors tâche `exclude_id`"""
+        query = db.query(func.min(Task.rank) if after else func.max(Task.rank)).filter(
+            Task.rank > rank if after else Task.rank < rank
+        )
+        if exclude_id is not None:
+            query = query.filter(Task.id != exclude_id)
+        return query.scalar()
+
+    def rebalance_ranks(self, db: Session, chunk_size: int = 5000) -> int:
+        """
+        Réattribuer des rangs courts et régulièrement espacés, en conservant l'ordre
+        (sans commit). Les tâches sans rang sont placées à la fin, par position.
+        
+        L'ordre actuel est d'abord numéroté par la base (ROW_NUMBER) dans une
+        table temporaire, puis les rangs sont réécrits par lots lus dans cette
+        table : la mémoire ne dépend pas du nombre de tâches, et les lignes
+        déjà réécrites ne sont pas relues.
+        
+        Chaque ligne n'est modifiée que si son rang n'a pas changé entre-temps :
+        un déplacement concurrent n'est pas écrasé.
+        """
+        connection = db.connection()
+        rank_order = Table(
+            "rank_order", MetaData(),
+            Column("seq", Integer, primary_key=True),
+            Column("task_id", Integer, nullable=False),
+            Column("rank", String(MAX_KEY_LENGTH)),
+            prefixes=["TEMPORARY"]
+        )
+        rank_order.drop(connection, checkfirst=True)
+        rank_order.create(connection)
+        
+        numbered = select(
+            func.row_number().over(order_by=(
+                Task.rank.is_(None), Task.rank, Task.position.is_(None), Task.position, Task.id
+            )),
+            Task.id,
+            Task.rank
+        )
+        connection.execute(insert(rank_order).from_select(["seq", "task_id", "rank"], numbered))
+        count = connection.execute(select(func.count()).select_from(rank_order)).scalar()
+        
+        step = spread_step(count) if count else 0
+        last_seq = 0
+        while True:
+            chunk = connection.execute(
+                select(rank_order).where(rank_order.c.seq > last_seq).order_by(rank_order.c.seq).limit(chunk_size)
+            ).all()
+            if not chunk:
+                break
+            new_ranks = {row.task_id: spread_key(row.seq - 1, step) for row in chunk}
+            old_ranks = {row.task_id: row.rank or "" for row in chunk}
+            db.query(Task).filter(
+                Task.id.in_(new_ranks),
+                func.coalesce(Task.rank, "") == case(old_ranks, value=Task.id)
+            ).update({Task.rank: case(new_ranks, value=Task.id)}, synchronize_session=False)
+            last_seq = chunk[-1].seq
+        
+        rank_order.drop(connection)
+        return count
+
     def get_statistics(self, db: Session) -> dict:
-        """Obtenir des statistiques complètes sur les tâches"""
-        total_tasks = db.query(Task).count()
-        
-        # Statistiques par statut
-        status_stats = db.query(
-            Task.status,
-            func.count(Task.id).label('count')
-        ).group_by(Task.status).all()
-        
-        # Statistiques par priorité
-        priority_stats = db.query(
-            Task.priority,
-            func.count(Task.id).label('count')
-        ).group_by(Task.priority).all()
-        
-        # Tâches urgentes
-        urgent_count = db.query(Task).filter(Task.is_urgent == True).count()
-        
-        # Tâches en retard
-        overdue_count = len(self.get_overdue_tasks(db))
-        
-        # Tâches terminées aujourd'hui
-        today = datetime.now(timezone.utc).date()  # CORRECTION: avec timezone
-        completed_today = db.query(Task).filter(
-            and_(
+        """
+        Obtenir des statistiques complètes sur les tâches.
+        
+        Tous les compteurs sont calculés en un seul passage sur la table grâce à
+        l'agrégation conditionnelle (COUNT(...) FILTER (WHERE ...)) : une seule
+        requête, et aucune tâche n'est chargée en mémoire.
+        """
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        
+        def count_where(*conditions):
+            return func.count(Task.id).filter(and_(*conditions))
+        
+        row = db.query(
+            func.count(Task.id).label('total'),
+            *[count_where(Task.status == s).label(f'status_{s.name}') for s in TaskStatus],
+            *[count_where(Task.priority == p).label(f'priority_{p.name}') for p in TaskPriority],
+            count_where(Task.is_urgent).label('urgent_count'),
+            count_where(Task.is_overdue).label('overdue_count'),
+            count_where(
                 Task.status == TaskStatus.TERMINEE,
-                func.date(Task.completed_at) == today
-            )
-        ).count()
+                utc_day(db, Task.completed_at) == today
+            ).label('completed_today'),
+        ).one()
         
-        # Taux de completion
-        completed_count = db.query(Task).filter(Task.status == TaskStatus.TERMINEE).count()
+        total_tasks = row.total
+        completed_count = getattr(row, f'status_{TaskStatus.TERMINEE.name}')
         completion_rate = (completed_count / total_tasks * 100) if total_tasks > 0 else 0
         
+        # Seules les valeurs présentes en base apparaissent (comme un GROUP BY)
+        by_status = {s.value: getattr(row, f'status_{s.name}') for s in TaskStatus}
+        by_priority = {p.value: getattr(row, f'priority_{p.name}') for p in TaskPriority}
+        
         return {
             'total': total_tasks,
-            'by_status': {stat.status.value: stat.count for stat in status_stats},
-            'by_priority': {stat.priority.value: stat.count for stat in priority_stats},
-            'urgent_count': urgent_count,
-            'overdue_count': overdue_count,
-            'completed_today': completed_today,
+            'by_status': {key: count for key, count in by_status.items() if count},
+            'by_priority': {key: count for key, count in by_priority.items() if count},
+            'urgent_count': row.urgent_count,
+            'overdue_count': row.overdue_count,
+            'completed_today': row.completed_today,
             'completion_rate': round(completion_rate, 2)
         }
 
-    def update_all_urgency_flags(self, db: Session):
-        """Mettre à jour tous les flags d'urgence (tâche périodique)"""
-        # CORRECTION: avec timezone
-        urgent_threshold = datetime.now(timezone.utc) + timedelta(days=2)
+    def mark_urgent_between(self, db: Session, start: datetime, end: datetime) -> int:
+        """
+        Marquer urgentes les tâches ouvertes dont l'échéance est dans [start, end) (sans commit).
         
-        # Marquer comme urgent
-        db.query(Task).filter(
-            and_(
-                Task.due_date <= urgent_threshold,
-                Task.status != TaskStatus.TERMINEE,
-                Task.is_urgent == False
-            )
-        ).update({Task.is_urgent: True})
+        Seule la tranche d'échéances entrée dans la fenêtre d'urgence est lue,
+        par l'index partiel ix_tasks_open_due_date.
+        """
+        return db.query(Task).filter(
+            Task.status != TaskStatus.TERMINEE,
+            Task.due_date >= start,
+            Task.due_date < end,
+            Task.urgent_flag.isnot(True)
+        ).update({Task.urgent_flag: True}, synchronize_session=False)
+
+    def update_all_urgency_flags(
+        self,
+        db: Session,
+        commit: bool = True,
+        now: Optional[datetime] = None
+    ) -> Tuple[int, int]:
+        """
+        Mettre à jour tous les flags d'urgence (rattrapage complet).
         
-        # Retirer le flag urgent si plus valide
-        db.query(Task).filter(
-            and_(
-                or_(
-                    Task.due_date > urgent_threshold,
-                    Task.status == TaskStatus.TERMINEE
-                ),
-                Task.is_urgent == True
-            )
-        ).update({Task.is_urgent: False})
+        Retourne le nombre de tâches marquées urgentes et le nombre de tâches
+        dont le flag a été retiré.
+        """
+        # Même règle que l'expression Task.is_urgent (flag NULL = non urgent)
+        urgent = and_(Task.status != TaskStatus.TERMINEE, Task.due_date < urgency_boundary(now))
+        marked = db.query(Task).filter(
+            urgent, Task.urgent_flag.isnot(True)
+        ).update({Task.urgent_flag: True}, synchronize_session=False)
+        
+        cleared = db.query(Task).filter(
+            not_(urgent), Task.urgent_flag == True
+        ).update({Task.urgent_flag: False}, synchronize_session=False)
         
-        db.commit()
+        if commit:
+            db.commit()
+        return marked, cleared
 
 # Instance globale du repository
-task_repository = TaskRepository()
\ No newline at end of file
+task_repository = TaskRepository()
+
+# Variante asynchrone (AsyncSession)
+async_task_repository = AsyncBaseRepository(task_repository)
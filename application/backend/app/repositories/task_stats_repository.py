@@ -0,0 +1,277 @@
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .base import AsyncBaseRepository
+from app.models.task import Task, TaskStatus
+from app.models.task_stats import TaskStat
+
+# Dimensions des compteurs de la table task_stats
+DIMENSION_META = "meta"
+DIMENSION_TOTAL = "total"
+DIMENSION_STATUS = "status"
+DIMENSION_PRIORITY = "priority"
+DIMENSION_COMPLETED_ON = "completed_on"
+DIMENSION_VERSION = "version"
+
+ALL = "all"
+# Ligne témoin : la table a été construite au moins une fois par rebuild()
+INITIALIZED_KEY = (DIMENSION_META, "initialized")
+# Ligne verrouillée par les écritures de rangs (voir lock_ranks)
+RANKS_LOCK_KEY = (DIMENSION_META, "ranks")
+# Versions des données, incrémentées à chaque écriture (ETag)
+TASKS_VERSION_KEY = (DIMENSION_VERSION, "tasks")
+CATEGORIES_VERSION_KEY = (DIMENSION_VERSION, "categories")
+
+StatKey = Tuple[str, str]
+
+def _utc_day(value: datetime) -> str:
+    """Jour (UTC) d'une date de complétion, au format ISO"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().isoformat()
+
+def utc_day(db: Session, column: Any) -> Any:
+    """
+    Jour UTC d'une colonne horodatée, en SQL (même règle que _utc_day).
+
+    PostgreSQL : date() suit le fuseau de la session, la valeur est d'abord
+    convertie en UTC. SQLite : les dates sont stockées telles qu'écrites (UTC).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", column))
+    return func.date(column)
+
+def task_state(task: Any) -> Dict[str, Any]:
+    """Instantané des champs d'une tâche qui alimentent les compteurs"""
+    return {
+        "status": task.status,
+        "priority": task.priority,
+        "completed_at": task.completed_at,
+    }
+
+def stat_keys(state: Mapping[str, Any]) -> List[StatKey]:
+    """Compteurs auxquels une tâche contribue (pour une unité chacun)"""
+    status = state.get("status") or TaskStatus.EN_COURS
+    keys = [
+        (DIMENSION_TOTAL, ALL),
+        (DIMENSION_STATUS, status.name),
+        (DIMENSION_PRIORITY, state["priority"].name),
+    ]
+    if status == TaskStatus.TERMINEE and state.get("completed_at"):
+        keys.append((DIMENSION_COMPLETED_ON, _utc_day(state["completed_at"])))
+    return keys
+
+class TaskStatsRepository:
+    """Repository de la table de synthèse task_stats"""
+
+    def apply_deltas(self, db: Session, deltas: Mapping[StatKey, int]) -> None:
+        """
+        Appliquer des variations de compteurs en une seule requête (upsert).
+
+        Aucun commit : les variations font partie de la transaction d'écriture
+        de l'appelant et sont annulées avec elle.
+        """
+        rows = [
+            {"dimension": dimension, "key": key, "count": delta}
+            for (dimension, key), delta in deltas.items()
+            if delta
+        ]
+        if rows:
+            self._upsert(db, rows, increment=True)
+
+    def lock_ranks(self, db: Session) -> None:
+        """
+        Sérialiser les attributions de rangs jusqu'à la fin de la transaction.
+
+        Deux ajouts concurrents lisent sinon le même max(rank) et écrivent le
+        même rang. Un index unique sur rank ne convient pas : le rééquilibrage
+        réécrit les rangs par lots et croise des rangs encore présents.
+        L'upsert de la ligne RANKS_LOCK_KEY (count + 0) la verrouille
+        (PostgreSQL : verrou de ligne ; SQLite : première écriture, verrou de
+        la base), à prendre avant de lire les rangs voisins.
+        """
+        self._upsert(db, [{"dimension": RANKS_LOCK_KEY[0], "key": RANKS_LOCK_KEY[1], "count": 0}], increment=True)
+
+    def get_value(self, db: Session, key: StatKey) -> Optional[int]:
+        """Lire une valeur (ligne "meta" par exemple) ; None si absente"""
+        return db.query(TaskStat.count).filter(
+            TaskStat.dimension == key[0], TaskStat.key == key[1]
+        ).scalar()
+
+    def set_value(self, db: Session, key: StatKey, value: int) -> None:
+        """Écrire une valeur dans la transaction de l'appelant"""
+        self._upsert(db, [{"dimension": key[0], "key": key[1], "count": value}], increment=False)
+
+    def _upsert(self, db: Session, rows: List[Dict[str, Any]], increment: bool) -> None:
+        """Insérer ou mettre à jour des lignes en une requête (ajout ou remplacement de count)"""
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_func = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            statement = insert_func(TaskStat).values(rows)
+            excluded = statement.excluded["count"]
+            statement = statement.on_conflict_do_update(
+                index_elements=[TaskStat.dimension, TaskStat.key],
+                set_={"count": TaskStat.count + excluded if increment else excluded}
+            )
+            db.execute(statement)
+            return
+
+        # Autres bases : mise à jour puis insertion des lignes absentes
+        for row in rows:
+            updated = db.query(TaskStat).filter(
+                TaskStat.dimension == row["dimension"], TaskStat.key == row["key"]
+            ).update({TaskStat.count: TaskStat.count + row["count"] if increment else row["count"]})
+            if not updated:
+                db.add(TaskStat(**row))
+
+    def apply_task_change(
+        self,
+        db: Session,
+        before: Optional[Mapping[str, Any]],
+        after: Optional[Mapping[str, Any]]
+    ) -> None:
+        """Répercuter la création (before=None), la modification ou la suppression (after=None) d'une tâche"""
+        self.apply_task_changes(db, [(before, after)])
+
+    def apply_task_changes(
+        self,
+        db: Session,
+        changes: Iterable[Tuple[Optional[Mapping[str, Any]], Optional[Mapping[str, Any]]]]
+    ) -> None:
+        """Répercuter plusieurs changements (before, after) en un seul upsert"""
+        deltas = Counter({TASKS_VERSION_KEY: 1})
+        for before, after in changes:
+            if before is not None:
+                deltas.subtract(stat_keys(before))
+            if after is not None:
+                deltas.update(stat_keys(after))
+        self.apply_deltas(db, deltas)
+
+    def bump_version(self, db: Session, *keys: StatKey) -> None:
+        """Incrémenter des versions de données dans la transaction de l'appelant"""
+        self.apply_deltas(db, {key: 1 for key in keys})
+
+    def get_versions(self, db: Session) -> Dict[str, int]:
+        """Lire les versions des données en une requête"""
+        version_filter = or_(
+            TaskStat.dimension == DIMENSION_VERSION,
+            and_(TaskStat.dimension == INITIALIZED_KEY[0], TaskStat.key == INITIALIZED_KEY[1])
+        )
+
+        # Table pas encore construite (voir ensure_built) : versions absentes, rien n'est écrit
+        rows = db.query(TaskStat.dimension, TaskStat.key, TaskStat.count).filter(version_filter).all()
+        return {key: count for dimension, key, count in rows if dimension == DIMENSION_VERSION}
+
+    def compute(self, db: Session) -> Counter:
+        """Recalculer tous les compteurs depuis la table des tâches"""
+        counts = Counter()
+
+        groups = db.query(
+            Task.status,
+            Task.priority,
+            func.count(Task.id)
+        ).group_by(Task.status, Task.priority).all()
+        for status, priority, count in groups:
+            counts[(DIMENSION_TOTAL, ALL)] += count
+            counts[(DIMENSION_STATUS, status.name)] += count
+            counts[(DIMENSION_PRIORITY, priority.name)] += count
+
+        completion_day = utc_day(db, Task.completed_at)
+        completions = db.query(completion_day, func.count(Task.id)).filter(
+            Task.status == TaskStatus.TERMINEE,
+            Task.completed_at.isnot(None)
+        ).group_by(completion_day).all()
+        for day, count in completions:
+            counts[(DIMENSION_COMPLETED_ON, str(day))] += count
+
+        return Counter({key: count for key, count in counts.items() if count})
+
+    def read(self, db: Session, day: Optional[date] = None) -> Dict[StatKey, int]:
+        """Lire les compteurs (les complétions ne sont lues que pour le jour demandé)"""
+        day = day or datetime.now(timezone.utc).date()
+        rows = db.query(TaskStat).filter(
+            or_(
+                TaskStat.dimension != DIMENSION_COMPLETED_ON,
+                TaskStat.key == day.isoformat()
+            )
+        ).all()
+        return {(row.dimension, row.key): row.count for row in rows}
+
+    def rebuild(self, db: Session) -> Counter:
+        """
+        Reconstruire entièrement la table task_stats (à lancer hors charge d'écriture).
+
+        Les compteurs sont supprimés puis réécrits par upsert (ON CONFLICT) :
+        deux reconstructions concurrentes (démarrage de plusieurs workers)
+        aboutissent au même résultat sans erreur de clé primaire.
+        """
+        counts = self.compute(db)
+        versions = {
+            (row.dimension, row.key): row.count
+            for row in db.query(TaskStat).filter(TaskStat.dimension == DIMENSION_VERSION)
+        }
+        db.query(TaskStat).filter(TaskStat.dimension != DIMENSION_VERSION).delete(synchronize_session=False)
+        rows = [
+            {"dimension": dimension, "key": key, "count": count}
+            for (dimension, key), count in counts.items()
+        ]
+        rows.append({"dimension": INITIALIZED_KEY[0], "key": INITIALIZED_KEY[1], "count": 1})
+
+        # Les versions repartent au-delà de l'horodatage courant (en µs) : une
+        # base recréée ne réutilise jamais une version déjà vue par un client
+        seed = time.time_ns() // 1000
+        for key in (TASKS_VERSION_KEY, CATEGORIES_VERSION_KEY):
+            rows.append({
+                "dimension": key[0], "key": key[1],
+                "count": max(versions.get(key, 0) + 1, seed)
+            })
+        self._upsert(db, rows, increment=False)
+        db.commit()
+        return counts
+
+    def ensure_built(self, db: Session) -> bool:
+        """
+        Construire la table si elle ne l'a jamais été (démarrage de l'application,
+        migration) ; retourne True si elle a été construite.
+
+        Les lectures ne construisent jamais la table : tant qu'elle ne l'est pas,
+        elles recalculent les compteurs sans rien écrire.
+        """
+        if self.get_value(db, INITIALIZED_KEY) is not None:
+            return False
+        self.rebuild(db)
+        return True
+
+    def verify(self, db: Session) -> List[Tuple[str, str, int, int]]:
+        """Comparer les compteurs stockés au recalcul : (dimension, clé, stocké, attendu)"""
+        expected = self.compute(db)
+        stored = {
+            (row.dimension, row.key): row.count
+            for row in db.query(TaskStat).all()
+            if row.dimension not in (DIMENSION_META, DIMENSION_VERSION)
+        }
+        return [
+            (dimension, key, stored.get((dimension, key), 0), expected.get((dimension, key), 0))
+            for dimension, key in sorted(set(stored) | set(expected))
+            if stored.get((dimension, key), 0) != expected.get((dimension, key), 0)
+        ]
+
+    def get_counters(self, db: Session, day: Optional[date] = None) -> Dict[StatKey, int]:
+        """Lire les compteurs ; table pas encore construite (ensure_built) : recalcul en lecture seule"""
+        counters = self.read(db, day)
+        if INITIALIZED_KEY not in counters:
+            return dict(self.compute(db))
+        return counters
+
+# Instance globale du repository
+task_stats_repository = TaskStatsRepository()
+
+# Variante asynchrone (AsyncSession)
+async_task_stats_repository = AsyncBaseRepository(task_stats_repository)
@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional
 from datetime import datetime
 
+# Champs de CategoryResponse accessibles par fields=
+CATEGORY_FIELDS = ("id", "name", "description", "color", "created_at", "updated_at", "tasks_count")
+
 class CategoryBase(BaseModel):
     name: str = Field(
         ..., 
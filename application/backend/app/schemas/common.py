@@ -6,12 +6,16 @@ T = TypeVar('T')
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    # None en mode "cursor" sans with_total=true (pas de COUNT)
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    # Curseurs opaques (mode de pagination "cursor" uniquement)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class MessageResponse(BaseModel):
     message: str
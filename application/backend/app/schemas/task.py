@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime, date
 from app.models.task import TaskPriority, TaskStatus
 from .category import CategoryResponse
@@ -106,6 +106,7 @@ class TaskResponse(BaseModel):
     is_overdue: bool
     days_until_due: int
     position: int
+    rank: Optional[str] = None
     
     # Relation avec la catégorie incluse
     category: CategoryResponse
@@ -133,7 +134,7 @@ class TaskSort(BaseModel):
     """Schéma pour le tri des tâches"""
     sort_by: str = Field(
         default="due_date",
-        pattern=r"^(title|priority|due_date|created_at|status|position)$",
+        pattern=r"^(title|priority|due_date|created_at|status|position|rank)$",
         description="Champ de tri"
     )
     sort_order: str = Field(
@@ -153,6 +154,91 @@ class TaskBulkUpdate(BaseModel):
             raise ValueError('Le nombre de positions doit correspondre au nombre de tâches')
         return v
 
+class TaskBulkCreate(BaseModel):
+    """Schéma pour la création en lot (chaque élément est validé comme TaskCreate)"""
+    tasks: List[Dict[str, Any]] = Field(..., min_items=1, max_items=1000)
+
+class TaskBulkItemResult(BaseModel):
+    """Résultat de la création d'un élément du lot"""
+    index: int
+    success: bool
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+    code: Optional[str] = None
+
+class TaskBulkCreateResponse(BaseModel):
+    """Schéma de réponse de la création en lot"""
+    created: int
+    failed: int
+    results: List[TaskBulkItemResult]
+
+class TaskImportRecord(BaseModel):
+    """
+    Ligne d'un import (CSV ou NDJSON) : la catégorie est désignée par son nom
+    (créée si besoin) ou par son ID. Les colonnes inconnues sont ignorées (un
+    export peut être réimporté) ; l'échéance peut être passée.
+    """
+    title: str = Field(..., max_length=200)
+    description: Optional[str] = Field(None, max_length=1000)
+    priority: TaskPriority = TaskPriority.MOYENNE
+    status: TaskStatus = TaskStatus.EN_COURS
+    due_date: datetime
+    completed_at: Optional[datetime] = None
+    category: Optional[str] = Field(None, max_length=50)
+    category_id: Optional[int] = Field(None, gt=0)
+
+    @validator('*', pre=True)
+    def empty_as_missing(cls, v):
+        """Cellules CSV vides : valeur absente"""
+        return None if v == "" else v
+
+    @validator('priority', pre=True)
+    def default_priority(cls, v):
+        return v or TaskPriority.MOYENNE
+
+    @validator('status', pre=True)
+    def default_status(cls, v):
+        return v or TaskStatus.EN_COURS
+
+    @validator('title')
+    def validate_title(cls, v):
+        title_clean = v.strip()
+        if len(title_clean) < 3:
+            raise ValueError('Le titre doit contenir au moins 3 caractères')
+        return title_clean
+
+    @validator('category')
+    def validate_category_name(cls, v):
+        return v.strip() if v else v
+
+    @validator('category_id', always=True)
+    def validate_category(cls, v, values):
+        if v is None and not values.get('category'):
+            raise ValueError('La catégorie (category ou category_id) est obligatoire')
+        return v
+
+class TaskImportError(BaseModel):
+    """Ligne rejetée par un import (numéro de l'enregistrement, à partir de 1)"""
+    record: int
+    error: str
+
+class TaskImportReport(BaseModel):
+    """Bilan d'un import"""
+    received: int
+    imported: int
+    failed: int
+    categories_created: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    # Premières erreurs seulement (voir `failed` pour le total)
+    errors: List[TaskImportError]
+
+class TaskMove(BaseModel):
+    """Schéma pour déplacer une tâche entre deux voisines (drag & drop)"""
+    after_id: Optional[int] = Field(None, gt=0, description="Tâche qui précédera la tâche déplacée")
+    before_id: Optional[int] = Field(None, gt=0, description="Tâche qui suivra la tâche déplacée")
+
 class TaskStatistics(BaseModel):
     """Schéma pour les statistiques des tâches"""
     total: int
@@ -0,0 +1,142 @@
+"""
+Lignes de réponse légères pour les listes de tâches (sans ORM ni Pydantic)
+
+Les listes sont lues colonne par colonne (TASK_ROW_COLUMNS) puis converties en
+objets à __slots__, sérialisés directement par FastJSONResponse. Le format
+produit est celui de TaskResponse ; les champs calculés utilisent une seule
+horloge par requête (RequestClock) au lieu d'un datetime.now() par champ.
+Les catégories imbriquées viennent du registre (category_registry.payloads) :
+un même dictionnaire est partagé par toutes les tâches d'une catégorie.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app.models.task import TaskStatus, as_utc, urgency_boundary
+
+# Champs de TaskResponse lus en base, dans l'ordre de la réponse
+TASK_ROW_FIELDS = (
+    "id", "title", "description", "priority", "due_date", "category_id", "status",
+    "created_at", "updated_at", "completed_at", "position", "rank",
+)
+
+# Champs calculés et colonnes dont ils dépendent
+TASK_COMPUTED_FIELDS = {
+    "is_urgent": ("due_date", "status"),
+    "is_overdue": ("due_date", "status"),
+    "days_until_due": ("due_date",),
+}
+# Champs accessibles par fields= (la catégorie imbriquée relève de include=)
+TASK_FIELDS = TASK_ROW_FIELDS + tuple(TASK_COMPUTED_FIELDS)
+
+class RequestClock:
+    """Instant de référence unique pour tous les champs calculés d'une réponse"""
+    __slots__ = ("now", "today", "urgency_boundary")
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or datetime.now(timezone.utc)
+        self.today = self.now.date()
+        self.urgency_boundary = urgency_boundary(self.now)
+
+def _deadline_fields(due_date: datetime, status: TaskStatus, clock: RequestClock) -> Tuple[bool, bool, int]:
+    """is_urgent, is_overdue et days_until_due (mêmes règles que le modèle Task)"""
+    due_date = as_utc(due_date)
+    is_open = status != TaskStatus.TERMINEE
+    return (
+        is_open and due_date < clock.urgency_boundary,
+        is_open and due_date < clock.now,
+        (due_date.date() - clock.today).days,
+    )
+
+class TaskRow:
+    """Tâche d'une liste (format TaskResponse)"""
+    __slots__ = TASK_ROW_FIELDS + ("is_urgent", "is_overdue", "days_until_due", "category")
+
+    def __init__(self, values: Sequence[Any], clock: RequestClock, category: Optional[Dict[str, Any]]):
+        # Lecture par position : l'accès par nom aux lignes SQLAlchemy est bien plus lent
+        (
+            self.id, self.title, self.description, self.priority, self.due_date, self.category_id,
+            self.status, self.created_at, self.updated_at, self.completed_at, self.position, self.rank
+        ) = values
+        self.is_urgent, self.is_overdue, self.days_until_due = _deadline_fields(
+            self.due_date, self.status, clock
+        )
+        self.category = category
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "priority": self.priority,
+            "due_date": self.due_date,
+            "category_id": self.category_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "completed_at": self.completed_at,
+            "is_urgent": self.is_urgent,
+            "is_overdue": self.is_overdue,
+            "days_until_due": self.days_until_due,
+            "position": self.position,
+            "rank": self.rank,
+            "category": self.category,
+        }
+
+def build_task_rows(
+    rows: Iterable[Sequence[Any]],
+    categories: Mapping[int, Dict[str, Any]],
+    clock: Optional[RequestClock] = None
+) -> List[TaskRow]:
+    """Convertir des lignes (colonnes TASK_ROW_FIELDS) en TaskRow avec leur catégorie"""
+    clock = clock or RequestClock()
+    category_index = TASK_ROW_FIELDS.index("category_id")
+    return [TaskRow(row, clock, categories.get(row[category_index])) for row in rows]
+
+class TaskFieldSet:
+    """
+    Champs demandés (fields=) et relations incluses (include=) d'une liste de tâches.
+    
+    Seules les colonnes nécessaires aux champs demandés sont lues ; la
+    catégorie n'est ajoutée (depuis le registre) que si elle est incluse.
+    """
+    __slots__ = ("fields", "include_category")
+
+    def __init__(self, fields: Sequence[str], include_category: bool = False):
+        self.fields = tuple(fields)
+        self.include_category = include_category
+
+    def columns(self, required: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Colonnes à lire (required : colonnes imposées, par exemple pour le curseur)"""
+        needed = set(required)
+        for field in self.fields:
+            needed.update(TASK_COMPUTED_FIELDS.get(field, (field,)))
+        if self.include_category:
+            needed.add("category_id")
+        return tuple(column for column in TASK_ROW_FIELDS if column in needed)
+
+    def build(
+        self,
+        rows: Iterable[Sequence[Any]],
+        columns: Sequence[str],
+        categories: Optional[Mapping[int, Dict[str, Any]]] = None,
+        clock: Optional[RequestClock] = None
+    ) -> List[Dict[str, Any]]:
+        """Construire les éléments réduits aux champs demandés (dans l'ordre demandé)"""
+        clock = clock or RequestClock()
+        # Seuls les champs calculés demandés sont évalués : days_until_due ne lit pas status
+        with_status = any(field in ("is_urgent", "is_overdue") for field in self.fields)
+        with_days = "days_until_due" in self.fields
+        result = []
+        for row in rows:
+            values = dict(zip(columns, row))
+            if with_status:
+                values["is_urgent"], values["is_overdue"], values["days_until_due"] = _deadline_fields(
+                    values["due_date"], values["status"], clock
+                )
+            elif with_days:
+                values["days_until_due"] = (as_utc(values["due_date"]).date() - clock.today).days
+            item = {field: values[field] for field in self.fields}
+            if self.include_category:
+                item["category"] = categories.get(values["category_id"])
+            result.append(item)
+        return result
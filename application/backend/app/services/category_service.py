@@ -1,28 +1,45 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.repositories.category_repository import category_repository
+from app.repositories.category_registry import category_registry
+from app.repositories.task_stats_repository import task_stats_repository, CATEGORIES_VERSION_KEY
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.core.async_bridge import AsyncBridge
+from app.core.cache import response_cache, TASKS_NAMESPACE, CATEGORIES_NAMESPACE
+from app.core.etag import make_etag
 from app.core.exceptions import NotFoundException, ConflictException, BusinessLogicException
 
 class CategoryService:
     def __init__(self):
         self.repository = category_repository
+        self.stats_repo = task_stats_repository
 
-    def get_all_categories(self, db: Session) -> List[CategoryResponse]:
-        categories_with_counts = self.repository.get_with_task_counts(db)
-        
-        result = []
-        for category, tasks_count in categories_with_counts:
-            category_data = {
-                **category.__dict__,
-                'tasks_count': tasks_count or 0
-            }
-            # Enlever les clés SQLAlchemy internes
-            category_data.pop('_sa_instance_state', None)
-            result.append(CategoryResponse(**category_data))
-        
-        return result
+    def get_etag(self, db: Session, resource: str, variant: str = "") -> str:
+        """ETag des lectures de catégories (tasks_count dépend aussi des tâches)"""
+        versions = self.stats_repo.get_versions(db)
+        return make_etag(resource, variant, versions.get("tasks"), versions.get("categories"))
+
+    def get_all_categories(self, db: Session, version: Optional[str] = None) -> List[CategoryResponse]:
+        return response_cache.get_or_set(
+            CATEGORIES_NAMESPACE, ("all", version), lambda: self._load_all_categories(db)
+        )
+
+    def get_category_fields(
+        self,
+        db: Session,
+        fields: Tuple[str, ...],
+        version: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Catégories réduites aux champs demandés (seules ces colonnes sont lues)"""
+        return response_cache.get_or_set(
+            CATEGORIES_NAMESPACE, ("fields", fields, version),
+            lambda: [dict(zip(fields, row)) for row in self.repository.get_rows(db, fields)]
+        )
+
+    def _load_all_categories(self, db: Session) -> List[CategoryResponse]:
+        # tasks_count est dénormalisé sur la catégorie : ni jointure ni GROUP BY
+        return [CategoryResponse.from_orm(category) for category in self.repository.get_all_ordered(db)]
 
     def get_category_by_id(self, db: Session, category_id: int) -> CategoryResponse:
         """Récupérer une catégorie par son ID"""
@@ -42,7 +59,10 @@ class CategoryService:
         
         # Créer la catégorie
         category_dict = category_data.dict()
+        self.stats_repo.bump_version(db, CATEGORIES_VERSION_KEY)
         new_category = self.repository.create(db, category_dict)
+        response_cache.invalidate(CATEGORIES_NAMESPACE)
+        category_registry.invalidate()
         
         return CategoryResponse.from_orm(new_category)
 
@@ -63,7 +83,11 @@ class CategoryService:
         
         # Mettre à jour
         update_dict = category_data.dict(exclude_unset=True)
+        self.stats_repo.bump_version(db, CATEGORIES_VERSION_KEY)
         updated_category = self.repository.update(db, category, update_dict)
+        # Les tâches embarquent leur catégorie : les deux espaces sont invalidés
+        response_cache.invalidate(CATEGORIES_NAMESPACE, TASKS_NAMESPACE)
+        category_registry.invalidate()
         
         return CategoryResponse.from_orm(updated_category)
 
@@ -81,7 +105,28 @@ class CategoryService:
                 code="CATEGORY_HAS_TASKS"
             )
         
-        return self.repository.delete(db, category_id)
+        self.stats_repo.bump_version(db, CATEGORIES_VERSION_KEY)
+        deleted = self.repository.delete(db, category_id)
+        response_cache.invalidate(CATEGORIES_NAMESPACE)
+        category_registry.invalidate()
+        return deleted
+
+    def verify_task_counts(self, db: Session) -> list:
+        """Lister les catégories dont tasks_count diverge du nombre réel de tâches"""
+        return self.repository.get_task_count_mismatches(db)
+
+    def reconcile_task_counts(self, db: Session) -> int:
+        """Recalculer les tasks_count divergents ; retourne le nombre de catégories corrigées"""
+        fixed = self.repository.reconcile_task_counts(db)
+        if fixed:
+            self.stats_repo.bump_version(db, CATEGORIES_VERSION_KEY)
+        db.commit()
+        response_cache.invalidate(CATEGORIES_NAMESPACE, TASKS_NAMESPACE)
+        category_registry.invalidate_counts()
+        return fixed
 
 # Instance globale du service
-category_service = CategoryService()
\ No newline at end of file
+category_service = CategoryService()
+
+# Variante asynchrone du service (endpoints async def)
+async_category_service = AsyncBridge(category_service)
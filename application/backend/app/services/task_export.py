@@ -0,0 +1,142 @@
+"""
+Export des tâches en flux (NDJSON ou CSV)
+
+Les tâches filtrées sont lues par lots via un curseur côté serveur
+(yield_per / stream_results) et chaque lot est encodé puis envoyé aussitôt :
+la mémoire utilisée ne dépend pas du nombre de tâches exportées, et aucun
+count() n'est nécessaire. La compression gzip est faite au fil de l'eau.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Union
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.exceptions import ValidationException
+from app.repositories.task_repository import task_repository
+from app.schemas.task import TaskFilter
+from app.schemas.task_rows import TASK_FIELDS, RequestClock, TaskFieldSet
+
+# Formats d'export et types de contenu
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# gzip (en-tête et somme de contrôle) plutôt que zlib brut
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+Chunks = Union[Iterator[bytes], AsyncIterator[bytes]]
+
+def _csv_value(value: Any) -> Any:
+    """Valeur d'une cellule CSV (mêmes représentations que le JSON)"""
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _ndjson_lines(items: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(item, option=orjson.OPT_UTC_Z) + b"\n" for item in items)
+
+def _csv_lines(items: List[Dict[str, Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for item in items:
+        writer.writerow([_csv_value(value) for value in item.values()])
+    return buffer.getvalue().encode("utf-8")
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(TASK_FIELDS)
+    return buffer.getvalue().encode("utf-8")
+
+class TaskExporter:
+    """Flux d'export des tâches filtrées, par lots de `chunk_size` lignes"""
+
+    def __init__(self, repository: Any, chunk_size: int = 1000):
+        self.repository = repository
+        self.chunk_size = chunk_size
+        # Tous les champs de TaskResponse sauf la catégorie imbriquée (format plat)
+        self.fieldset = TaskFieldSet(TASK_FIELDS)
+        self.columns = self.fieldset.columns()
+
+    def stream(
+        self,
+        db: Any,
+        filters: TaskFilter,
+        export_format: str = "ndjson",
+        compress: bool = False
+    ) -> Chunks:
+        """
+        Corps de la réponse d'export, pour une StreamingResponse.
+
+        Session : itérateur synchrone (parcouru dans le threadpool par Starlette) ;
+        AsyncSession : itérateur asynchrone sur AsyncSession.stream().
+        La session doit rester ouverte jusqu'à la fin de l'envoi.
+        """
+        if export_format not in EXPORT_MEDIA_TYPES:
+            raise ValidationException(
+                f"Format d'export inconnu : {export_format} (formats : {', '.join(EXPORT_MEDIA_TYPES)})",
+                code="INVALID_EXPORT_FORMAT"
+            )
+        encode = _ndjson_lines if export_format == "ndjson" else _csv_lines
+        header = _csv_header() if export_format == "csv" else b""
+
+        sync_db = db.sync_session if isinstance(db, AsyncSession) else db
+        statement = self.repository.export_query(sync_db, filters, self.columns).statement
+        statement = statement.execution_options(yield_per=self.chunk_size)
+
+        if isinstance(db, AsyncSession):
+            chunks = self._async_chunks(db, statement, encode, header)
+            return self._async_gzip(chunks) if compress else chunks
+        chunks = self._chunks(db, statement, encode, header)
+        return self._gzip(chunks) if compress else chunks
+
+    def _encode(self, rows: Iterable[Any], clock: RequestClock, encode: Callable) -> bytes:
+        return encode(self.fieldset.build(rows, self.columns, clock=clock))
+
+    def _chunks(self, db: Any, statement: Any, encode: Callable, header: bytes) -> Iterator[bytes]:
+        clock = RequestClock()
+        if header:
+            yield header
+        for rows in db.execute(statement).partitions():
+            yield self._encode(rows, clock, encode)
+
+    async def _async_chunks(self, db: AsyncSession, statement: Any, encode: Callable, header: bytes) -> AsyncIterator[bytes]:
+        clock = RequestClock()
+        if header:
+            yield header
+        result = await db.stream(statement)
+        async for rows in result.partitions():
+            yield self._encode(rows, clock, encode)
+
+    @staticmethod
+    def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    async def _async_gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+# Instance globale de l'export
+task_exporter = TaskExporter(task_repository, chunk_size=settings.EXPORT_CHUNK_SIZE)
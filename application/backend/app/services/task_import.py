@@ -0,0 +1,330 @@
+"""
+Import des tâches en flux (CSV ou NDJSON)
+
+Le contenu est lu par morceaux et découpé en lots de taille fixe : la mémoire
+utilisée ne dépend pas de la taille du fichier. Chaque lot est traité dans sa
+propre transaction :
+- validation des lignes (TaskImportRecord), les lignes invalides sont signalées ;
+- résolution des noms de catégories en une requête, création des manquantes ;
+- chargement par COPY (PostgreSQL) ou executemany (SQLite), sans RETURNING ;
+- compteurs task_stats et tasks_count mis à jour en une requête chacun.
+Les lots déjà validés restent importés si un lot suivant échoue.
+"""
+import codecs
+import csv
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.core.async_bridge import AsyncBridge
+from app.core.cache import response_cache, TASKS_NAMESPACE, CATEGORIES_NAMESPACE
+from app.core.exceptions import BusinessLogicException, ValidationException
+from app.core.ranking import KEY_WIDTH, keys_after
+from app.models.task import TaskStatus, as_utc, urgency_boundary
+from app.repositories.category_registry import category_registry
+from app.repositories.category_repository import category_repository
+from app.repositories.task_repository import task_repository
+from app.repositories.task_stats_repository import task_stats_repository
+from app.schemas.task import TaskImportError, TaskImportRecord, TaskImportReport
+from app.services.task_service import task_service
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Erreurs détaillées conservées dans le bilan (les suivantes sont seulement comptées)
+MAX_REPORTED_ERRORS = 100
+
+# (numéro de l'enregistrement, contenu brut ou message d'erreur de lecture)
+Record = Tuple[int, Any]
+
+class RecordReader:
+    """
+    Découpage incrémental d'un flux d'octets en enregistrements.
+
+    feed() reçoit des morceaux de taille quelconque et retourne les
+    enregistrements complets ; seule la dernière ligne incomplète est gardée.
+    En CSV, un champ entre guillemets peut contenir des retours à la ligne.
+    """
+
+    def __init__(self, import_format: str):
+        self.format = import_format
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._partial = ""
+        self._header: Optional[List[str]] = None
+        self._count = 0
+
+    def feed(self, data: bytes) -> List[Record]:
+        self._pending += self._decoder.decode(data)
+        *lines, self._pending = self._pending.split("\n")
+        return self._parse(lines)
+
+    def close(self) -> List[Record]:
+        lines = [self._pending + self._decoder.decode(b"", final=True)]
+        self._pending = ""
+        records = self._parse(lines)
+        if self._partial:
+            # Guillemet jamais refermé
+            self._count += 1
+            records.append((self._count, "Enregistrement CSV incomplet (guillemet non fermé)"))
+            self._partial = ""
+        return records
+
+    def _parse(self, lines: List[str]) -> List[Record]:
+        records = []
+        for line in lines:
+            if self.format == "csv":
+                line = self._partial + line
+                # Nombre impair de guillemets : le champ continue à la ligne suivante
+                if line.count('"') % 2:
+                    self._partial = line + "\n"
+                    continue
+                self._partial = ""
+            line = line.rstrip("\r")
+            if not line.strip():
+                continue
+            if self.format == "ndjson":
+                self._count += 1
+                try:
+                    records.append((self._count, orjson.loads(line)))
+                except orjson.JSONDecodeError:
+                    records.append((self._count, "Ligne JSON invalide"))
+                continue
+            try:
+                values = next(csv.reader([line]))
+            except csv.Error as exc:
+                # Ligne illisible (octet NUL...) : l'enregistrement est rejeté, l'import continue
+                if self._header is None:
+                    raise ValidationException(f"En-tête CSV illisible : {exc}", code="INVALID_IMPORT_FORMAT")
+                self._count += 1
+                records.append((self._count, f"Ligne CSV illisible : {exc}"))
+                continue
+            if self._header is None:
+                self._header = [name.strip() for name in values]
+                continue
+            self._count += 1
+            records.append((self._count, dict(zip(self._header, values))))
+        return records
+
+class TaskImport:
+    """État d'un import en cours : lecture, lots en attente, attribution des rangs et bilan"""
+
+    def __init__(self, import_format: str, chunk_size: int):
+        self.reader = RecordReader(import_format)
+        self.chunk_size = chunk_size
+        self._batch: List[Record] = []
+        self.ranked = True
+        self.received = 0
+        self.imported = 0
+        self.failed = 0
+        self.categories_created = 0
+        self.batches = 0
+        self.errors: List[TaskImportError] = []
+        self.started = time.perf_counter()
+
+    def feed(self, data: bytes) -> List[List[Record]]:
+        """Lots complets prêts à être importés"""
+        return self._batches(self.reader.feed(data))
+
+    def close(self) -> List[List[Record]]:
+        """Derniers lots (fin du flux)"""
+        batches = self._batches(self.reader.close())
+        if self._batch:
+            batches.append(self._batch)
+            self._batch = []
+        return batches
+
+    def _batches(self, records: List[Record]) -> List[List[Record]]:
+        batches = []
+        for record in records:
+            self._batch.append(record)
+            if len(self._batch) >= self.chunk_size:
+                batches.append(self._batch)
+                self._batch = []
+        return batches
+
+    def reject(self, record: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(TaskImportError(record=record, error=error))
+
+    def report(self) -> TaskImportReport:
+        elapsed = time.perf_counter() - self.started
+        return TaskImportReport(
+            received=self.received,
+            imported=self.imported,
+            failed=self.failed,
+            categories_created=self.categories_created,
+            batches=self.batches,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(self.received / elapsed, 1) if elapsed else 0.0,
+            errors=self.errors
+        )
+
+class TaskImporter:
+    """Import des tâches par lots (un lot = une transaction)"""
+
+    def __init__(self, chunk_size: int = 5000):
+        self.chunk_size = chunk_size
+        self.task_repo = task_repository
+        self.category_repo = category_repository
+        self.stats_repo = task_stats_repository
+        self.categories = category_registry
+
+    def begin(self, import_format: str = "csv") -> TaskImport:
+        """Démarrer un import (le format est vérifié avant toute lecture)"""
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationException(
+                f"Format d'import inconnu : {import_format} (formats : {', '.join(IMPORT_FORMATS)})",
+                code="INVALID_IMPORT_FORMAT"
+            )
+        return TaskImport(import_format, self.chunk_size)
+
+    def import_file(self, db: Session, job: TaskImport, chunks: Iterable[bytes]) -> TaskImportReport:
+        """Importer un flux d'octets complet (scripts) ; retourne le bilan"""
+        for data in chunks:
+            for batch in job.feed(data):
+                self.import_batch(db, job, batch)
+        for batch in job.close():
+            self.import_batch(db, job, batch)
+        report = self.finish(db, job)
+        if not job.ranked:
+            # Hors requête HTTP : rééquilibrage par lots, à la suite de l'import
+            task_service.rebalance_ranks(db)
+        return report
+
+    def import_batch(self, db: Session, job: TaskImport, batch: List[Record]) -> int:
+        """Valider et charger un lot dans une transaction ; retourne le nombre de tâches importées"""
+        job.received += len(batch)
+        job.batches += 1
+
+        valid = []
+        for number, content in batch:
+            if isinstance(content, str):
+                job.reject(number, content)
+                continue
+            if not isinstance(content, dict):
+                job.reject(number, "Un enregistrement doit être un objet")
+                continue
+            try:
+                valid.append((number, TaskImportRecord(**content)))
+            except PydanticValidationError as exc:
+                job.reject(number, "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()))
+        if not valid:
+            return 0
+
+        try:
+            category_ids, existing_ids, created = self._resolve_categories(db, [record for _, record in valid])
+            rows = []
+            now = datetime.now(timezone.utc)
+            boundary = urgency_boundary(now)
+            for number, record in valid:
+                if record.category:
+                    category_id = category_ids[record.category.lower()]
+                else:
+                    category_id = record.category_id if record.category_id in existing_ids else None
+                if category_id is None:
+                    job.reject(number, f"La catégorie avec l'ID {record.category_id} n'existe pas")
+                    continue
+                completed_at = record.completed_at
+                if record.status == TaskStatus.TERMINEE and completed_at is None:
+                    completed_at = now
+                rows.append({
+                    "title": record.title,
+                    "description": record.description,
+                    "priority": record.priority,
+                    "status": record.status,
+                    "due_date": record.due_date,
+                    "completed_at": completed_at,
+                    "category_id": category_id,
+                    "urgent_flag": record.status != TaskStatus.TERMINEE and as_utc(record.due_date) < boundary,
+                })
+            if not rows:
+                db.rollback()
+                return 0
+
+            self._place(db, job, rows)
+            self.task_repo.load_rows(db, rows)
+            self.stats_repo.apply_task_changes(db, [(None, row) for row in rows])
+            deltas = Counter(row["category_id"] for row in rows)
+            self.category_repo.adjust_task_counts(db, deltas)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise BusinessLogicException(
+                f"Erreur lors de l'import du lot {job.batches} "
+                f"({job.imported} tâche(s) déjà importée(s))",
+                code="IMPORT_FAILED"
+            )
+
+        response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+        if created:
+            self.categories.invalidate()
+        else:
+            self.categories.apply_count_deltas(deltas)
+        job.categories_created += created
+        job.imported += len(rows)
+        return len(rows)
+
+    def _resolve_categories(
+        self,
+        db: Session,
+        records: List[TaskImportRecord]
+    ) -> Tuple[Dict[str, int], Set[int], int]:
+        """
+        Catégories du lot, une seule fois par lot : IDs par nom (en minuscules),
+        IDs existants parmi les category_id donnés, nombre de catégories créées.
+
+        Les noms inconnus sont créés en un INSERT multi-lignes ; les IDs sont
+        vérifiés par le registre (sans requête s'ils y sont).
+        """
+        names = {}
+        for record in records:
+            if record.category:
+                names.setdefault(record.category.lower(), record.category)
+        ids = {record.category_id for record in records if not record.category}
+
+        resolved = self.category_repo.get_ids_by_names(db, names) if names else {}
+        missing = [name for key, name in names.items() if key not in resolved]
+        if missing:
+            resolved.update(self.category_repo.create_many(db, missing))
+        existing = self.categories.existing_ids(db, ids) if ids else set()
+        return resolved, existing, len(missing)
+
+    def _place(self, db: Session, job: TaskImport, rows: List[Dict[str, Any]]) -> None:
+        """
+        Positions et rangs à la suite des tâches existantes.
+
+        Relus à chaque lot, sous le verrou des rangs (lock_ranks) : chaque lot
+        est validé séparément, des créations concurrentes ont pu s'intercaler.
+        """
+        self.stats_repo.lock_ranks(db)
+        max_position, last_rank = self.task_repo.get_append_slot(db)
+        first_position = (max_position or 0) + 1
+        ranks = keys_after(last_rank, len(rows)) if job.ranked else [None] * len(rows)
+        if job.ranked and len(ranks[-1]) > KEY_WIDTH:
+            # Espace des rangs en fin de liste épuisé : rangs attribués par un rééquilibrage différé
+            job.ranked = False
+            ranks = [None] * len(rows)
+        for offset, row in enumerate(rows):
+            row["position"] = first_position + offset
+            row["rank"] = ranks[offset]
+
+    def finish(self, db: Session, job: TaskImport) -> TaskImportReport:
+        """
+        Terminer l'import et retourner le bilan.
+
+        Si l'espace des rangs a été épuisé (job.ranked faux), les dernières tâches
+        sont sans rang : l'appelant planifie rebalance_ranks_job, hors requête.
+        """
+        return job.report()
+
+# Instance globale de l'import
+task_importer = TaskImporter(chunk_size=settings.IMPORT_CHUNK_SIZE)
+async_task_importer = AsyncBridge(task_importer)
@@ -1,22 +1,56 @@
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError as PydanticValidationError
 from datetime import datetime, timezone
 
 from app.repositories.task_repository import task_repository
 from app.repositories.category_repository import category_repository
-from app.models.task import Task
+from app.repositories.category_registry import category_registry
+from app.repositories.task_stats_repository import (
+    task_stats_repository, task_state, ALL, TASKS_VERSION_KEY,
+    DIMENSION_TOTAL, DIMENSION_STATUS, DIMENSION_PRIORITY, DIMENSION_COMPLETED_ON
+)
+from app.models.task import Task, TaskPriority, TaskStatus
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskResponse, TaskFilter, 
-    TaskSort, TaskBulkUpdate, TaskStatistics
+    TaskSort, TaskBulkUpdate, TaskStatistics,
+    TaskBulkCreate, TaskBulkCreateResponse, TaskBulkItemResult, TaskMove
+)
+from app.schemas.task_rows import TASK_ROW_FIELDS, RequestClock, TaskFieldSet, TaskRow, build_task_rows
+from app.core.pagination import encode_cursor, decode_cursor, CURSOR_NEXT, CURSOR_PREV
+from app.core.ranking import MAX_KEY_LENGTH, key_between
+from app.core.async_bridge import AsyncBridge
+from app.core.cache import response_cache, TASKS_NAMESPACE, CATEGORIES_NAMESPACE
+from app.core.etag import make_etag, time_bucket
+from app.core.exceptions import (
+    NotFoundException, ValidationException, BusinessLogicException, ConflictException, TodoException
 )
-from app.schemas.common import PaginatedResponse
-from app.core.exceptions import NotFoundException, ValidationException, BusinessLogicException
+from app.config.database import SessionLocal
+from app.config.settings import settings
+
+# Code d'erreur d'un déplacement impossible avant rééquilibrage des rangs
+RANK_REBALANCE_PENDING = "RANK_REBALANCE_PENDING"
 
 class TaskService:
     def __init__(self):
         self.task_repo = task_repository
         self.category_repo = category_repository
+        self.categories = category_registry
+        self.stats_repo = task_stats_repository
+
+    def get_etag(self, db: Session, resource: str, variant: str = "") -> str:
+        """
+        ETag des lectures de tâches, sans charger ni sérialiser les tâches.
+        
+        Les versions changent à chaque écriture ; la tranche de temps UTC
+        (ETAG_TIME_BUCKET_SECONDS) couvre les champs qui suivent l'horloge
+        (is_overdue, is_urgent, days_until_due), sans requête supplémentaire.
+        """
+        versions = self.stats_repo.get_versions(db)
+        bucket = time_bucket(datetime.now(timezone.utc), settings.ETAG_TIME_BUCKET_SECONDS)
+        return make_etag(resource, variant, versions.get("tasks"), versions.get("categories"), bucket)
 
     def get_tasks_paginated(
         self, 
@@ -24,88 +58,307 @@ class TaskService:
         filters: TaskFilter,
         sort: TaskSort,
         page: int = 1,
-        size: int = 20
-    ) -> PaginatedResponse[TaskResponse]:
-        skip = (page - 1) * size
-        tasks, total = self.task_repo.get_filtered(db, filters, sort, skip, size)
+        size: int = 20,
+        fieldset: Optional[TaskFieldSet] = None
+    ) -> Dict[str, Any]:
+        """
+        Page de tâches au format PaginatedResponse[TaskResponse].
         
-        # Mettre à jour l'urgence des tâches récupérées
-        for task in tasks:
-            task.update_urgency()
+        Lecture sans ORM : seules les colonnes de la réponse sont lues et les
+        lignes sont converties en TaskRow (sérialisées par FastJSONResponse).
+        Avec `fieldset`, les éléments sont réduits aux champs demandés.
+        """
+        skip = (page - 1) * size
+        columns = fieldset.columns() if fieldset else TASK_ROW_FIELDS
+        rows, total = self.task_repo.get_filtered(
+            db, filters, sort, skip, size,
+            columns=columns
+        )
         
         # Calculer les métadonnées de pagination
         pages = (total + size - 1) // size
-        has_next = page < pages
-        has_prev = page > 1
         
-        # Convertir en schémas de réponse
-        task_responses = [TaskResponse.from_orm(task) for task in tasks]
+        items = self._build_items(db, rows, columns, fieldset)
+        return self._page(items, total, page, size, page < pages, page > 1)
+
+    def get_tasks_by_cursor(
+        self,
+        db: Session,
+        filters: TaskFilter,
+        sort: TaskSort,
+        cursor: Optional[str] = None,
+        size: int = 20,
+        fieldset: Optional[TaskFieldSet] = None,
+        with_total: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Pagination keyset : chaque page coûte autant que la première.
         
-        return PaginatedResponse(
-            items=task_responses,
-            total=total,
-            page=page,
-            size=size,
-            pages=pages,
-            has_next=has_next,
-            has_prev=has_prev
+        total et pages restent à None sauf avec `with_total` : le comptage
+        parcourt toutes les tâches filtrées, quelle que soit la page.
+        """
+        position = None
+        backward = False
+        if cursor:
+            value, task_id, direction = decode_cursor(cursor, sort.sort_by, sort.sort_order)
+            position = (value, task_id)
+            backward = direction == CURSOR_PREV
+        
+        # Le curseur est construit sur (colonne de tri, id) : colonnes toujours lues
+        columns = fieldset.columns(required=("id", sort.sort_by)) if fieldset else TASK_ROW_FIELDS
+        rows, total, has_more = self.task_repo.get_keyset_page(
+            db, filters, sort, position, backward, size,
+            columns=columns, with_total=with_total
+        )
+        
+        # Dans le sens parcouru, "has_more" indique une page supplémentaire ;
+        # dans l'autre sens, la présence d'un curseur garantit qu'on en vient.
+        has_next = has_more if not backward else True
+        has_prev = has_more if backward else cursor is not None
+        
+        next_cursor = None
+        prev_cursor = None
+        if rows and has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                sort.sort_by, sort.sort_order, getattr(last, sort.sort_by), last.id, CURSOR_NEXT
+            )
+        if rows and has_prev:
+            first = rows[0]
+            prev_cursor = encode_cursor(
+                sort.sort_by, sort.sort_order, getattr(first, sort.sort_by), first.id, CURSOR_PREV
+            )
+        
+        return self._page(
+            self._build_items(db, rows, columns, fieldset), total, 1, size,
+            has_next=next_cursor is not None,
+            has_prev=prev_cursor is not None,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
         )
 
+    def _build_items(
+        self,
+        db: Session,
+        rows: List[Any],
+        columns: Tuple[str, ...] = TASK_ROW_FIELDS,
+        fieldset: Optional[TaskFieldSet] = None
+    ) -> List[Any]:
+        """TaskRow complètes, ou éléments réduits aux champs demandés (catégories du registre)"""
+        if fieldset is None:
+            return build_task_rows(rows, self._category_payloads(db, rows, columns))
+        categories = self._category_payloads(db, rows, columns) if fieldset.include_category else None
+        return fieldset.build(rows, columns, categories)
+
+    def _category_payloads(self, db: Session, rows: List[Any], columns: Tuple[str, ...]) -> Dict[int, Dict[str, Any]]:
+        index = columns.index("category_id")
+        return self.categories.payloads(db, {row[index] for row in rows})
+
+    def _response(self, db: Session, row: Any, category: Optional[Any] = None) -> TaskResponse:
+        """
+        TaskResponse d'une ligne (colonnes TASK_ROW_FIELDS, lue ou retournée par RETURNING).
+        
+        La catégorie vient du registre : aucune jointure ni rechargement après écriture.
+        """
+        data = TaskRow(row, RequestClock(), None).to_dict()
+        data["category"] = category or self.categories.get(db, data["category_id"])
+        return TaskResponse(**data)
+
+    @staticmethod
+    def _page(
+        items: List[Any],
+        total: Optional[int],
+        page: int,
+        size: int,
+        has_next: bool,
+        has_prev: bool,
+        next_cursor: Optional[str] = None,
+        prev_cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Corps d'une réponse paginée (mêmes champs que PaginatedResponse)"""
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": (total + size - 1) // size if total is not None else None,
+            "has_next": has_next,
+            "has_prev": has_prev,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+
     def get_task_by_id(self, db: Session, task_id: int) -> TaskResponse:
         """Récupérer une tâche par son ID avec sa catégorie"""
-        task = self.task_repo.get_with_category(db, task_id)
-        if not task:
+        row = self.task_repo.get_row(db, task_id)
+        if not row:
             raise NotFoundException(f"Tâche avec l'ID {task_id} introuvable")
         
-        # Mettre à jour l'urgence
-        task.update_urgency()
-        
-        return TaskResponse.from_orm(task)
+        # Lecture sans effet de bord : l'urgence est calculée, pas persistée
+        return self._response(db, row)
 
     def create_task(self, db: Session, task_data: TaskCreate) -> TaskResponse:
-        """Créer une nouvelle tâche avec toutes les validations"""
-        # Vérifier que la catégorie existe
-        if not self.category_repo.exists(db, task_data.category_id):
+        """
+        Créer une nouvelle tâche avec toutes les validations.
+        
+        Requêtes : verrou des rangs, position et rang (une lecture d'index),
+        INSERT ... RETURNING, compteurs, puis commit ; la réponse est construite
+        sans relecture.
+        """
+        # Vérifier que la catégorie existe (registre en mémoire, sans requête)
+        if not self.categories.exists(db, task_data.category_id):
             raise ValidationException(
                 f"La catégorie avec l'ID {task_data.category_id} n'existe pas",
                 code="INVALID_CATEGORY"
             )
         
-        # Calculer la position pour le drag & drop
-        max_position_result = db.query(func.max(Task.position)).scalar()
-        next_position = (max_position_result or 0) + 1
-        
-        # Préparer les données avec la position
+        # Calculer la position et le rang pour le drag & drop (fin de liste),
+        # attributions de rangs sérialisées jusqu'au commit (lock_ranks)
+        self.stats_repo.lock_ranks(db)
+        max_position, last_rank = self.task_repo.get_append_slot(db)
         task_dict = task_data.dict()
-        task_dict['position'] = next_position
+        task_dict['position'] = (max_position or 0) + 1
+        task_dict['rank'] = self._append_ranks(last_rank, 1)[0]
+        task_dict['status'] = TaskStatus.EN_COURS
+        task_dict['urgent_flag'] = Task(**task_dict).is_urgent
+        
+        # Créer la tâche et mettre à jour les compteurs dans la même transaction
+        created = self.task_repo.insert_returning(db, task_dict)
+        self.stats_repo.apply_task_change(db, None, task_state(created))
+        deltas = {created.category_id: 1}
+        self.category_repo.adjust_task_counts(db, deltas)
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+        self.categories.apply_count_deltas(deltas)
+        
+        return self._response(db, created)
+
+    def create_tasks_bulk(self, db: Session, bulk: TaskBulkCreate) -> TaskBulkCreateResponse:
+        """
+        Créer plusieurs tâches dans une seule transaction.
         
-        # Créer la tâche
-        new_task = self.task_repo.create(db, task_dict)
+        Les éléments invalides (schéma, catégorie inexistante) sont signalés
+        individuellement sans bloquer les autres. Le nombre de requêtes ne
+        dépend pas de la taille du lot : position et rang maximaux, INSERT
+        multi-lignes avec RETURNING, puis compteurs (catégories vérifiées et
+        servies par le registre en mémoire).
+        """
+        results: List[Optional[TaskBulkItemResult]] = [None] * len(bulk.tasks)
         
-        # Mettre à jour l'urgence
-        new_task.update_urgency()
+        valid = []
+        for index, item in enumerate(bulk.tasks):
+            try:
+                valid.append((index, TaskCreate(**item)))
+            except PydanticValidationError as exc:
+                results[index] = TaskBulkItemResult(
+                    index=index, success=False, code="VALIDATION_FAILED",
+                    error="; ".join(error["msg"] for error in exc.errors())
+                )
+        
+        # Vérifier toutes les catégories (registre ; requête seulement pour les inconnues)
+        existing_categories = self.categories.existing_ids(
+            db, {task_data.category_id for _, task_data in valid}
+        )
+        accepted = []
+        for index, task_data in valid:
+            if task_data.category_id in existing_categories:
+                accepted.append((index, task_data))
+            else:
+                results[index] = TaskBulkItemResult(
+                    index=index, success=False, code="INVALID_CATEGORY",
+                    error=f"La catégorie avec l'ID {task_data.category_id} n'existe pas"
+                )
+        
+        if accepted:
+            # Positions attribuées en bloc, à la suite des tâches existantes
+            self.stats_repo.lock_ranks(db)
+            max_position, last_rank = self.task_repo.get_append_slot(db)
+            first_position = (max_position or 0) + 1
+            ranks = self._append_ranks(last_rank, len(accepted))
+            
+            rows = []
+            for offset, (_, task_data) in enumerate(accepted):
+                task_dict = task_data.dict()
+                task_dict['position'] = first_position + offset
+                task_dict['rank'] = ranks[offset]
+                task_dict['status'] = TaskStatus.EN_COURS
+                task_dict['completed_at'] = None
+                task = Task(**task_dict)
+                task.update_urgency()
+                task_dict['urgent_flag'] = task.urgent_flag
+                rows.append(task_dict)
+            
+            deltas = Counter(row['category_id'] for row in rows)
+            try:
+                created = self.task_repo.bulk_insert(db, rows)
+                self.stats_repo.apply_task_changes(db, [(None, row) for row in rows])
+                self.category_repo.adjust_task_counts(db, deltas)
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                raise BusinessLogicException(
+                    "Erreur lors de la création des tâches en lot",
+                    code="BULK_CREATE_FAILED"
+                )
+            response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+            self.categories.apply_count_deltas(deltas)
+            
+            categories = self.categories.responses(db, deltas)
+            for (index, _), row in zip(accepted, created):
+                results[index] = TaskBulkItemResult(
+                    index=index, success=True,
+                    task=self._response(db, row, categories.get(row.category_id))
+                )
         
-        # Recharger avec la catégorie pour la réponse
-        task_with_category = self.task_repo.get_with_category(db, new_task.id)
+        return TaskBulkCreateResponse(
+            created=len(accepted),
+            failed=len(results) - len(accepted),
+            results=results
+        )
+
+    def _append_ranks(self, last_rank: Optional[str], count: int) -> List[Optional[str]]:
+        """
+        Rangs de `count` tâches ajoutées en fin de liste.
         
-        return TaskResponse.from_orm(task_with_category)
+        Au-delà de MAX_KEY_LENGTH (espace des clés épuisé), les tâches sont
+        créées sans rang : le rééquilibrage (needs_rank_rebalance) les place
+        en fin de liste, par position.
+        """
+        ranks: List[Optional[str]] = []
+        for _ in range(count):
+            rank = key_between(last_rank, None)
+            if len(rank) > MAX_KEY_LENGTH:
+                ranks.extend([None] * (count - len(ranks)))
+                break
+            ranks.append(rank)
+            last_rank = rank
+        return ranks
 
     def update_task(self, db: Session, task_id: int, task_data: TaskUpdate) -> TaskResponse:
-        """Mettre à jour une tâche existante"""
+        """
+        Mettre à jour une tâche existante.
+        
+        Requêtes : lecture verrouillée de la tâche (état avant modification,
+        pour les compteurs : deux mises à jour concurrentes ne partent pas du
+        même état), UPDATE ... RETURNING, compteurs, puis commit.
+        """
         # Vérifier l'existence de la tâche
-        task = self.task_repo.get_by_id(db, task_id)
+        task = self.task_repo.get_row(db, task_id, for_update=True)
         if not task:
             raise NotFoundException(f"Tâche avec l'ID {task_id} introuvable")
         
         # Vérifier la catégorie si elle est modifiée
-        if task_data.category_id and not self.category_repo.exists(db, task_data.category_id):
+        if task_data.category_id and not self.categories.exists(db, task_data.category_id):
             raise ValidationException(
                 f"La catégorie avec l'ID {task_data.category_id} n'existe pas",
                 code="INVALID_CATEGORY"
             )
         
-        # Préparer les données de mise à jour
-        update_dict = task_data.dict(exclude_unset=True)
+        # Préparer les données de mise à jour (les champs à null ne sont pas modifiés)
+        update_dict = {
+            field: value for field, value in task_data.dict(exclude_unset=True).items()
+            if value is not None
+        }
         
         # Logique spéciale pour le changement de statut
         if task_data.status:
@@ -116,61 +369,153 @@ class TaskService:
                 # Remettre en cours
                 update_dict['completed_at'] = None
         
-        # Mettre à jour la tâche
-        updated_task = self.task_repo.update(db, task, update_dict)
+        # Urgence calculée sur l'état final (champs modifiés ou actuels)
+        update_dict['urgent_flag'] = Task(
+            due_date=update_dict.get('due_date', task.due_date),
+            status=update_dict.get('status', task.status)
+        ).is_urgent
         
-        # Mettre à jour l'urgence
-        updated_task.update_urgency()
-        
-        # Recharger avec la catégorie
-        task_with_category = self.task_repo.get_with_category(db, updated_task.id)
+        # Mettre à jour la tâche et les compteurs dans la même transaction
+        updated = self.task_repo.update_returning(db, task_id, update_dict)
+        if updated is None:
+            db.rollback()
+            raise NotFoundException(f"Tâche avec l'ID {task_id} introuvable")
+        self.stats_repo.apply_task_change(db, task_state(task), task_state(updated))
+        deltas = {}
+        if updated.category_id != task.category_id:
+            deltas = {task.category_id: -1, updated.category_id: 1}
+            self.category_repo.adjust_task_counts(db, deltas)
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+        if deltas:
+            self.categories.apply_count_deltas(deltas)
         
-        return TaskResponse.from_orm(task_with_category)
+        return self._response(db, updated)
 
     def delete_task(self, db: Session, task_id: int) -> bool:
-        if not self.task_repo.exists(db, task_id):
+        """
+        Supprimer une tâche (DELETE ... RETURNING, compteurs, puis commit).
+        
+        Les compteurs sont décrémentés d'après la ligne effectivement supprimée :
+        une double suppression concurrente ne les décrémente qu'une fois.
+        """
+        deleted = self.task_repo.delete_returning(db, task_id)
+        if deleted is None:
             raise NotFoundException(f"Tâche avec l'ID {task_id} introuvable")
         
-        return self.task_repo.delete(db, task_id)
+        deltas = {deleted.category_id: -1}
+        self.stats_repo.apply_task_change(db, task_state(deleted), None)
+        self.category_repo.adjust_task_counts(db, deltas)
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+        self.categories.apply_count_deltas(deltas)
+        return True
 
     def complete_task(self, db: Session, task_id: int) -> TaskResponse:
-        """Marquer une tâche comme terminée"""
-        completed_task = self.task_repo.mark_as_completed(db, task_id)
-        if not completed_task:
+        """Marquer une tâche comme terminée (lecture verrouillée de l'état, UPDATE ... RETURNING, compteurs)"""
+        task = self.task_repo.get_row(db, task_id, for_update=True)
+        if not task:
             raise NotFoundException(f"Tâche avec l'ID {task_id} introuvable")
         
-        # Recharger avec la catégorie
-        task_with_category = self.task_repo.get_with_category(db, completed_task.id)
+        completed = self.task_repo.mark_as_completed(db, task_id, commit=False)
+        if completed is None:
+            # Déjà terminée : rien à écrire (verrou relâché)
+            db.rollback()
+            return self._response(db, task)
+        self.stats_repo.apply_task_change(db, task_state(task), task_state(completed))
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE)
         
-        return TaskResponse.from_orm(task_with_category)
+        return self._response(db, completed)
 
-    def get_urgent_tasks(self, db: Session) -> List[TaskResponse]:
-        urgent_tasks = self.task_repo.get_urgent_tasks(db)
-        return [TaskResponse.from_orm(task) for task in urgent_tasks]
+    def get_urgent_tasks(self, db: Session) -> List[TaskRow]:
+        return response_cache.get_or_set(
+            TASKS_NAMESPACE, ("urgent", datetime.now(timezone.utc).date()),
+            lambda: self._build_items(db, self.task_repo.get_urgent_tasks(db, columns=TASK_ROW_FIELDS))
+        )
 
-    def get_overdue_tasks(self, db: Session) -> List[TaskResponse]:
-        overdue_tasks = self.task_repo.get_overdue_tasks(db)
-        return [TaskResponse.from_orm(task) for task in overdue_tasks]
+    def get_overdue_tasks(self, db: Session) -> List[TaskRow]:
+        return response_cache.get_or_set(
+            TASKS_NAMESPACE, "overdue",
+            lambda: self._build_items(db, self.task_repo.get_overdue_tasks(db, columns=TASK_ROW_FIELDS))
+        )
 
-    def search_tasks(self, db: Session, search_term: str) -> List[TaskResponse]:
+    def search_tasks(self, db: Session, search_term: str) -> List[TaskRow]:
         if len(search_term.strip()) < 2:
             raise ValidationException(
                 "Le terme de recherche doit contenir au moins 2 caractères",
                 code="SEARCH_TOO_SHORT"
             )
         
-        found_tasks = self.task_repo.search_tasks(db, search_term.strip())
-        return [TaskResponse.from_orm(task) for task in found_tasks]
+        rows = self.task_repo.search_tasks(db, search_term.strip(), columns=TASK_ROW_FIELDS)
+        return self._build_items(db, rows)
+
+    def get_task_statistics(self, db: Session, version: Optional[str] = None) -> TaskStatistics:
+        """
+        Obtenir des statistiques complètes sur les tâches.
+        
+        Les compteurs sont lus dans la table de synthèse task_stats (taille
+        indépendante du nombre de tâches). Seuls les nombres de tâches en retard
+        et urgentes, qui dépendent de l'heure courante, sont comptés sur la table
+        des tâches.
+        
+        `version` (l'ETag de la requête) distingue les entrées en cache : un
+        corps servi sous un ETag n'est jamais plus ancien que cet ETag.
+        """
+        today = datetime.now(timezone.utc).date()
+        return response_cache.get_or_set(
+            TASKS_NAMESPACE, ("statistics", today, version),
+            lambda: self._compute_statistics(db, today)
+        )
+
+    def _compute_statistics(self, db: Session, today) -> TaskStatistics:
+        counters = self.stats_repo.get_counters(db, today)
+        overdue_count, urgent_count = self.task_repo.count_deadlines(db)
+        
+        total = counters.get((DIMENSION_TOTAL, ALL), 0)
+        completed_count = counters.get((DIMENSION_STATUS, TaskStatus.TERMINEE.name), 0)
+        completion_rate = (completed_count / total * 100) if total > 0 else 0
+        
+        by_status = {s.value: counters.get((DIMENSION_STATUS, s.name), 0) for s in TaskStatus}
+        by_priority = {p.value: counters.get((DIMENSION_PRIORITY, p.name), 0) for p in TaskPriority}
+        
+        return TaskStatistics(
+            total=total,
+            by_status={key: count for key, count in by_status.items() if count},
+            by_priority={key: count for key, count in by_priority.items() if count},
+            urgent_count=urgent_count,
+            overdue_count=overdue_count,
+            completed_today=counters.get((DIMENSION_COMPLETED_ON, today.isoformat()), 0),
+            completion_rate=round(completion_rate, 2)
+        )
+
+    def rebuild_statistics(self, db: Session) -> int:
+        """Reconstruire la table task_stats ; retourne le nombre de compteurs"""
+        count = len(self.stats_repo.rebuild(db))
+        response_cache.invalidate(TASKS_NAMESPACE)
+        return count
+
+    def verify_statistics(self, db: Session) -> list:
+        """Lister les compteurs de task_stats qui divergent du recalcul complet"""
+        return self.stats_repo.verify(db)
 
-    def get_task_statistics(self, db: Session) -> TaskStatistics:
-        """Obtenir des statistiques complètes sur les tâches"""
-        stats_data = self.task_repo.get_statistics(db)
-        return TaskStatistics(**stats_data)
+    def get_metrics(self, db: Session) -> Dict[str, Any]:
+        """Compteurs métier exposés sur /metrics (task_stats, échéances et catégories : trois requêtes)"""
+        counters = self.stats_repo.get_counters(db)
+        overdue_count, urgent_count = self.task_repo.count_deadlines(db)
+        return {
+            "tasks_by_status": {s.value: counters.get((DIMENSION_STATUS, s.name), 0) for s in TaskStatus},
+            "tasks_by_priority": {p.value: counters.get((DIMENSION_PRIORITY, p.name), 0) for p in TaskPriority},
+            "tasks_overdue": overdue_count,
+            "tasks_urgent": urgent_count,
+            "categories": self.category_repo.count(db),
+        }
 
     def reorder_tasks(self, db: Session, bulk_update: TaskBulkUpdate) -> bool:
-        # Vérifier que toutes les tâches existent
+        # Vérifier que toutes les tâches existent (une seule requête IN)
+        existing_ids = self.task_repo.get_existing_ids(db, bulk_update.task_ids)
         for task_id in bulk_update.task_ids:
-            if not self.task_repo.exists(db, task_id):
+            if task_id not in existing_ids:
                 raise NotFoundException(
                     f"Tâche avec l'ID {task_id} introuvable",
                     code="TASK_NOT_FOUND_IN_BULK"
@@ -179,7 +524,8 @@ class TaskService:
         # Créer le mapping des nouvelles positions
         position_updates = dict(zip(bulk_update.task_ids, bulk_update.positions))
         
-        # Appliquer les mises à jour
+        # Appliquer les mises à jour (la version est validée avec elles)
+        self.stats_repo.bump_version(db, TASKS_VERSION_KEY)
         success = self.task_repo.update_positions(db, position_updates)
         
         if not success:
@@ -188,12 +534,119 @@ class TaskService:
                 code="REORDER_FAILED"
             )
         
+        response_cache.invalidate(TASKS_NAMESPACE)
         return success
 
+    def move_task(self, db: Session, task_id: int, move: TaskMove) -> TaskResponse:
+        """
+        Déplacer une tâche entre deux voisines : seul son rang est réécrit.
+        
+        after_id : tâche qui la précédera ; before_id : tâche qui la suivra.
+        Avec un seul des deux, l'autre voisine est la tâche adjacente actuelle.
+        Sans rang disponible entre les voisines : ConflictException
+        (RANK_REBALANCE_PENDING), l'appelant planifie rebalance_ranks_job.
+        """
+        if move.after_id is None and move.before_id is None:
+            raise ValidationException(
+                "Indiquez la tâche précédente (after_id) ou suivante (before_id)",
+                code="INVALID_MOVE"
+            )
+        if task_id in (move.after_id, move.before_id):
+            raise ValidationException(
+                "Une tâche ne peut pas être placée à côté d'elle-même",
+                code="INVALID_MOVE"
+            )
+        
+        # Deux déplacements concurrents vers le même intervalle obtiendraient le même rang
+        self.stats_repo.lock_ranks(db)
+        try:
+            new_rank = self._rank_between_neighbours(db, task_id, move)
+            if new_rank is None or len(new_rank) > MAX_KEY_LENGTH:
+                # Voisine sans rang ou clés trop longues : jamais de rééquilibrage dans
+                # la requête, le client réessaie une fois le rééquilibrage différé terminé
+                raise ConflictException(
+                    "Rangs en cours de rééquilibrage, réessayez dans quelques instants",
+                    code=RANK_REBALANCE_PENDING
+                )
+        except TodoException:
+            # Libérer le verrou des rangs avant le rééquilibrage planifié
+            db.rollback()
+            raise
+        
+        # Tâche absente (ou supprimée entre-temps) : aucune ligne renvoyée
+        moved = self.task_repo.update_returning(db, task_id, {"rank": new_rank})
+        if moved is None:
+            db.rollback()
+            raise NotFoundException(f"Tâche avec l'ID {task_id} introuvable")
+        self.stats_repo.bump_version(db, TASKS_VERSION_KEY)
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE)
+        
+        return self._response(db, moved)
+
+    def _rank_between_neighbours(self, db: Session, task_id: int, move: TaskMove) -> Optional[str]:
+        """Rang entre les voisines demandées (None si une voisine n'a pas encore de rang)"""
+        neighbour_ids = [i for i in (move.after_id, move.before_id) if i is not None]
+        ranks = self.task_repo.get_ranks(db, neighbour_ids)
+        for neighbour_id in neighbour_ids:
+            if neighbour_id not in ranks:
+                raise NotFoundException(f"Tâche avec l'ID {neighbour_id} introuvable")
+        if any(rank is None for rank in ranks.values()):
+            return None
+        
+        if move.after_id is not None and move.before_id is not None:
+            low, high = ranks[move.after_id], ranks[move.before_id]
+        elif move.after_id is not None:
+            low = ranks[move.after_id]
+            high = self.task_repo.get_adjacent_rank(db, low, after=True, exclude_id=task_id)
+        else:
+            high = ranks[move.before_id]
+            low = self.task_repo.get_adjacent_rank(db, high, after=False, exclude_id=task_id)
+        
+        if low is not None and high is not None and low >= high:
+            raise ValidationException(
+                "La tâche précédente doit être placée avant la tâche suivante",
+                code="INVALID_MOVE"
+            )
+        return key_between(low, high)
+
+    def rebalance_ranks(self, db: Session) -> int:
+        """
+        Raccourcir et espacer régulièrement tous les rangs ; retourne le nombre de tâches.
+        
+        Réécrit toute la table (par lots) : hors requête utilisateur seulement
+        (rebalance_ranks_job, scripts).
+        """
+        count = self.task_repo.rebalance_ranks(db)
+        self.stats_repo.bump_version(db, TASKS_VERSION_KEY)
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE)
+        return count
+
     def update_all_urgency_flags(self, db: Session) -> int:
-        """Mettre à jour tous les flags d'urgence (utilitaire pour tâche cron)"""
+        """
+        Mettre à jour tous les flags d'urgence persistés (utilitaire pour tâche cron).
+        
+        Les réponses de l'API calculent l'urgence (Task.is_urgent) : le flag ne
+        sert qu'aux lecteurs directs de la base, le cache n'est pas invalidé.
+        """
         self.task_repo.update_all_urgency_flags(db)
         return self.task_repo.count(db)
 
 # Instance globale du service
-task_service = TaskService()
\ No newline at end of file
+task_service = TaskService()
+
+def needs_rank_rebalance(rank: Optional[str]) -> bool:
+    """Rang absent (espace des clés épuisé) ou devenu long : rééquilibrage à planifier"""
+    return rank is None or len(rank) > settings.RANK_REBALANCE_LENGTH
+
+def rebalance_ranks_job() -> None:
+    """Rééquilibrage des rangs en tâche de fond, avec sa propre session"""
+    db = SessionLocal()
+    try:
+        task_service.rebalance_ranks(db)
+    finally:
+        db.close()
+
+# Variante asynchrone du service (endpoints async def)
+async_task_service = AsyncBridge(task_service)
@@ -0,0 +1,132 @@
+"""
+Planificateur incrémental des flags d'urgence
+
+Le flag persisté tasks.is_urgent (Task.urgent_flag) est synchronisé à chaque
+écriture. Avec le temps, seules les tâches dont l'échéance entre dans la
+fenêtre d'urgence changent d'état : la frontière (urgency_boundary) avance d'un
+jour à minuit UTC, et chaque tick ne traite que la tranche d'échéances
+[ancienne frontière, nouvelle frontière). Une tâche urgente ne redevient pas
+non urgente avec le temps (seule une écriture peut le faire).
+"""
+import asyncio
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config.database import SessionLocal, engine
+from app.config.settings import settings
+from app.core.leader_election import create_leader_lock
+from app.models.task import urgency_boundary
+from app.repositories.task_repository import task_repository
+from app.repositories.task_stats_repository import task_stats_repository, DIMENSION_META
+
+# Dernière frontière traitée (ordinal du jour UTC), conservée entre les redémarrages
+URGENCY_BOUNDARY_KEY = (DIMENSION_META, "urgency_boundary")
+
+class UrgencyScheduler:
+    """Tâche périodique exécutée par un seul worker (leader)"""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        leader_lock: Any,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.interval_seconds = interval_seconds
+        self.leader_lock = leader_lock
+        self.session_factory = session_factory
+        self.task_repo = task_repository
+        self.stats_repo = task_stats_repository
+        self._task: Optional[asyncio.Task] = None
+        self._metrics = {
+            "leader": False,
+            "ticks": 0,
+            "errors": 0,
+            "rows_touched_last_tick": 0,
+            "rows_touched_total": 0,
+            "full_sweeps": 0,
+            "last_tick_duration_ms": 0.0,
+            "last_tick_at": None,
+        }
+
+    def tick(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Traiter les échéances entrées dans la fenêtre d'urgence ; retourne le nombre de lignes modifiées"""
+        boundary = urgency_boundary(now)
+        processed = self.stats_repo.get_value(db, URGENCY_BOUNDARY_KEY)
+        
+        if processed is None:
+            # Premier passage (ou table task_stats reconstruite) : rattrapage complet
+            marked, cleared = self.task_repo.update_all_urgency_flags(db, commit=False, now=now)
+            touched = marked + cleared
+            self._metrics["full_sweeps"] += 1
+        elif processed >= boundary.date().toordinal():
+            return 0
+        else:
+            start = datetime.combine(date.fromordinal(processed), boundary.time(), tzinfo=timezone.utc)
+            touched = self.task_repo.mark_urgent_between(db, start, boundary)
+        
+        self.stats_repo.set_value(db, URGENCY_BOUNDARY_KEY, boundary.date().toordinal())
+        db.commit()
+        return touched
+
+    def run_once(self) -> Optional[int]:
+        """Un tick si ce worker est leader (None sinon)"""
+        self._metrics["leader"] = self.leader_lock.try_acquire()
+        if not self._metrics["leader"]:
+            return None
+        
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            touched = self.tick(db)
+        except Exception:
+            db.rollback()
+            self._metrics["errors"] += 1
+            raise
+        finally:
+            db.close()
+        
+        self._metrics["ticks"] += 1
+        self._metrics["rows_touched_last_tick"] = touched
+        self._metrics["rows_touched_total"] += touched
+        self._metrics["last_tick_duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._metrics["last_tick_at"] = datetime.now(timezone.utc).isoformat()
+        return touched
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.run_once)
+            except Exception as exc:
+                print(f"⚠️ Planificateur d'urgence : {exc}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Démarrer la boucle dans la boucle d'événements courante (lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrêter la boucle et libérer le verrou de leader"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.leader_lock.release)
+        self._metrics["leader"] = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques du planificateur (lignes modifiées par tick, durée...)"""
+        return {"enabled": self._task is not None, **self._metrics}
+
+# Instance globale du planificateur
+urgency_scheduler = UrgencyScheduler(
+    interval_seconds=settings.URGENCY_SCHEDULER_INTERVAL_SECONDS,
+    leader_lock=create_leader_lock(engine, "urgency-scheduler")
+)
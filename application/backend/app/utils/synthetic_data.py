@@ -0,0 +1,274 @@
+"""
+Jeux de données synthétiques déterministes (benchmarks, reproduction de volumétrie)
+
+Un jeu de données est entièrement défini par sa spécification (DatasetSpec) :
+même graine et mêmes réglages, mêmes lignes, d'une exécution à l'autre et
+d'une machine à l'autre. Les dates sont calculées à partir d'une date de
+référence fixe (jamais datetime.now()), et chaque bloc de BLOCK_SIZE tâches a
+son propre générateur aléatoire, dérivé de la graine et du numéro de bloc :
+les blocs sont produits à la demande, sans garder le jeu entier en mémoire.
+
+Réglages :
+- categories / category_skew : nombre de catégories et exposant de la loi de
+  Zipf (0 : répartition uniforme ; 1 : la première catégorie reçoit environ
+  deux fois plus de tâches que la deuxième) ;
+- status_mix / priority_mix : poids relatifs des statuts et des priorités ;
+- due_days : écart des échéances (en jours) par rapport à la date de référence ;
+- description_length : longueur des descriptions en caractères (0 : NULL).
+"""
+import hashlib
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.ranking import spread_key, spread_step
+from app.models.category import Category
+from app.models.task import TaskPriority, TaskStatus, urgency_boundary
+from app.repositories.category_repository import category_repository
+from app.repositories.task_repository import task_repository
+from app.repositories.task_stats_repository import task_stats_repository
+
+# Date de référence par défaut : les jeux de données ne dépendent pas du jour de génération
+DEFAULT_REFERENCE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# Tâches par bloc (unité de génération et de chargement) ; en changer change les données
+BLOCK_SIZE = 10_000
+
+# Limites des colonnes (Category.name, TaskCreate.description)
+MAX_CATEGORIES = 10_000
+MAX_DESCRIPTION_LENGTH = 1000
+
+# Création des tâches jusqu'à 90 jours avant la date de référence
+CREATION_WINDOW = timedelta(days=90)
+
+WORDS = (
+    "préparer", "réviser", "envoyer", "planifier", "corriger", "valider", "rédiger", "appeler",
+    "organiser", "tester", "documenter", "livrer", "analyser", "relancer", "archiver", "former",
+    "rapport", "budget", "client", "réunion", "présentation", "facture", "contrat", "module",
+    "serveur", "migration", "sauvegarde", "formation", "courses", "rendez-vous", "dossier", "projet",
+    "équipe", "trimestre", "fournisseur", "sprint", "déploiement", "maquette", "inventaire", "audit",
+)
+
+DEFAULT_STATUS_MIX = {TaskStatus.EN_COURS: 55, TaskStatus.TERMINEE: 35, TaskStatus.REPORTEE: 10}
+DEFAULT_PRIORITY_MIX = {TaskPriority.BASSE: 30, TaskPriority.MOYENNE: 50, TaskPriority.HAUTE: 20}
+
+def _filler_text(seed: int, length: int = 64 * 1024) -> str:
+    """Texte de remplissage des descriptions (découpé à un décalage aléatoire)"""
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+def parse_mix(value: str, enum_type: Type) -> Dict[Any, float]:
+    """Poids relatifs au format "EN_COURS=60,TERMINEE=30" (noms des membres de l'enum)"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            member = enum_type[name.strip().upper()]
+            mix[member] = float(weight)
+        except (KeyError, ValueError):
+            raise ValueError(
+                f"Poids invalide : {part!r} (attendu : NOM=poids, noms : {', '.join(enum_type.__members__)})"
+            )
+    return mix
+
+def parse_range(value: str) -> Tuple[int, int]:
+    """Intervalle au format "min:max" (bornes incluses)"""
+    low, _, high = value.partition(":")
+    try:
+        bounds = (int(low), int(high or low))
+    except ValueError:
+        raise ValueError(f"Intervalle invalide : {value!r} (attendu : min:max)")
+    if bounds[0] > bounds[1]:
+        raise ValueError(f"Intervalle invalide : {value!r} (min > max)")
+    return bounds
+
+class DatasetSpec:
+    """Spécification complète d'un jeu de données (deux spécifications égales : mêmes lignes)"""
+
+    def __init__(
+        self,
+        rows: int,
+        seed: int = 42,
+        categories: int = 20,
+        category_skew: float = 1.0,
+        status_mix: Optional[Mapping[TaskStatus, float]] = None,
+        priority_mix: Optional[Mapping[TaskPriority, float]] = None,
+        due_days: Tuple[int, int] = (-60, 120),
+        description_length: Tuple[int, int] = (0, 300),
+        reference: datetime = DEFAULT_REFERENCE
+    ):
+        if rows < 0:
+            raise ValueError("Le nombre de tâches doit être positif")
+        if not 1 <= categories <= MAX_CATEGORIES:
+            raise ValueError(f"Le nombre de catégories doit être compris entre 1 et {MAX_CATEGORIES}")
+        if category_skew < 0:
+            raise ValueError("L'exposant de répartition des catégories doit être positif")
+        if description_length[0] < 0 or description_length[1] > MAX_DESCRIPTION_LENGTH:
+            raise ValueError(f"La longueur des descriptions doit être comprise entre 0 et {MAX_DESCRIPTION_LENGTH}")
+        self.rows = rows
+        self.seed = seed
+        self.categories = categories
+        self.category_skew = category_skew
+        self.status_mix = dict(status_mix or DEFAULT_STATUS_MIX)
+        self.priority_mix = dict(priority_mix or DEFAULT_PRIORITY_MIX)
+        for name, mix in (("statuts", self.status_mix), ("priorités", self.priority_mix)):
+            if any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+                raise ValueError(f"Les poids des {name} doivent être positifs et non tous nuls")
+        self.due_days = tuple(due_days)
+        self.description_length = tuple(description_length)
+        self.reference = reference
+
+    def describe(self) -> str:
+        """Résumé lisible des réglages"""
+        def mix(values):
+            return ",".join(f"{member.name}={weight:g}" for member, weight in values.items())
+        return (
+            f"rows={self.rows} seed={self.seed} categories={self.categories} skew={self.category_skew:g} "
+            f"status={mix(self.status_mix)} priority={mix(self.priority_mix)} "
+            f"due={self.due_days[0]}:{self.due_days[1]}j "
+            f"description={self.description_length[0]}:{self.description_length[1]} "
+            f"reference={self.reference.date().isoformat()}"
+        )
+
+class SyntheticDataset:
+    """Génération des catégories et des tâches d'une spécification, bloc par bloc"""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self._filler = _filler_text(spec.seed)
+        self._rank_step = spread_step(spec.rows) if spec.rows else 1
+        # Loi de Zipf : poids de la catégorie k (à partir de 1) = 1 / k^skew
+        weights = [1 / (rank ** spec.category_skew) for rank in range(1, spec.categories + 1)]
+        self._category_weights = _cumulative(weights)
+        self._statuses = list(spec.status_mix)
+        self._status_weights = _cumulative(spec.status_mix.values())
+        self._priorities = list(spec.priority_mix)
+        self._priority_weights = _cumulative(spec.priority_mix.values())
+
+    def categories(self) -> List[Dict[str, Any]]:
+        """Catégories du jeu de données, dans l'ordre des IDs (1 à categories)"""
+        rng = random.Random(f"{self.spec.seed}:categories")
+        return [
+            {
+                "name": f"Catégorie {index:0{len(str(self.spec.categories))}d}",
+                "description": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)}",
+                "color": f"#{rng.randrange(0x1000000):06x}",
+                "tasks_count": 0,
+            }
+            for index in range(1, self.spec.categories + 1)
+        ]
+
+    def blocks(self) -> Iterator[List[Dict[str, Any]]]:
+        """Tâches par blocs de BLOCK_SIZE (category_id de 1 à categories)"""
+        for start in range(0, self.spec.rows, BLOCK_SIZE):
+            yield self.block(start // BLOCK_SIZE)
+
+    def block(self, number: int) -> List[Dict[str, Any]]:
+        """Tâches d'un bloc (indépendant des autres blocs)"""
+        spec = self.spec
+        rng = random.Random(f"{spec.seed}:{number}")
+        start = number * BLOCK_SIZE
+        count = min(BLOCK_SIZE, spec.rows - start)
+        if count <= 0:
+            return []
+
+        category_ids = range(1, spec.categories + 1)
+        categories = rng.choices(category_ids, cum_weights=self._category_weights, k=count)
+        statuses = rng.choices(self._statuses, cum_weights=self._status_weights, k=count)
+        priorities = rng.choices(self._priorities, cum_weights=self._priority_weights, k=count)
+        due_low, due_high = spec.due_days[0] * 86400, spec.due_days[1] * 86400
+        length_low, length_high = spec.description_length
+        filler_end = len(self._filler) - length_high
+        creation_seconds = int(CREATION_WINDOW.total_seconds())
+        boundary = urgency_boundary(spec.reference)
+
+        tasks = []
+        for offset in range(count):
+            index = start + offset
+            status = statuses[offset]
+            due_date = spec.reference + timedelta(seconds=rng.randint(due_low, due_high))
+            created_at = spec.reference - timedelta(seconds=rng.randrange(creation_seconds))
+            length = rng.randint(length_low, length_high)
+            description = None
+            if length:
+                cut = rng.randrange(filler_end)
+                description = self._filler[cut:cut + length].strip() or None
+            completed_at = None
+            if status == TaskStatus.TERMINEE:
+                completed_at = created_at + (spec.reference - created_at) * rng.random()
+            tasks.append({
+                "title": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {index + 1}",
+                "description": description,
+                "priority": priorities[offset],
+                "status": status,
+                "due_date": due_date,
+                "completed_at": completed_at,
+                "category_id": categories[offset],
+                "urgent_flag": status != TaskStatus.TERMINEE and due_date < boundary,
+                "position": index + 1,
+                "rank": spread_key(index, self._rank_step),
+                "created_at": created_at,
+            })
+        return tasks
+
+    def fingerprint(self) -> str:
+        """Empreinte SHA-256 des données générées (comparaison entre exécutions, sans base)"""
+        digest = hashlib.sha256()
+        digest.update(repr([sorted(category.items()) for category in self.categories()]).encode())
+        for block in self.blocks():
+            for task in block:
+                digest.update(repr(tuple(task.values())).encode())
+        return digest.hexdigest()
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    total = 0.0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+def load_dataset(
+    db: Session,
+    dataset: SyntheticDataset,
+    on_block: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Charger un jeu de données dans des tables vides (un bloc = une transaction).
+
+    Les catégories générées sont rattachées aux IDs attribués par la base ;
+    les tâches passent par task_repository.load_rows (COPY sur PostgreSQL,
+    executemany ailleurs) ; task_stats et tasks_count sont tenus à jour à
+    chaque bloc. on_block reçoit le nombre de tâches chargées. Retourne le
+    nombre de tâches chargées.
+    """
+    if db.query(Category.id).first() is not None:
+        raise ValueError("La base contient déjà des catégories : le jeu de données doit être chargé dans des tables vides")
+
+    # IDs attribués par la base (séquence PostgreSQL), dans l'ordre des catégories générées
+    result = db.execute(insert(Category).returning(Category.id, sort_by_parameter_order=True), dataset.categories())
+    category_ids = [None] + result.scalars().all()
+    db.commit()
+
+    loaded = 0
+    for block in dataset.blocks():
+        for task in block:
+            task["category_id"] = category_ids[task["category_id"]]
+        task_repository.load_rows(db, block)
+        task_stats_repository.apply_task_changes(db, [(None, task) for task in block])
+        category_repository.adjust_task_counts(db, Counter(task["category_id"] for task in block))
+        db.commit()
+        loaded += len(block)
+        if on_block:
+            on_block(loaded)
+    return loaded
@@ -0,0 +1,71 @@
+"""
+Benchmark de GET /tasks/export : débit et mémoire de pointe selon le nombre de tâches
+
+Le flux est consommé comme le ferait StreamingResponse, hors couche HTTP ; la
+mémoire de pointe (tracemalloc) doit rester stable quand le nombre de tâches
+augmente, puisque seules `--chunk-size` lignes sont en mémoire à la fois.
+
+Usage : python benchmarks/bench_export.py [--sizes 10000,100000] [--chunk-size 1000] [--db /tmp/bench_export.db]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from common import insert_in_batches, open_database
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000", help="Nombres de tâches, séparés par des virgules")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Lignes lues par lot")
+    parser.add_argument("--db", default="/tmp/bench_export.db", help="Fichier SQLite")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    engine, db = open_database(args.db)
+
+    from app.models.category import Category
+    from app.models.task import Task, TaskPriority, TaskStatus
+    from app.schemas.task import TaskFilter
+    from app.services.task_export import task_exporter
+
+    task_exporter.chunk_size = args.chunk_size
+    rng = random.Random(args.seed)
+    insert_in_batches(db, Category, [{"name": "Benchmark", "color": "#007bff"}])
+    now = datetime.now()
+
+    print(f"{'Tâches':>8} {'Format':<7} {'gzip':<5} {'Octets':>12} {'Lignes/s':>10} {'Mémoire max (Mo)':>17}")
+    inserted = 0
+    for size in sizes:
+        insert_in_batches(db, Task, (
+            {
+                "title": f"Tâche {i}",
+                "description": "Lorem ipsum dolor sit amet " * rng.randint(0, 10),
+                "priority": rng.choice(list(TaskPriority)),
+                "status": rng.choice(list(TaskStatus)),
+                "due_date": now + timedelta(hours=rng.randint(-500, 2000)),
+                "category_id": 1,
+                "position": i,
+            }
+            for i in range(inserted, size)
+        ))
+        inserted = size
+        for export_format in ("ndjson", "csv"):
+            for compress in (False, True):
+                tracemalloc.start()
+                start = time.perf_counter()
+                sent = sum(len(chunk) for chunk in task_exporter.stream(db, TaskFilter(), export_format, compress))
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{size:>8} {export_format:<7} {'oui' if compress else 'non':<5} {sent:>12} "
+                      f"{size / elapsed:>10.0f} {peak / 1e6:>17.1f}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
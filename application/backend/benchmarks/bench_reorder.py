@@ -0,0 +1,75 @@
+"""
+Benchmark de PUT /tasks/reorder/ : ancienne boucle par tâche contre l'UPDATE ensembliste
+
+Usage : python benchmarks/bench_reorder.py [--sizes 10,100,500,2000] [--db /tmp/bench_reorder.db]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from common import insert_in_batches, measure, open_database, record_statements
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,500,2000", help="Tailles de liste, séparées par des virgules")
+    parser.add_argument("--db", default="/tmp/bench_reorder.db", help="Fichier SQLite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def legacy_reorder(db, repository, task_ids, positions):
+    """Implémentation historique : exists() puis get_by_id() pour chaque tâche"""
+    for task_id in task_ids:
+        repository.exists(db, task_id)
+    for task_id, position in zip(task_ids, positions):
+        task = repository.get_by_id(db, task_id)
+        if task:
+            task.position = position
+    db.commit()
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    engine, db = open_database(args.db)
+
+    from app.models.category import Category
+    from app.models.task import Task
+    from app.repositories.task_repository import task_repository
+    from app.schemas.task import TaskBulkUpdate
+    from app.services.task_service import task_service
+
+    category = Category(name="Benchmark", color="#007bff")
+    db.add(category)
+    db.commit()
+
+    due_date = datetime.now() + timedelta(days=7)
+    insert_in_batches(db, Task, (
+        {"title": f"Tâche {i}", "due_date": due_date, "category_id": category.id, "position": i}
+        for i in range(max(sizes))
+    ))
+    task_ids = [row.id for row in db.query(Task.id).order_by(Task.id)]
+    rng = random.Random(args.seed)
+
+    print(f"{'Tâches':>7} {'Implémentation':<14} {'Requêtes':>9} {'Médiane (ms)':>13}")
+    for size in sizes:
+        ids = task_ids[:size]
+        positions = list(range(size))
+        rng.shuffle(positions)
+
+        implementations = {
+            "historique": lambda: legacy_reorder(db, task_repository, ids, positions),
+            "ensembliste": lambda: task_service.reorder_tasks(
+                db, TaskBulkUpdate(task_ids=ids, positions=positions)
+            ),
+        }
+        for name, fn in implementations.items():
+            db.expunge_all()
+            with record_statements(engine) as statements:
+                fn()
+            latency = measure(lambda: (db.expunge_all(), fn()), args.repeat)
+            print(f"{size:>7} {name:<14} {len(statements):>9} {latency:>13.2f}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark de la recherche : ILIKE '%terme%' contre l'index plein texte natif
+
+Usage : python benchmarks/bench_search.py [--rows 1000000] [--db /tmp/bench_search.db]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import insert_in_batches, measure, open_database
+
+WORDS = [
+    "rapport", "client", "réunion", "facture", "révision", "projet", "garage",
+    "dentiste", "courses", "formation", "budget", "livraison", "contrat", "planning",
+    "présentation", "sauvegarde", "serveur", "migration", "recrutement", "inventaire",
+]
+# Vocabulaire de remplissage pour que chaque mot métier reste sélectif
+FILLER = [f"mot{i}" for i in range(2000)]
+TERMS = ["revis", "facture", "planning client", "mot42", "inexistant"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Nombre de tâches")
+    parser.add_argument("--db", default="/tmp/bench_search.db", help="Fichier SQLite")
+    parser.add_argument("--repeat", type=int, default=5, help="Répétitions par terme")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def generate_tasks(category_id: int, rows: int, seed: int):
+    """Tâches synthétiques (les triggers alimentent l'index FTS5 à l'insertion)"""
+    rng = random.Random(seed)
+    due = datetime(2030, 1, 1)
+    for i in range(rows):
+        yield {
+            "title": " ".join(rng.choices(FILLER, k=2) + rng.choices(WORDS, k=1)),
+            "description": " ".join(rng.choices(FILLER, k=12)) if rng.random() < 0.7 else None,
+            "due_date": due + timedelta(minutes=i),
+            "category_id": category_id,
+            "position": i,
+        }
+
+def main():
+    args = parse_args()
+    engine, db = open_database(args.db)
+
+    from sqlalchemy import or_
+    from app.models.category import Category
+    from app.models.task import Task
+    from app.repositories.search import apply_ranked_search, search_predicate
+
+    category = Category(name="Benchmark", color="#007bff")
+    db.add(category)
+    db.commit()
+
+    print(f"📦 Chargement de {args.rows} tâches dans {args.db}...")
+    start = time.perf_counter()
+    insert_in_batches(db, Task, generate_tasks(category.id, args.rows, args.seed))
+    print(f"✅ Chargement terminé en {time.perf_counter() - start:.1f}s")
+
+    print(f"\n{'Terme':<20} {'Requête':<10} {'ILIKE (ms)':>12} {'FTS (ms)':>12} {'Gain':>8}")
+    for term in TERMS:
+        pattern = f"%{term}%"
+        ilike_filter = or_(Task.title.ilike(pattern), Task.description.ilike(pattern))
+
+        scenarios = {
+            # GET /tasks/search/ : 10 meilleurs résultats
+            "search": (
+                lambda: db.query(Task.id).filter(ilike_filter).limit(10).all(),
+                lambda: apply_ranked_search(db, db.query(Task.id), term).limit(10).all(),
+            ),
+            # GET /tasks/?search= : total filtré (count) de la pagination
+            "count": (
+                lambda: db.query(Task.id).filter(ilike_filter).count(),
+                lambda: db.query(Task.id).filter(search_predicate(db, term)).count(),
+            ),
+        }
+        for name, (ilike, full_text) in scenarios.items():
+            ilike_ms = measure(ilike, args.repeat)
+            fts_ms = measure(full_text, args.repeat)
+            print(f"{term:<20} {name:<10} {ilike_ms:>12.2f} {fts_ms:>12.2f} {ilike_ms / fts_ms:>7.1f}x")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
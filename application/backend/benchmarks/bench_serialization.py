@@ -0,0 +1,87 @@
+"""
+Benchmark des listes de tâches : entités ORM + TaskResponse contre lignes projetées + orjson
+
+Mesure séparément la lecture d'une page en base et sa conversion jusqu'au
+corps JSON de la réponse (lignes sérialisées par seconde, sur un cœur), hors
+couche HTTP.
+
+Usage : python benchmarks/bench_serialization.py [--tasks 20000] [--sizes 20,100,1000] [--db /tmp/bench_serialization.db]
+"""
+import argparse
+
+from common import load_synthetic, measure, open_database
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=20_000, help="Nombre de tâches générées")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--sizes", default="20,100,1000", help="Tailles de page, séparées par des virgules")
+    parser.add_argument("--db", default="/tmp/bench_serialization.db", help="Fichier SQLite")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    engine, db = open_database(args.db)
+
+    from fastapi.responses import JSONResponse
+    from app.core.responses import FastJSONResponse
+    from app.repositories.category_registry import category_registry
+    from app.repositories.task_repository import task_repository
+    from app.schemas.common import PaginatedResponse
+    from app.schemas.task import TaskFilter, TaskResponse, TaskSort
+    from app.schemas.task_rows import TASK_ROW_FIELDS, build_task_rows
+    from app.services.task_service import task_service
+
+    load_synthetic(db, args.tasks, args.seed, categories=args.categories)
+    filters, sort = TaskFilter(), TaskSort()
+
+    def legacy_fetch(size):
+        """Chemin historique : entités Task avec joinedload(Task.category)"""
+        db.expunge_all()
+        return task_repository.get_filtered(db, filters, sort, 0, size)
+
+    def legacy_serialize(result, size):
+        """TaskResponse par ligne (from_attributes), puis JSONResponse (json de la bibliothèque standard)"""
+        tasks, total = result
+        page = PaginatedResponse[TaskResponse](
+            items=[TaskResponse.model_validate(task) for task in tasks],
+            total=total, page=1, size=size, pages=(total + size - 1) // size,
+            has_next=total > size, has_prev=False
+        )
+        return JSONResponse(page.model_dump(mode="json")).body
+
+    def projected_fetch(size):
+        """Colonnes de la réponse seulement, catégories servies par le registre"""
+        return task_repository.get_filtered(db, filters, sort, 0, size, columns=TASK_ROW_FIELDS)
+
+    def projected_serialize(result, size):
+        """TaskRow (__slots__, une horloge par requête), puis FastJSONResponse (orjson)"""
+        rows, total = result
+        categories = category_registry.payloads(db, {row.category_id for row in rows})
+        page = task_service._page(build_task_rows(rows, categories), total, 1, size, total > size, False)
+        return FastJSONResponse(page).body
+
+    implementations = {
+        "historique": (legacy_fetch, legacy_serialize),
+        "projection": (projected_fetch, projected_serialize),
+    }
+    print(f"{'Lignes':>7} {'Implémentation':<14} {'Lecture (ms)':>13} {'Sérialisation (ms)':>19} "
+          f"{'Lignes/s sérialisées':>21} {'Gain':>6}")
+    for size in sizes:
+        baseline = None
+        for name, (fetch, serialize) in implementations.items():
+            result = fetch(size)
+            fetch_latency = measure(lambda: fetch(size), args.repeat)
+            serialize_latency = measure(lambda: serialize(result, size), args.repeat)
+            throughput = size / (serialize_latency / 1000)
+            baseline = baseline or throughput
+            print(f"{size:>7} {name:<14} {fetch_latency:>13.2f} {serialize_latency:>19.2f} "
+                  f"{throughput:>21.0f} {throughput / baseline:>5.1f}x")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark de /tasks/statistics/ : ancien calcul en 7 requêtes contre l'agrégat unique
+
+Usage : python benchmarks/bench_statistics.py [--rows 200000] [--db /tmp/bench_statistics.db]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from common import load_synthetic, measure, open_database, record_statements
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000, help="Nombre de tâches")
+    parser.add_argument("--db", default="/tmp/bench_statistics.db", help="Fichier SQLite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def legacy_statistics(db, repository):
+    """Implémentation historique : une requête par compteur, tâches en retard chargées"""
+    from sqlalchemy import and_, func
+    from app.models.task import Task, TaskStatus
+
+    total_tasks = db.query(Task).count()
+    status_stats = db.query(Task.status, func.count(Task.id)).group_by(Task.status).all()
+    priority_stats = db.query(Task.priority, func.count(Task.id)).group_by(Task.priority).all()
+    urgent_count = db.query(Task).filter(Task.urgent_flag == True).count()
+    overdue_count = len(repository.get_overdue_tasks(db))
+    today = datetime.now(timezone.utc).date()
+    completed_today = db.query(Task).filter(
+        and_(Task.status == TaskStatus.TERMINEE, func.date(Task.completed_at) == today)
+    ).count()
+    completed_count = db.query(Task).filter(Task.status == TaskStatus.TERMINEE).count()
+    return total_tasks, status_stats, priority_stats, urgent_count, overdue_count, completed_today, completed_count
+
+def profile(engine, fn):
+    """(requêtes SQL, pic mémoire Python en Ko) pour un appel"""
+    tracemalloc.start()
+    with record_statements(engine) as statements:
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(statements), peak / 1024
+
+def main():
+    args = parse_args()
+    engine, db = open_database(args.db)
+
+    from app.repositories.task_repository import task_repository
+
+    print(f"📦 Chargement de {args.rows} tâches dans {args.db}...")
+    start = time.perf_counter()
+    # Échéances autour d'aujourd'hui : environ la moitié des tâches ouvertes est en retard
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    load_synthetic(db, args.rows, args.seed, due_days=(-30, 30), reference=today)
+    print(f"✅ Chargement terminé en {time.perf_counter() - start:.1f}s\n")
+
+    implementations = {
+        "historique": lambda: legacy_statistics(db, task_repository),
+        "agrégat unique": lambda: task_repository.get_statistics(db),
+    }
+    print(f"{'Implémentation':<16} {'Requêtes':>9} {'Médiane (ms)':>13} {'Pic mémoire (Ko)':>17}")
+    for name, fn in implementations.items():
+        queries, peak_kb = profile(engine, fn)
+        db.expunge_all()
+        latency = measure(lambda: (fn(), db.expunge_all()), args.repeat)
+        print(f"{name:<16} {queries:>9} {latency:>13.2f} {peak_kb:>17.0f}")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
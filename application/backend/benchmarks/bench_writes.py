@@ -0,0 +1,158 @@
+"""
+Benchmark des écritures unitaires de tâches (création, modification, fin)
+
+Compare l'enchaînement historique (vérification de la catégorie, écriture
+ORM, commit, rechargement avec jointure) aux écritures RETURNING du service
+(catégories servies par le registre) : requêtes par écriture et latences p50/p99.
+SQLite étant dans le processus, --rtt simule la latence réseau d'un serveur de
+base de données à chaque requête (c'est elle que les allers-retours évités économisent).
+
+Usage : python benchmarks/bench_writes.py [--tasks 20000] [--writes 500] [--rtt 0.5] [--db /tmp/bench_writes.db]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from common import insert_in_batches, measure_percentiles, open_database, record_statements
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=20_000, help="Nombre de tâches existantes")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=500, help="Écritures mesurées par opération")
+    parser.add_argument("--db", default="/tmp/bench_writes.db", help="Fichier SQLite")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rtt", type=float, default=0.5,
+                        help="Latence réseau simulée par requête, en millisecondes (0 : aucune)")
+    parser.add_argument("--sync", action="store_true",
+                        help="Garder la synchronisation disque de SQLite (le fsync domine alors les latences)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    engine, db = open_database(args.db)
+
+    from sqlalchemy import event, func, text
+    from app.core.cache import TASKS_NAMESPACE, CATEGORIES_NAMESPACE, response_cache
+    from sqlalchemy.orm import joinedload
+    from app.core.ranking import key_between
+    from app.models.category import Category
+    from app.models.task import Task, TaskPriority, TaskStatus
+    from app.repositories.category_registry import category_registry
+    from app.repositories.category_repository import category_repository
+    from app.repositories.task_repository import task_repository
+    from app.repositories.task_stats_repository import task_stats_repository, task_state
+    from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+    from app.services.task_service import task_service
+
+    rng = random.Random(args.seed)
+    insert_in_batches(db, Category, (
+        {"name": f"Catégorie {i}", "description": "Benchmark", "color": "#007bff"}
+        for i in range(args.categories)
+    ))
+    now = datetime.now()
+    insert_in_batches(db, Task, (
+        {
+            "title": f"Tâche {i}",
+            "priority": rng.choice(list(TaskPriority)),
+            "due_date": now + timedelta(hours=rng.randint(-500, 2000)),
+            "category_id": rng.randint(1, args.categories),
+            "position": i,
+        }
+        for i in range(args.tasks)
+    ))
+    category_repository.reconcile_task_counts(db)
+    task_stats_repository.rebuild(db)
+    db.commit()
+    category_registry.warm(db)
+
+    if not args.sync:
+        # Mesurer les allers-retours SQL, pas le fsync du commit
+        db.execute(text("PRAGMA synchronous=OFF"))
+    if args.rtt:
+        event.listen(engine, "before_cursor_execute", lambda *_: time.sleep(args.rtt / 1000))
+
+    def reload(task_id):
+        """Rechargement historique de la tâche avec sa catégorie (joinedload)"""
+        task = db.query(Task).options(joinedload(Task.category)).filter(Task.id == task_id).first()
+        return TaskResponse.model_validate(task)
+
+    def legacy_create(data):
+        category_repository.exists(db, data.category_id)
+        task_dict = data.model_dump()
+        task_dict["position"] = (db.query(func.max(Task.position)).scalar() or 0) + 1
+        task_dict["rank"] = key_between(task_repository.get_last_rank(db), None)
+        task = task_repository.create(db, task_dict, commit=False)
+        task.update_urgency()
+        task_stats_repository.apply_task_change(db, None, task_state(task))
+        category_repository.adjust_task_counts(db, {task.category_id: 1})
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+        return reload(task.id)
+
+    def legacy_update(task_id, data):
+        task = task_repository.get_by_id(db, task_id)
+        category_repository.exists(db, data.category_id)
+        before, previous_category_id = task_state(task), task.category_id
+        task = task_repository.update(db, task, data.model_dump(exclude_unset=True), commit=False)
+        task.update_urgency()
+        task_stats_repository.apply_task_change(db, before, task_state(task))
+        if task.category_id != previous_category_id:
+            category_repository.adjust_task_counts(db, {previous_category_id: -1, task.category_id: 1})
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE, CATEGORIES_NAMESPACE)
+        return reload(task_id)
+
+    def legacy_complete(task_id):
+        task = task_repository.get_by_id(db, task_id)
+        before = task_state(task)
+        task.status = TaskStatus.TERMINEE
+        task.completed_at = datetime.now(timezone.utc)
+        task.urgent_flag = False
+        task_stats_repository.apply_task_change(db, before, task_state(task))
+        db.commit()
+        response_cache.invalidate(TASKS_NAMESPACE)
+        return reload(task_id)
+
+    def new_task():
+        return TaskCreate(
+            title="Tâche mesurée", due_date=now + timedelta(days=rng.randint(1, 30)),
+            category_id=rng.randint(1, args.categories)
+        )
+
+    def new_update():
+        return TaskUpdate(title="Tâche modifiée", due_date=now + timedelta(days=rng.randint(1, 30)),
+                          category_id=rng.randint(1, args.categories))
+
+    # Tâches distinctes pour chaque fin de tâche (une tâche terminée ne s'écrit plus)
+    open_ids = iter(row.id for row in db.query(Task.id).filter(Task.status != TaskStatus.TERMINEE))
+    implementations = {
+        "historique": {
+            "création": lambda: legacy_create(new_task()),
+            "modification": lambda: legacy_update(rng.randint(1, args.tasks), new_update()),
+            "fin": lambda: legacy_complete(next(open_ids)),
+        },
+        "returning": {
+            "création": lambda: task_service.create_task(db, new_task()),
+            "modification": lambda: task_service.update_task(db, rng.randint(1, args.tasks), new_update()),
+            "fin": lambda: task_service.complete_task(db, next(open_ids)),
+        },
+    }
+
+    print(f"{'Opération':<13} {'Implémentation':<14} {'Requêtes':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'Gain p99':>9}")
+    for operation in ("création", "modification", "fin"):
+        baseline = None
+        for name, operations in implementations.items():
+            write = operations[operation]
+            with record_statements(engine) as statements:
+                write()
+            p50, p99 = measure_percentiles(write, args.writes)
+            baseline = baseline or p99
+            print(f"{operation:<13} {name:<14} {len(statements):>9} {p50:>9.2f} {p99:>9.2f} "
+                  f"{baseline / p99:>8.1f}x")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Outils communs aux benchmarks : base SQLite dédiée, chargement et mesures
+"""
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List
+
+# Ajouter le chemin racine au Python path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+def open_database(path: str, reset: bool = True):
+    """Créer une base SQLite de benchmark et retourner (engine, session)"""
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{path}")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.config.database import Base
+    from app.models.category import Category  # noqa: F401 (enregistre la table)
+    from app.models.task import Task  # noqa: F401
+    from app.models.task_stats import TaskStat  # noqa: F401
+
+    if reset and os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine, autoflush=False)()
+
+def insert_in_batches(db, model, rows, batch_size: int = 10_000) -> int:
+    """Insérer des dictionnaires par lots (executemany) ; retourne le nombre de lignes"""
+    from sqlalchemy import insert
+
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.execute(insert(model), batch)
+            count += len(batch)
+            batch.clear()
+    if batch:
+        db.execute(insert(model), batch)
+        count += len(batch)
+    db.commit()
+    return count
+
+def load_synthetic(db, rows: int, seed: int = 42, **options):
+    """
+    Charger le jeu de données synthétique commun (app.utils.synthetic_data).
+
+    Les options sont celles de DatasetSpec ; retourne la spécification chargée.
+    """
+    from app.utils.synthetic_data import DatasetSpec, SyntheticDataset, load_dataset
+
+    spec = DatasetSpec(rows=rows, seed=seed, **options)
+    load_dataset(db, SyntheticDataset(spec))
+    return spec
+
+def measure(fn: Callable, repeat: int) -> float:
+    """Latence médiane en millisecondes"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def percentile(timings: List[float], p: float) -> float:
+    """Centile p (au rang le plus proche) de mesures déjà triées"""
+    return timings[min(len(timings) - 1, int(len(timings) * p / 100))]
+
+def measure_percentiles(fn: Callable, repeat: int, percentiles=(50, 99)) -> List[float]:
+    """Latences en millisecondes aux centiles demandés (au rang le plus proche)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return [percentile(timings, p) for p in percentiles]
+
+@contextmanager
+def record_statements(engine):
+    """Enregistrer les requêtes SQL émises sur un moteur"""
+    from sqlalchemy import event
+
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
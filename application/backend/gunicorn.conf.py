@@ -0,0 +1,31 @@
+"""
+Configuration gunicorn (production)
+
+Usage : gunicorn -c gunicorn.conf.py app.main:app
+
+Les workers uvicorn écrivent leurs métriques Prometheus dans un répertoire
+partagé (PROMETHEUS_MULTIPROC_DIR) : /metrics agrège les valeurs de tous les
+workers. Le répertoire est vidé au démarrage et les fichiers des jauges d'un
+worker arrêté sont supprimés.
+"""
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Hérité par les workers : à définir avant l'import de prometheus_client
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "todo-metrics"))
+
+def on_starting(server):
+    """Repartir de métriques vides (fichiers d'une exécution précédente)"""
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+def child_exit(server, worker):
+    """Retirer les jauges "livesum" d'un worker arrêté"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
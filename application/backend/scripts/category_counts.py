@@ -0,0 +1,52 @@
+"""
+Vérification et recalcul du nombre de tâches dénormalisé des catégories (tasks_count)
+
+Usage : python scripts/category_counts.py verify|reconcile
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le chemin racine au Python path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from app.config.database import SessionLocal, engine, Base
+from app.models.task import Task  # noqa: F401 (enregistre la table)
+from app.models.task_stats import TaskStat  # noqa: F401
+from app.services.category_service import category_service
+
+def verify(db) -> int:
+    """Comparer les compteurs stockés au nombre réel de tâches"""
+    print("🔍 Vérification des compteurs tasks_count...")
+    mismatches = category_service.verify_task_counts(db)
+    if not mismatches:
+        print("✅ Les compteurs sont cohérents avec la table des tâches")
+        return 0
+
+    for category_id, name, stored, actual in mismatches:
+        print(f"   - {name} (#{category_id}) stocké={stored} réel={actual}")
+    print(f"❌ {len(mismatches)} catégorie(s) divergente(s), lancez 'reconcile'")
+    return 1
+
+def reconcile(db) -> int:
+    """Recalculer les compteurs divergents"""
+    print("🔧 Recalcul des compteurs tasks_count...")
+    fixed = category_service.reconcile_task_counts(db)
+    print(f"✅ {fixed} catégorie(s) corrigée(s)")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestion des compteurs tasks_count des catégories")
+    parser.add_argument("command", choices=["verify", "reconcile"])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        return verify(db) if args.command == "verify" else reconcile(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
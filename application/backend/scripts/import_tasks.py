@@ -0,0 +1,91 @@
+"""
+Import de tâches depuis un fichier CSV ou NDJSON (lecture en flux, par lots)
+
+Usage : python scripts/import_tasks.py fichier.csv [--format csv|ndjson] [--chunk-size 5000]
+
+Le fichier est lu par blocs : la mémoire reste constante quelle que soit sa
+taille. Les catégories désignées par leur nom sont créées si besoin.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le chemin racine au Python path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from app.config.database import SessionLocal, engine, Base
+from app.core.exceptions import BusinessLogicException, ValidationException
+from app.models.task import Task  # noqa: F401 (enregistre la table)
+from app.models.task_stats import TaskStat  # noqa: F401
+from app.services.task_import import IMPORT_FORMATS, TaskImporter
+from app.services.task_service import task_service
+from app.config.settings import settings
+
+# Taille des blocs lus dans le fichier
+READ_SIZE = 1024 * 1024
+
+def read_blocks(path: Path):
+    with path.open("rb") as handle:
+        while True:
+            data = handle.read(READ_SIZE)
+            if not data:
+                return
+            yield data
+
+def main():
+    parser = argparse.ArgumentParser(description="Import de tâches (CSV ou NDJSON)")
+    parser.add_argument("path", type=Path, help="Fichier à importer")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Format (déduit de l'extension par défaut)")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE, help="Lignes par lot")
+    args = parser.parse_args()
+
+    import_format = args.format or args.path.suffix.lstrip(".").lower()
+    if import_format == "jsonl":
+        import_format = "ndjson"
+    if not args.path.is_file():
+        print(f"❌ Fichier introuvable : {args.path}")
+        return 1
+
+    Base.metadata.create_all(bind=engine)
+    importer = TaskImporter(chunk_size=args.chunk_size)
+    db = SessionLocal()
+    try:
+        job = importer.begin(import_format)
+        print(f"📥 Import de {args.path} ({import_format}, lots de {args.chunk_size} lignes)...")
+
+        def load(batches):
+            for batch in batches:
+                importer.import_batch(db, job, batch)
+                elapsed = time.perf_counter() - job.started
+                print(
+                    f"   lot {job.batches} : {job.imported} importée(s), {job.failed} rejetée(s) "
+                    f"- {job.received / elapsed:,.0f} lignes/s"
+                )
+
+        for data in read_blocks(args.path):
+            load(job.feed(data))
+        load(job.close())
+        report = importer.finish(db, job)
+        if not job.ranked:
+            print("🔀 Espace des rangs épuisé : rééquilibrage par lots...")
+            task_service.rebalance_ranks(db)
+    except (ValidationException, BusinessLogicException) as exc:
+        print(f"❌ {exc.detail}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"✅ {report.imported} tâche(s) importée(s) sur {report.received} en {report.elapsed_seconds:.1f}s "
+          f"({report.rows_per_second:,.0f} lignes/s)")
+    if report.categories_created:
+        print(f"🏷️  {report.categories_created} catégorie(s) créée(s)")
+    if report.failed:
+        print(f"⚠️  {report.failed} ligne(s) rejetée(s) :")
+        for error in report.errors[:20]:
+            print(f"   - enregistrement {error.record} : {error.error}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
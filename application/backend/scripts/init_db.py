@@ -13,6 +13,9 @@ from sqlalchemy.orm import Session
 from app.config.database import SessionLocal, engine, Base
 from app.models.category import Category
 from app.models.task import Task, TaskPriority, TaskStatus
+from app.repositories.category_repository import category_repository
+from app.repositories.task_repository import task_repository
+from app.repositories.task_stats_repository import task_stats_repository
 from datetime import datetime, timedelta
 
 def create_tables():
@@ -129,6 +132,13 @@ def create_sample_tasks(db: Session):
         db.add(task)
     
     db.commit()
+    
+    # Les insertions directes contournent TaskService : attribuer les rangs,
+    # recalculer tasks_count et task_stats
+    task_repository.rebalance_ranks(db)
+    category_repository.reconcile_task_counts(db)
+    db.commit()
+    task_stats_repository.rebuild(db)
     print(f"✅ {len(sample_tasks)} tâches d'exemple créées")
 
 def main():
@@ -15,6 +15,9 @@ from sqlalchemy.orm import Session
 from app.config.database import SessionLocal
 from app.models.category import Category
 from app.models.task import Task, TaskPriority, TaskStatus
+from app.repositories.category_repository import category_repository
+from app.repositories.task_repository import task_repository
+from app.repositories.task_stats_repository import task_stats_repository
 
 def seed_comprehensive_data():
     """Peupler avec des données de test complètes"""
@@ -146,6 +149,13 @@ def seed_comprehensive_data():
         
         db.commit()
         
+        # Les insertions directes contournent TaskService : attribuer les rangs,
+        # recalculer tasks_count et task_stats
+        task_repository.rebalance_ranks(db)
+        category_repository.reconcile_task_counts(db)
+        db.commit()
+        task_stats_repository.rebuild(db)
+        
         print(f"✅ {len(created_tasks)} tâches de test créées avec succès")
         
         # Afficher un résumé
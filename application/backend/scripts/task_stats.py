@@ -0,0 +1,52 @@
+"""
+Vérification et reconstruction de la table de synthèse task_stats
+
+Usage : python scripts/task_stats.py verify|rebuild
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le chemin racine au Python path
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+from app.config.database import SessionLocal, engine, Base
+from app.models.category import Category  # noqa: F401 (enregistre la table)
+from app.models.task_stats import TaskStat  # noqa: F401
+from app.services.task_service import task_service
+
+def verify(db) -> int:
+    """Comparer les compteurs stockés au recalcul complet"""
+    print("🔍 Vérification des compteurs task_stats...")
+    differences = task_service.verify_statistics(db)
+    if not differences:
+        print("✅ Les compteurs sont cohérents avec la table des tâches")
+        return 0
+
+    for dimension, key, stored, expected in differences:
+        print(f"   - {dimension}:{key} stocké={stored} attendu={expected}")
+    print(f"❌ {len(differences)} compteur(s) divergent(s), lancez 'rebuild'")
+    return 1
+
+def rebuild(db) -> int:
+    """Recalculer tous les compteurs depuis la table des tâches"""
+    print("🔧 Reconstruction de task_stats...")
+    count = task_service.rebuild_statistics(db)
+    print(f"✅ {count} compteur(s) reconstruit(s)")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestion de la table task_stats")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        return verify(db) if args.command == "verify" else rebuild(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,15 @@ Configuration pytest pour les tests
 """
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.config.settings import settings
 from app.config.database import get_db, Base
+from app.core.cache import response_cache
+from app.repositories.category_registry import category_registry
 from app.models.category import Category
 from app.models.task import Task, TaskPriority
 
@@ -22,11 +25,18 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Pas de planificateur en tâche de fond pendant les tests (ticks lancés à la main)
+settings.URGENCY_SCHEDULER_ENABLED = False
+# Compteurs task_stats construits par les tests (après leurs données), pas au démarrage
+settings.TASK_STATS_BUILD_ON_STARTUP = False
+
 @pytest.fixture(scope="function")
 def db_session():
     """Fixture pour la session de base de données de test"""
-    # Créer les tables
+    # Créer les tables (et repartir d'un cache vide)
     Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    category_registry.clear()
     
     # Créer une session
     session = TestingSessionLocal()
@@ -37,6 +47,20 @@ def db_session():
         # Nettoyer après chaque test
         Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def sql_statements():
+    """Fixture pour enregistrer les requêtes SQL exécutées pendant un test"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Fixture pour le client de test FastAPI"""
@@ -82,6 +106,8 @@ def sample_task(db_session, sample_category):
     task.update_urgency()
     
     db_session.add(task)
+    # Insertion directe : compteur dénormalisé mis à jour comme le fait TaskService
+    sample_category.tasks_count += 1
     db_session.commit()
     db_session.refresh(task)
     return task
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Tests pour le cache des réponses de la couche service
+"""
+from datetime import datetime, timedelta
+
+from app.core.cache import FileInvalidationChannel, ResponseCache
+
+def test_cache_lru_eviction_and_counters():
+    """Test de l'éviction LRU et des compteurs hits/misses/evictions"""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    
+    assert cache.get_or_set("tasks", "a", lambda: 1) == 1
+    assert cache.get_or_set("tasks", "b", lambda: 2) == 2
+    assert cache.get_or_set("tasks", "a", lambda: -1) == 1  # hit, "a" devient récent
+    assert cache.get_or_set("tasks", "c", lambda: 3) == 3   # évince "b"
+    assert cache.get_or_set("tasks", "b", lambda: 4) == 4
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 2
+
+def test_cache_ttl_expiration():
+    """Test de l'expiration des entrées"""
+    cache = ResponseCache(ttl_seconds=0)
+    
+    cache.get_or_set("tasks", "a", lambda: 1)
+    assert cache.get_or_set("tasks", "a", lambda: 2) == 2
+    assert cache.stats()["expirations"] == 1
+
+def test_cache_invalidation_is_scoped_to_namespace():
+    """Test de l'invalidation d'un seul espace de noms"""
+    cache = ResponseCache()
+    
+    cache.get_or_set("tasks", "a", lambda: 1)
+    cache.get_or_set("categories", "a", lambda: 1)
+    cache.invalidate("tasks")
+    
+    assert cache.get_or_set("tasks", "a", lambda: 2) == 2
+    assert cache.get_or_set("categories", "a", lambda: 2) == 1
+
+def test_cache_value_loaded_during_invalidation_is_not_stored():
+    """Test : une valeur chargée pendant une invalidation n'est pas conservée"""
+    cache = ResponseCache()
+    
+    def loader():
+        cache.invalidate("tasks")  # écriture concurrente pendant le chargement
+        return "périmée"
+    
+    assert cache.get_or_set("tasks", "a", loader) == "périmée"
+    assert cache.get_or_set("tasks", "a", lambda: "fraîche") == "fraîche"
+
+def test_cache_cross_process_invalidation(tmp_path):
+    """Test du canal de fichiers témoins entre deux processus simulés"""
+    worker_a = ResponseCache(channel=FileInvalidationChannel(str(tmp_path)))
+    worker_b = ResponseCache(channel=FileInvalidationChannel(str(tmp_path)))
+    
+    assert worker_a.get_or_set("categories", "all", lambda: ["ancienne"]) == ["ancienne"]
+    worker_b.invalidate("categories")
+    
+    assert worker_a.get_or_set("categories", "all", lambda: ["nouvelle"]) == ["nouvelle"]
+
+def test_categories_cache_invalidated_by_task_writes(client, sample_category):
+    """Test : le nombre de tâches d'une catégorie en cache suit les créations"""
+    assert client.get("/api/v1/categories/").json()[0]["tasks_count"] == 0
+    
+    client.post("/api/v1/tasks/", json={
+        "title": "Nouvelle tâche",
+        "due_date": (datetime.now() + timedelta(days=5)).isoformat(),
+        "category_id": sample_category.id
+    })
+    
+    assert client.get("/api/v1/categories/").json()[0]["tasks_count"] == 1
@@ -1,9 +1,14 @@
 """
 Tests pour les endpoints des catégories
 """
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import status
 
+from app.models.category import Category
+from app.services.category_service import category_service
+
 def test_get_categories_empty(client):
     """Test GET /categories avec base vide"""
     response = client.get("/api/v1/categories/")
@@ -93,4 +98,66 @@ def test_delete_category_success(client, sample_category):
 def test_delete_category_with_tasks(client, sample_task):
     """Test DELETE /categories/{id} avec tâches associées"""
     response = client.delete(f"/api/v1/categories/{sample_task.category_id}")
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
\ No newline at end of file
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+def test_get_categories_conditional(client, sample_category):
+    """Test ETag / If-None-Match sur GET /categories"""
+    etag = client.get("/api/v1/categories/").headers["ETag"]
+    
+    response = client.get("/api/v1/categories/", headers={"If-None-Match": f'W/{etag}, "autre"'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    client.post("/api/v1/categories/", json={"name": "Autre catégorie", "color": "#28a745"})
+    response = client.get("/api/v1/categories/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+def test_get_categories_sparse_fields(client, sample_task, sql_statements):
+    """Test fields= sur GET /categories : colonnes lues et clés renvoyées limitées"""
+    sql_statements.clear()
+    response = client.get("/api/v1/categories/?fields=id,name")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": sample_task.category_id, "name": "Test Category"}]
+    # Sans tasks_count : ni jointure sur les tâches ni GROUP BY
+    select = [s for s in sql_statements if s.startswith("SELECT") and "FROM categories" in s][-1]
+    assert "description" not in select and "GROUP BY" not in select
+    
+    response = client.get("/api/v1/categories/?fields=tasks_count,id")
+    assert response.json() == [{"tasks_count": 1, "id": sample_task.category_id}]
+    
+    response = client.get("/api/v1/categories/?fields=id,secret")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["code"] == "INVALID_FIELDS"
+
+def test_category_tasks_count_follows_task_writes(client, db_session, sample_category, sql_statements):
+    """Test du compteur dénormalisé tasks_count : création, changement de catégorie, suppression"""
+    other = client.post("/api/v1/categories/", json={"name": "Autre", "color": "#28a745"}).json()
+    due_date = (datetime.now() + timedelta(days=5)).isoformat()
+    task = client.post("/api/v1/tasks/", json={
+        "title": "Compteur", "due_date": due_date, "category_id": sample_category.id
+    }).json()
+    client.post("/api/v1/tasks/bulk", json={"tasks": [
+        {"title": f"Lot {i}", "due_date": due_date, "category_id": other["id"]} for i in range(3)
+    ]})
+    
+    def counts():
+        return {c["id"]: c["tasks_count"] for c in client.get("/api/v1/categories/").json()}
+    
+    assert counts() == {sample_category.id: 1, other["id"]: 3}
+    client.put(f"/api/v1/tasks/{task['id']}", json={"category_id": other["id"]})
+    assert counts() == {sample_category.id: 0, other["id"]: 4}
+    client.delete(f"/api/v1/tasks/{task['id']}")
+    
+    # Les deux endpoints servent le compteur sans agrégat
+    sql_statements.clear()
+    assert client.get(f"/api/v1/categories/{other['id']}").json()["tasks_count"] == 3
+    assert counts()[other["id"]] == 3
+    assert not [s for s in sql_statements if "count(" in s.lower() and "categories" in s]
+    
+    # Réconciliation après une dérive
+    db_session.query(Category).filter(Category.id == other["id"]).update({Category.tasks_count: 42})
+    db_session.commit()
+    assert [row[2:] for row in category_service.verify_task_counts(db_session)] == [(42, 3)]
+    assert category_service.reconcile_task_counts(db_session) == 1
+    assert category_service.verify_task_counts(db_session) == []
+    assert counts()[other["id"]] == 3
@@ -0,0 +1,98 @@
+"""
+Tests des métriques Prometheus (app.core.metrics, GET /metrics)
+"""
+import os
+import subprocess
+import sys
+
+from prometheus_client import multiprocess
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import instrument_pool, render_metrics
+
+def _samples(text: str) -> dict:
+    """Échantillons de la sortie /metrics : (nom, libellés triés) -> valeur"""
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+def test_metrics_endpoint(client, sample_task):
+    """Latence par modèle de route, requêtes en cours, caches et compteurs métier"""
+    task_id = sample_task.id
+    for _ in range(2):
+        assert client.get(f"/api/v1/tasks/{task_id}").status_code == 200
+    client.get("/api/v1/tasks/statistics/")
+    client.get("/api/v1/tasks/statistics/")
+    client.get("/inconnu")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+
+    route = (("method", "GET"), ("route", "/api/v1/tasks/{task_id}"), ("status", "200"))
+    assert samples[("todo_http_request_duration_seconds_count", route)] >= 2
+    unmatched = (("method", "GET"), ("route", "<unmatched>"), ("status", "404"))
+    assert samples[("todo_http_request_duration_seconds_count", unmatched)] >= 1
+    assert not any(f"/api/v1/tasks/{task_id}" in dict(labels).get("route", "") for _, labels in samples)
+    # La requête /metrics elle-même est en cours
+    assert samples[("todo_http_requests_in_progress", (("method", "GET"),))] >= 1
+
+    assert samples[("todo_cache_lookups_total", (("cache", "responses"), ("result", "hit")))] >= 1
+    assert samples[("todo_tasks", (("status", "En cours"),))] == 1
+    assert samples[("todo_tasks", (("status", "Terminée"),))] == 0
+    assert samples[("todo_categories", ())] == 1
+
+def test_pool_gauges():
+    """Connexions utilisées et en débordement d'un QueuePool"""
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=2)
+    instrument_pool(engine, "test")
+    connections = [engine.connect() for _ in range(3)]
+    samples = _samples(render_metrics().decode())
+    assert samples[("todo_db_pool_size", (("engine", "test"),))] == 1
+    assert samples[("todo_db_pool_checked_out", (("engine", "test"),))] == 3
+    assert samples[("todo_db_pool_overflow", (("engine", "test"),))] == 2
+
+    for connection in connections:
+        connection.close()
+    samples = _samples(render_metrics().decode())
+    assert samples[("todo_db_pool_checked_out", (("engine", "test"),))] == 0
+    assert samples[("todo_db_pool_overflow", (("engine", "test"),))] == 0
+    engine.dispose()
+
+WORKER = """
+from app.core.metrics import REQUEST_LATENCY, REQUESTS_IN_PROGRESS
+REQUEST_LATENCY.labels("GET", "/api/v1/tasks/", "200").observe(0.01)
+REQUESTS_IN_PROGRESS.labels("GET").inc()
+"""
+
+def test_multiprocess_aggregation(tmp_path):
+    """Plusieurs workers (processus) : /metrics agrège les fichiers de tous les workers"""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+
+    def render() -> dict:
+        code = "import sys; from app.core.metrics import render_metrics; sys.stdout.write(render_metrics().decode())"
+        return _samples(subprocess.run(
+            [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+        ).stdout)
+
+    pids = []
+    for _ in range(2):
+        worker = subprocess.Popen([sys.executable, "-c", WORKER], env=env)
+        assert worker.wait() == 0
+        pids.append(worker.pid)
+    samples = render()
+    route = (("method", "GET"), ("route", "/api/v1/tasks/"), ("status", "200"))
+    assert samples[("todo_http_request_duration_seconds_count", route)] == 2
+    assert samples[("todo_http_requests_in_progress", (("method", "GET"),))] == 2
+
+    # Workers arrêtés (child_exit de gunicorn.conf.py) : leurs jauges "livesum" disparaissent
+    for pid in pids:
+        multiprocess.mark_process_dead(pid, str(tmp_path))
+    samples = render()
+    assert samples[("todo_http_request_duration_seconds_count", route)] == 2
+    assert ("todo_http_requests_in_progress", (("method", "GET"),)) not in samples
@@ -0,0 +1,53 @@
+"""
+Tests de la chaîne de migrations Alembic
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.config.database import Base
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+def run_alembic(connection, action, revision):
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.attributes["connection"] = connection
+    getattr(command, action)(config, revision)
+
+def test_migrations_match_models(tmp_path):
+    """upgrade head : schéma identique aux modèles, index et données migrés ; puis downgrade base"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    # Connexion sans transaction englobante : Alembic gère ses transactions
+    # (le remplissage des rangs valide ses lots en autocommit)
+    with engine.connect() as connection:
+        run_alembic(connection, "upgrade", "c3d8a6e1f2b9")
+        connection.execute(text("INSERT INTO categories (name, color) VALUES ('Travail', '#007bff')"))
+        connection.execute(text(
+            "INSERT INTO tasks (title, due_date, priority, status, position, category_id) VALUES "
+            "('Deuxième', '2030-01-01', 'MOYENNE', 'EN_COURS', 2, 1), "
+            "('Première', '2030-01-01', 'HAUTE', 'EN_COURS', 1, 1), "
+            "('Sans position', '2030-01-01', 'BASSE', 'EN_COURS', NULL, 1)"
+        ))
+        connection.commit()
+        run_alembic(connection, "upgrade", "head")
+        
+        # Seules les tables FTS5 (créées par DDL brut) sont inconnues des modèles
+        differences = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        assert [d for d in differences if not (d[0] == "remove_table" and d[1].name.startswith("tasks_fts"))] == []
+        indexes = {index["name"] for index in inspect(connection).get_indexes("tasks")}
+        assert {"ix_tasks_status_due_date", "ix_tasks_open_due_date", "ix_tasks_rank"} <= indexes
+        
+        # Rangs initiaux dans l'ordre des positions, index plein texte rempli
+        titles = connection.execute(text("SELECT title FROM tasks ORDER BY rank")).scalars().all()
+        assert titles == ["Première", "Deuxième", "Sans position"]
+        assert connection.execute(text("SELECT tasks_count FROM categories")).scalar() == 3
+        assert connection.execute(text("SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH 'premi*'")).scalar() == 1
+        
+        run_alembic(connection, "downgrade", "base")
+        assert set(inspect(connection).get_table_names()) == {"alembic_version"}
+    engine.dispose()
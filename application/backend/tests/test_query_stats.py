@@ -0,0 +1,54 @@
+"""
+Tests de l'instrumentation SQL par requête (app.core.query_stats)
+"""
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.core.query_stats import (
+    MAX_STATEMENT_LENGTH, JSONLogFormatter, QueryStatsMiddleware, current_stats, instrument_engine, remove_instrumentation
+)
+from app.main import app
+
+def _server_timing(header: str) -> dict:
+    """Métriques de l'en-tête Server-Timing : nom -> (durée, description)"""
+    metrics = {}
+    for metric in header.split(","):
+        name, *params = [part.strip() for part in metric.split(";")]
+        values = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return metrics
+
+def test_server_timing_and_log_fields(client, db_session, sample_task, sql_statements, caplog):
+    """Nombre de requêtes, temps en base et requête la plus lente : en-tête et journal"""
+    engine = db_session.get_bind()
+    path = f"/api/v1/tasks/{sample_task.id}"
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    try:
+        with TestClient(QueryStatsMiddleware(app)) as instrumented:
+            with caplog.at_level(logging.INFO, logger="app.sql"):
+                sql_statements.clear()
+                response = instrumented.get(path)
+    finally:
+        remove_instrumentation(engine)
+
+    assert response.status_code == 200
+    metrics = _server_timing(response.headers["server-timing"])
+    assert metrics["db"][1] == f"{len(sql_statements)} queries" and len(sql_statements) > 0
+    assert 0 < metrics["db-slowest"][0] <= metrics["db"][0] <= metrics["app"][0]
+
+    record = caplog.records[-1]
+    assert (record.http_method, record.http_path, record.http_status) == (
+        "GET", path, 200
+    )
+    assert record.db_queries == len(sql_statements)
+    assert record.db_slowest_statement in {
+        " ".join(statement.split())[:MAX_STATEMENT_LENGTH] for statement in sql_statements
+    }
+    assert '"db_queries":' in JSONLogFormatter().format(record)
+
+    # Hors requête HTTP et sans écouteurs : rien n'est mesuré
+    assert current_stats() is None
+    response = client.get(path)
+    assert "server-timing" not in response.headers
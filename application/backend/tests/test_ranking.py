@@ -0,0 +1,44 @@
+"""
+Tests des rangs fractionnaires (app.core.ranking)
+"""
+import random
+
+import pytest
+
+from app.core.ranking import KEY_WIDTH, key_between, keys_after, spread_keys
+
+def test_key_between_random_insertions():
+    """Insertions aléatoires : l'ordre est respecté et aucune clé ne finit par zéro"""
+    rng = random.Random(7)
+    keys = [key_between(None, None)]
+    for _ in range(2000):
+        index = rng.randint(0, len(keys))
+        before = keys[index - 1] if index > 0 else None
+        after = keys[index] if index < len(keys) else None
+        key = key_between(before, after)
+        assert before is None or before < key
+        assert after is None or key < after
+        assert not key.endswith("0")
+        keys.insert(index, key)
+    assert len(set(keys)) == len(keys)
+
+def test_appending_keeps_keys_short():
+    """Les ajouts en fin de liste avancent d'un pas fixe sans allonger les clés"""
+    keys = keys_after(None, 5000)
+    assert keys == sorted(keys)
+    assert max(len(key) for key in keys) <= 6
+
+def test_appending_after_spread_keeps_keys_short():
+    """Après un rééquilibrage, les ajouts en fin de liste ont encore de la place"""
+    keys = spread_keys(100_000)
+    appended = keys_after(keys[-1], 100_000)
+    assert max(len(key) for key in appended) <= KEY_WIDTH
+
+def test_spread_keys_and_invalid_input():
+    keys = spread_keys(1000)
+    assert keys == sorted(keys) and len(set(keys)) == 1000
+    
+    with pytest.raises(ValueError):
+        key_between("b", "a")
+    with pytest.raises(ValueError):
+        key_between("a0", None)
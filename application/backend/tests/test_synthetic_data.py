@@ -0,0 +1,64 @@
+"""
+Tests du générateur de jeux de données synthétiques (app.utils.synthetic_data)
+"""
+from collections import Counter
+
+import pytest
+
+from app.models.task import Task, TaskPriority, TaskStatus
+from app.services.category_service import category_service
+from app.services.task_service import task_service
+from app.utils.synthetic_data import BLOCK_SIZE, DatasetSpec, SyntheticDataset, load_dataset, parse_mix, parse_range
+
+def test_dataset_is_deterministic():
+    """Même spécification : mêmes lignes ; une autre graine donne d'autres lignes"""
+    spec = dict(rows=BLOCK_SIZE + 500, categories=5)
+    first = SyntheticDataset(DatasetSpec(**spec))
+    assert first.fingerprint() == SyntheticDataset(DatasetSpec(**spec)).fingerprint()
+    assert first.fingerprint() != SyntheticDataset(DatasetSpec(seed=7, **spec)).fingerprint()
+
+    # Blocs indépendants : un bloc peut être régénéré seul
+    blocks = list(first.blocks())
+    assert [len(block) for block in blocks] == [BLOCK_SIZE, 500]
+    assert first.block(1) == blocks[1]
+
+    tasks = [task for block in blocks for task in block]
+    assert [task["position"] for task in tasks] == list(range(1, len(tasks) + 1))
+    assert [task["rank"] for task in tasks] == sorted(task["rank"] for task in tasks)
+
+def test_dataset_distribution_knobs():
+    """Répartition des catégories (Zipf), mélange des statuts, échéances et descriptions"""
+    spec = DatasetSpec(
+        rows=5000, categories=4, category_skew=2.0,
+        status_mix={TaskStatus.TERMINEE: 1}, priority_mix=parse_mix("haute=1", TaskPriority),
+        due_days=(1, 3), description_length=(0, 0)
+    )
+    tasks = SyntheticDataset(spec).block(0)
+    per_category = Counter(task["category_id"] for task in tasks)
+    assert per_category[1] > per_category[2] > per_category[3] > per_category[4]
+    assert {task["status"] for task in tasks} == {TaskStatus.TERMINEE}
+    assert {task["priority"] for task in tasks} == {TaskPriority.HAUTE}
+    assert all(task["completed_at"] is not None and not task["urgent_flag"] for task in tasks)
+    assert all(1 <= (task["due_date"] - spec.reference).days <= 3 for task in tasks)
+    assert all(task["description"] is None for task in tasks)
+
+    assert parse_range("-5:10") == (-5, 10)
+    with pytest.raises(ValueError):
+        parse_range("10:-5")
+    with pytest.raises(ValueError):
+        parse_mix("INCONNU=1", TaskStatus)
+    with pytest.raises(ValueError):
+        DatasetSpec(rows=10, description_length=(0, 5000))
+
+def test_load_dataset_keeps_counters_consistent(db_session):
+    """Chargement par blocs : task_stats et tasks_count cohérents, tables vides exigées"""
+    dataset = SyntheticDataset(DatasetSpec(rows=1200, categories=3))
+    loaded = []
+    assert load_dataset(db_session, dataset, on_block=loaded.append) == 1200
+    assert loaded == [1200]
+    assert db_session.query(Task).count() == 1200
+    assert task_service.verify_statistics(db_session) == []
+    assert category_service.verify_task_counts(db_session) == []
+
+    with pytest.raises(ValueError):
+        load_dataset(db_session, dataset)
@@ -1,9 +1,37 @@
 """
 Tests pour les endpoints des tâches
 """
+import csv
+import gzip
+import io
+import json
+
 import pytest
 from fastapi import status
-from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from datetime import datetime, timedelta, timezone
+
+import app.models.task as task_module
+import app.services.task_service as service_module
+from app.config.settings import settings
+from app.core.cache import response_cache
+from app.core.leader_election import FileLeaderLock
+from app.core.ranking import MAX_KEY_LENGTH
+from app.models.category import Category
+from app.models.task import FULL_TEXT_DDL, Task, TaskPriority, TaskStatus
+from app.models.task_stats import TaskStat
+from app.repositories.category_registry import category_registry
+from app.repositories.search import POSTGRES_TS_CONFIG, _postgres_query, tokenize
+from app.repositories.task_repository import task_repository
+from app.repositories.task_stats_repository import task_stats_repository
+from app.schemas.task import TaskResponse
+from app.services.category_service import category_service
+from app.services.task_export import task_exporter
+from app.services.task_import import task_importer
+from app.services.task_service import async_task_service, task_service
+from app.services.urgency_scheduler import UrgencyScheduler
+from tests.conftest import SQLALCHEMY_DATABASE_URL
 
 def test_get_tasks_empty(client):
     """Test GET /tasks avec base vide"""
@@ -128,4 +156,884 @@ def test_get_statistics(client, sample_task):
     assert "total" in stats
     assert "by_status" in stats
     assert "by_priority" in stats
-    assert stats["total"] == 1
\ No newline at end of file
+    assert stats["total"] == 1
+
+def _create_tasks(db_session, category, count):
+    """Créer plusieurs tâches directement en base"""
+    tasks = []
+    for i in range(count):
+        task = Task(
+            title=f"Tâche numéro {i}",
+            priority=TaskPriority.MOYENNE,
+            # Échéances en double pour vérifier le départage par ID
+            due_date=datetime.now() + timedelta(days=3 + i // 2),
+            category_id=category.id,
+            position=i
+        )
+        db_session.add(task)
+        tasks.append(task)
+    db_session.commit()
+    return tasks
+
+def test_get_tasks_cursor_pagination(client, db_session, sample_category):
+    """Test GET /tasks en mode curseur : parcours avant puis arrière"""
+    _create_tasks(db_session, sample_category, 5)
+    expected = [t["id"] for t in client.get("/api/v1/tasks/?size=5").json()["items"]]
+    
+    response = client.get("/api/v1/tasks/?mode=cursor&size=2")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] is None and data["pages"] is None
+    assert data["prev_cursor"] is None
+    
+    # Total sur demande seulement (COUNT de toutes les tâches filtrées)
+    counted = client.get("/api/v1/tasks/?mode=cursor&size=2&with_total=true").json()
+    assert counted["total"] == 5 and counted["pages"] == 3
+    
+    seen = [t["id"] for t in data["items"]]
+    pages = [data]
+    while data["next_cursor"]:
+        data = client.get(f"/api/v1/tasks/?size=2&cursor={data['next_cursor']}").json()
+        seen.extend(t["id"] for t in data["items"])
+        pages.append(data)
+    
+    assert seen == expected
+    assert pages[-1]["has_next"] is False
+    
+    # Retour en arrière depuis la dernière page
+    previous = client.get(f"/api/v1/tasks/?size=2&cursor={pages[-1]['prev_cursor']}").json()
+    assert [t["id"] for t in previous["items"]] == [t["id"] for t in pages[-2]["items"]]
+
+def test_get_tasks_cursor_on_nullable_rank(client, db_session, sample_category):
+    """Test GET /tasks en mode curseur trié par rang : les tâches sans rang ne sont ni perdues ni dupliquées"""
+    due_date = datetime.now() + timedelta(days=7)
+    ranks = ["m", None, "c", None, "x", "c", None]
+    db_session.add_all([
+        Task(title=f"Carte {i}", due_date=due_date, position=i, rank=rank, category_id=sample_category.id)
+        for i, rank in enumerate(ranks)
+    ])
+    db_session.commit()
+    
+    for order in ("asc", "desc"):
+        query = f"sort_by=rank&sort_order={order}&size=2"
+        items = client.get(f"/api/v1/tasks/?sort_by=rank&sort_order={order}&size=10").json()["items"]
+        expected = [t["id"] for t in items]
+        nulls = [t["id"] for t in items if t["rank"] is None]
+        # NULL en fin de liste en ordre croissant, en tête en ordre décroissant
+        assert (expected[-3:] if order == "asc" else expected[:3]) == nulls
+        
+        pages = [client.get(f"/api/v1/tasks/?mode=cursor&{query}").json()]
+        while pages[-1]["next_cursor"]:
+            pages.append(client.get(f"/api/v1/tasks/?{query}&cursor={pages[-1]['next_cursor']}").json())
+        assert [t["id"] for page in pages for t in page["items"]] == expected
+        
+        # Retour en arrière page par page
+        backward = [t["id"] for t in pages[-1]["items"]]
+        page = pages[-1]
+        while page["prev_cursor"]:
+            page = client.get(f"/api/v1/tasks/?{query}&cursor={page['prev_cursor']}").json()
+            backward = [t["id"] for t in page["items"]] + backward
+        assert backward == expected
+
+def test_get_tasks_cursor_on_same_second_created_at(client, db_session, sample_category):
+    """Test GET /tasks en mode curseur trié par created_at : tâches créées dans la même seconde"""
+    due_date = (datetime.now() + timedelta(days=7)).isoformat()
+    created = client.post("/api/v1/tasks/bulk", json={"tasks": [
+        {"title": f"Carte {i}", "due_date": due_date, "category_id": sample_category.id}
+        for i in range(5)
+    ]}).json()
+    task_ids = [result["task"]["id"] for result in created["results"]]
+    
+    def walk(order):
+        query = f"sort_by=created_at&sort_order={order}&size=2"
+        pages = [client.get(f"/api/v1/tasks/?mode=cursor&{query}").json()]
+        while pages[-1]["next_cursor"]:
+            pages.append(client.get(f"/api/v1/tasks/?{query}&cursor={pages[-1]['next_cursor']}").json())
+        return [item["id"] for page in pages for item in page["items"]]
+    
+    # Horodatages de création au même format que les valeurs des curseurs
+    assert walk("asc") == task_ids and walk("desc") == task_ids[::-1]
+    
+    # Même horodatage pour toutes : seul l'id départage
+    db_session.query(Task).update({Task.created_at: datetime(2030, 6, 1, 12, 0, 0)})
+    db_session.commit()
+    assert walk("asc") == task_ids and walk("desc") == task_ids[::-1]
+
+def test_get_tasks_invalid_cursor(client):
+    """Test GET /tasks avec un curseur invalide"""
+    response = client.get("/api/v1/tasks/?cursor=invalide")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_search_tasks_ranked_by_relevance(client, db_session, sample_category):
+    """Test GET /tasks/search/ : recherche par préfixe, sans accents, triée par pertinence"""
+    in_description = Task(
+        title="Appeler le garage",
+        description="Demander un devis pour la révision",
+        due_date=datetime.now() + timedelta(days=4),
+        category_id=sample_category.id
+    )
+    in_title = Task(
+        title="Révision annuelle",
+        description="Prendre rendez-vous",
+        due_date=datetime.now() + timedelta(days=4),
+        category_id=sample_category.id
+    )
+    db_session.add_all([in_description, in_title])
+    db_session.commit()
+    
+    response = client.get("/api/v1/tasks/search/?q=revis")
+    assert response.status_code == status.HTTP_200_OK
+    assert [t["id"] for t in response.json()] == [in_title.id, in_description.id]
+    
+    # L'index suit les mises à jour
+    client.put(f"/api/v1/tasks/{in_title.id}", json={"title": "Contrôle annuel"})
+    response = client.get("/api/v1/tasks/search/?q=revis")
+    assert [t["id"] for t in response.json()] == [in_description.id]
+
+def test_get_tasks_search_filter(client, sample_task):
+    """Test GET /tasks avec le filtre search"""
+    response = client.get("/api/v1/tasks/?search=tache")
+    assert response.json()["total"] == 1
+    
+    response = client.get("/api/v1/tasks/?search=introuvable")
+    assert response.json()["total"] == 0
+
+def test_postgresql_search_ignores_accents():
+    """PostgreSQL : index et requête utilisent la même configuration sans accents (comme FTS5)"""
+    ddl = " ".join(FULL_TEXT_DDL["postgresql"])
+    assert "WITH unaccent, simple" in ddl
+    assert ddl.count(f"to_tsvector('{POSTGRES_TS_CONFIG}'") == 2
+    
+    ts_query = _postgres_query(tokenize("Tâche")).compile(dialect=postgresql.dialect())
+    assert list(ts_query.params.values()) == ["simple_unaccent", "tâche:*"]
+
+@pytest.mark.asyncio
+async def test_async_service_with_async_session(sample_task):
+    """Test de la pile asynchrone : service exécuté sur une AsyncSession"""
+    async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL.replace("sqlite", "sqlite+aiosqlite", 1))
+    try:
+        async with AsyncSession(async_engine) as db:
+            task = await async_task_service.get_task_by_id(db, sample_task.id)
+            assert task.title == sample_task.title
+            
+            stats = await async_task_service.get_task_statistics(db)
+            assert stats.total == 1
+    finally:
+        await async_engine.dispose()
+
+def test_get_statistics_from_rollup(client, db_session, sample_category, sql_statements):
+    """Test GET /tasks/statistics/ : valeurs exactes, lues dans la table task_stats"""
+    now = datetime.now()
+    db_session.add_all([
+        Task(title="Terminée aujourd'hui", priority=TaskPriority.HAUTE, status=TaskStatus.TERMINEE,
+             due_date=now + timedelta(days=5), completed_at=now, category_id=sample_category.id),
+        Task(title="En retard", priority=TaskPriority.BASSE, due_date=now - timedelta(days=1),
+             category_id=sample_category.id),
+        Task(title="Reportée", status=TaskStatus.REPORTEE, due_date=now + timedelta(days=10),
+             category_id=sample_category.id),
+        Task(title="Terminée en retard", status=TaskStatus.TERMINEE, due_date=now - timedelta(days=3),
+             completed_at=now - timedelta(days=2), category_id=sample_category.id),
+    ])
+    db_session.commit()
+    
+    # Avant construction (démarrage) : recalcul en lecture seule, rien n'est écrit
+    sql_statements.clear()
+    response = client.get("/api/v1/tasks/statistics/")
+    assert response.status_code == status.HTTP_200_OK
+    assert not any(s.startswith(("INSERT", "DELETE", "UPDATE")) for s in sql_statements)
+    assert db_session.query(TaskStat).count() == 0
+    
+    # Construction (tâche de démarrage), une seule fois
+    assert task_stats_repository.ensure_built(db_session) is True
+    assert task_stats_repository.ensure_built(db_session) is False
+    response_cache.clear()
+    response = client.get("/api/v1/tasks/statistics/")
+    assert response.status_code == status.HTTP_200_OK
+    expected = {
+        "total": 4,
+        "by_status": {"En cours": 1, "Terminée": 2, "Reportée": 1},
+        "by_priority": {"Basse": 1, "Moyenne": 2, "Haute": 1},
+        "urgent_count": 1,
+        "overdue_count": 1,
+        "completed_today": 1,
+        "completion_rate": 50.0,
+    }
+    assert response.json() == expected
+    
+    # Lectures suivantes : versions (ETag), compteurs et tâches en retard, quel que soit le volume
+    response_cache.clear()
+    sql_statements.clear()
+    assert client.get("/api/v1/tasks/statistics/").json() == expected
+    assert len(sql_statements) == 3
+    
+    # Puis servies par le cache jusqu'à la prochaine écriture (seul l'ETag est calculé)
+    sql_statements.clear()
+    assert client.get("/api/v1/tasks/statistics/").json() == expected
+    assert len(sql_statements) == 1
+
+def test_statistics_rollup_follows_writes(client, db_session, sample_category):
+    """Test des compteurs task_stats après création, modification, complétion et suppression"""
+    client.get("/api/v1/tasks/statistics/")
+    
+    due_date = (datetime.now() + timedelta(days=1)).isoformat()
+    created = [
+        client.post("/api/v1/tasks/", json={
+            "title": f"Tâche {i}", "due_date": due_date, "category_id": sample_category.id
+        }).json()
+        for i in range(3)
+    ]
+    client.put(f"/api/v1/tasks/{created[0]['id']}", json={"priority": "Haute", "status": "Reportée"})
+    client.patch(f"/api/v1/tasks/{created[1]['id']}/complete")
+    client.delete(f"/api/v1/tasks/{created[2]['id']}")
+    
+    stats = client.get("/api/v1/tasks/statistics/").json()
+    assert stats["total"] == 2
+    assert stats["by_status"] == {"Terminée": 1, "Reportée": 1}
+    assert stats["by_priority"] == {"Moyenne": 1, "Haute": 1}
+    assert stats["urgent_count"] == 1
+    assert stats["completed_today"] == 1
+    assert task_service.verify_statistics(db_session) == []
+
+def test_statistics_survive_racing_writes(client, db_session, sample_task, monkeypatch):
+    """Test : double suppression et mise à jour d'une tâche supprimée entre-temps, compteurs exacts"""
+    task_id = sample_task.id
+    task_stats_repository.ensure_built(db_session)
+    stale = task_repository.get_row(db_session, task_id)
+    assert client.delete(f"/api/v1/tasks/{task_id}").status_code == status.HTTP_200_OK
+    assert client.delete(f"/api/v1/tasks/{task_id}").status_code == status.HTTP_404_NOT_FOUND
+    
+    # État "avant" lu juste avant la suppression : l'UPDATE ne trouve plus la ligne
+    monkeypatch.setattr(task_repository, "get_row", lambda db, task_id, for_update=False: stale)
+    response = client.put(f"/api/v1/tasks/{task_id}", json={"priority": "Haute"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    assert client.get("/api/v1/tasks/statistics/").json()["total"] == 0
+    assert task_service.verify_statistics(db_session) == []
+
+def test_tasks_conditional_get(client, sample_task):
+    """Test ETag / If-None-Match sur la liste, le détail et les statistiques"""
+    for url in ("/api/v1/tasks/?size=5", f"/api/v1/tasks/{sample_task.id}", "/api/v1/tasks/statistics/"):
+        response = client.get(url)
+        etag = response.headers["ETag"]
+        assert etag.startswith('"')
+        
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified.headers["ETag"] == etag
+        assert not_modified.content == b""
+    
+    # L'ordre des paramètres ne change pas l'ETag, leur valeur si
+    etag = client.get("/api/v1/tasks/?size=5&page=1").headers["ETag"]
+    assert client.get("/api/v1/tasks/?page=1&size=5").headers["ETag"] == etag
+    assert client.get("/api/v1/tasks/?page=2&size=5").headers["ETag"] != etag
+    
+    # Toute écriture change l'ETag
+    client.patch(f"/api/v1/tasks/{sample_task.id}/complete")
+    response = client.get("/api/v1/tasks/?size=5&page=1", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+def test_tasks_etag_follows_overdue_transition(client, db_session, sample_task, monkeypatch):
+    """Test : une tâche qui passe en retard change l'ETag sans écriture (tranche de temps suivante)"""
+    clock = {"now": datetime.now(timezone.utc)}
+    
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock["now"]
+    
+    monkeypatch.setattr(service_module, "datetime", FrozenDatetime)
+    etag = client.get(f"/api/v1/tasks/{sample_task.id}").headers["ETag"]
+    
+    # Simule le passage du temps : l'échéance est désormais dépassée
+    db_session.query(Task).filter(Task.id == sample_task.id).update(
+        {Task.due_date: datetime.now() - timedelta(minutes=1)}
+    )
+    db_session.commit()
+    
+    # Même tranche de temps : l'ETag ne dépend que des versions (aucune requête de comptage)
+    response = client.get(f"/api/v1/tasks/{sample_task.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    
+    clock["now"] += timedelta(seconds=settings.ETAG_TIME_BUCKET_SECONDS)
+    response = client.get(f"/api/v1/tasks/{sample_task.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["is_overdue"] is True
+
+def test_create_tasks_bulk(client, db_session, sample_category, sql_statements):
+    """Test POST /tasks/bulk : échecs partiels et nombre de requêtes constant"""
+    category_registry.warm(db_session)
+    due_date = (datetime.now() + timedelta(days=7)).isoformat()
+    valid = [
+        {"title": f"Import {i}", "due_date": due_date, "category_id": sample_category.id}
+        for i in range(20)
+    ]
+    payload = {"tasks": [
+        *valid[:10],
+        {"title": "Catégorie inconnue", "due_date": due_date, "category_id": 9999},
+        {"title": "x", "due_date": due_date, "category_id": sample_category.id},
+        *valid[10:],
+    ]}
+    
+    sql_statements.clear()
+    response = client.post("/api/v1/tasks/bulk", json=payload)
+    assert response.status_code == status.HTTP_200_OK
+    statements = len(sql_statements)
+    # Catégorie inconnue confirmée en base, verrou des rangs, position et rang,
+    # INSERT ... RETURNING, compteurs
+    assert [s.split()[0] for s in sql_statements] == ["SELECT", "INSERT", "SELECT", "INSERT", "INSERT", "UPDATE"]
+    
+    data = response.json()
+    assert data["created"] == 20
+    assert data["failed"] == 2
+    assert data["results"][10]["code"] == "INVALID_CATEGORY"
+    assert data["results"][11]["code"] == "VALIDATION_FAILED"
+    
+    created = [result["task"] for result in data["results"] if result["success"]]
+    assert [task["title"] for task in created] == [item["title"] for item in valid]
+    assert all(task["category"]["id"] == sample_category.id for task in created)
+    positions = [task["position"] for task in created]
+    assert positions == list(range(positions[0], positions[0] + 20))
+    assert task_service.verify_statistics(db_session) == []
+    
+    # Un lot deux fois plus grand coûte le même nombre de requêtes
+    sql_statements.clear()
+    client.post("/api/v1/tasks/bulk", json={"tasks": payload["tasks"] + valid})
+    assert len(sql_statements) == statements
+
+def test_reorder_tasks_set_based(client, db_session, sample_category, sql_statements):
+    """Test PUT /tasks/reorder/ : positions appliquées, requêtes en nombre constant, tout ou rien"""
+    due_date = (datetime.now() + timedelta(days=7)).isoformat()
+    created = client.post("/api/v1/tasks/bulk", json={"tasks": [
+        {"title": f"Carte {i}", "due_date": due_date, "category_id": sample_category.id}
+        for i in range(30)
+    ]}).json()
+    task_ids = [result["task"]["id"] for result in created["results"]]
+    
+    statements = []
+    for size in (5, 30):
+        ids = task_ids[:size]
+        positions = list(reversed(range(size)))
+        sql_statements.clear()
+        response = client.put("/api/v1/tasks/reorder/", json={"task_ids": ids, "positions": positions})
+        assert response.status_code == status.HTTP_200_OK
+        statements.append(len(sql_statements))
+        
+        db_session.expire_all()
+        stored = dict(db_session.query(Task.id, Task.position).filter(Task.id.in_(ids)).all())
+        assert stored == dict(zip(ids, positions))
+    assert statements[0] == statements[1]
+    
+    # Un ID inconnu : aucune position n'est modifiée
+    response = client.put("/api/v1/tasks/reorder/", json={
+        "task_ids": [task_ids[0], 999999], "positions": [100, 101]
+    })
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    db_session.expire_all()
+    assert db_session.get(Task, task_ids[0]).position == 29
+
+def test_move_task_writes_one_rank(client, db_session, sample_category, sql_statements):
+    """Test PATCH /tasks/{id}/move : seul le rang de la tâche déplacée change"""
+    due_date = (datetime.now() + timedelta(days=7)).isoformat()
+    created = client.post("/api/v1/tasks/bulk", json={"tasks": [
+        {"title": f"Carte {i}", "due_date": due_date, "category_id": sample_category.id}
+        for i in range(4)
+    ]}).json()
+    a, b, c, d = [result["task"]["id"] for result in created["results"]]
+    
+    def ordered_ids():
+        db_session.expire_all()
+        return [row.id for row in db_session.query(Task.id).order_by(Task.rank, Task.id)]
+    
+    ranks_before = dict(db_session.query(Task.id, Task.rank).all())
+    sql_statements.clear()
+    response = client.patch(f"/api/v1/tasks/{d}/move", json={"after_id": a, "before_id": b})
+    assert response.status_code == status.HTTP_200_OK
+    updates = [s for s in sql_statements if s.startswith("UPDATE tasks")]
+    assert len(updates) == 1
+    assert ordered_ids()[-4:] == [a, d, b, c]
+    ranks_after = dict(db_session.query(Task.id, Task.rank).all())
+    assert {i for i in ranks_after if ranks_after[i] != ranks_before[i]} == {d}
+    
+    # Un seul voisin : l'autre est déduit ; en tête de liste
+    client.patch(f"/api/v1/tasks/{a}/move", json={"after_id": c})
+    assert ordered_ids()[-4:] == [d, b, c, a]
+    
+    response = client.patch(f"/api/v1/tasks/{a}/move", json={"after_id": c, "before_id": d})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    # Tâche inconnue (ou supprimée pendant le déplacement) : 404, rien n'est écrit
+    response = client.patch("/api/v1/tasks/999999/move", json={"after_id": d, "before_id": b})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert ordered_ids()[-4:] == [d, b, c, a]
+
+def test_move_task_rebalances_long_ranks(client, db_session, sample_category, monkeypatch):
+    """Test : des insertions répétées au même endroit déclenchent le rééquilibrage"""
+    monkeypatch.setattr(settings, "RANK_REBALANCE_LENGTH", 8)
+    due_date = (datetime.now() + timedelta(days=7)).isoformat()
+    created = client.post("/api/v1/tasks/bulk", json={"tasks": [
+        {"title": f"Carte {i}", "due_date": due_date, "category_id": sample_category.id}
+        for i in range(30)
+    ]}).json()
+    ids = [result["task"]["id"] for result in created["results"]]
+    
+    # Chaque tâche est insérée juste après la première : l'écart se resserre
+    longest = 0
+    for task_id in ids[2:]:
+        task = client.patch(f"/api/v1/tasks/{task_id}/move", json={"after_id": ids[0], "before_id": ids[1]}).json()
+        longest = max(longest, len(task["rank"]))
+        ids.remove(task_id)
+        ids.insert(1, task_id)
+    
+    db_session.expire_all()
+    ranks = [row.rank for row in db_session.query(Task.rank).order_by(Task.rank)]
+    assert [row.id for row in db_session.query(Task.id).order_by(Task.rank)] == ids
+    assert longest > 8
+    assert max(len(rank) for rank in ranks) <= 8
+
+def test_move_task_next_to_unranked_task(client, db_session, sample_category):
+    """Test : voisine sans rang, 409 sans rééquilibrage dans la requête ; rééquilibrage différé puis succès"""
+    due_date = datetime.now() + timedelta(days=7)
+    tasks = [
+        Task(title=f"Carte {i}", due_date=due_date, position=i, rank=None, category_id=sample_category.id)
+        for i in range(3)
+    ]
+    db_session.add_all(tasks)
+    db_session.commit()
+    a, b, c = [task.id for task in tasks]
+    
+    response = client.patch(f"/api/v1/tasks/{c}/move", json={"after_id": a, "before_id": b})
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["code"] == "RANK_REBALANCE_PENDING"
+    
+    db_session.expire_all()
+    assert db_session.query(Task).filter(Task.rank.is_(None)).count() == 0
+    response = client.patch(f"/api/v1/tasks/{c}/move", json={"after_id": a, "before_id": b})
+    assert response.status_code == status.HTTP_200_OK
+    db_session.expire_all()
+    assert [row.id for row in db_session.query(Task.id).order_by(Task.rank)] == [a, c, b]
+
+def test_rebalance_ranks_by_chunks(db_session, sample_category):
+    """Test : rééquilibrage par lots (table temporaire numérotée), ordre conservé"""
+    due_date = datetime.now() + timedelta(days=7)
+    ranks = ["z", "a", None, "m", "zzz", None, "b"]
+    db_session.add_all([
+        Task(title=f"Carte {i}", due_date=due_date, position=i, rank=rank, category_id=sample_category.id)
+        for i, rank in enumerate(ranks)
+    ])
+    db_session.commit()
+    expected = [
+        row.title for row in db_session.query(Task.title).order_by(
+            Task.rank.is_(None), Task.rank, Task.position
+        )
+    ]
+    
+    assert task_repository.rebalance_ranks(db_session, chunk_size=2) == len(ranks)
+    db_session.commit()
+    db_session.expire_all()
+    rows = db_session.query(Task.title, Task.rank).order_by(Task.rank).all()
+    assert [row.title for row in rows] == expected
+    assert all(row.rank is not None and len(row.rank) <= 6 for row in rows)
+
+def test_create_task_when_rank_space_is_exhausted(client, db_session, sample_category):
+    """Test : sans clé de rang disponible en fin de liste, la tâche est créée puis rangée en arrière-plan"""
+    due_date = datetime.now() + timedelta(days=7)
+    db_session.add(Task(
+        title="Dernière carte", due_date=due_date, position=1, rank="z" * MAX_KEY_LENGTH,
+        category_id=sample_category.id
+    ))
+    db_session.commit()
+    
+    response = client.post("/api/v1/tasks/", json={
+        "title": "Nouvelle carte", "due_date": due_date.isoformat(), "category_id": sample_category.id
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["rank"] is None
+    
+    # Rééquilibrage exécuté après la réponse : rangs courts, ordre conservé
+    db_session.expire_all()
+    rows = db_session.query(Task.title, Task.rank).order_by(Task.rank).all()
+    assert [row.title for row in rows] == ["Dernière carte", "Nouvelle carte"]
+    assert all(len(row.rank) <= 6 for row in rows)
+
+def test_urgency_is_computed_without_writes(client, db_session, sample_category, sql_statements):
+    """Test : l'urgence est évaluée en SQL, les lectures n'écrivent rien"""
+    now = datetime.now()
+    # Flags persistés volontairement faux : seule l'échéance compte
+    db_session.add_all([
+        Task(title="Échéance proche", due_date=now + timedelta(days=1), urgent_flag=False,
+             category_id=sample_category.id),
+        Task(title="Échéance lointaine", due_date=now + timedelta(days=10), urgent_flag=True,
+             category_id=sample_category.id),
+    ])
+    db_session.commit()
+    
+    sql_statements.clear()
+    urgent = client.get("/api/v1/tasks/?is_urgent=true").json()["items"]
+    assert [task["title"] for task in urgent] == ["Échéance proche"]
+    assert urgent[0]["is_urgent"] is True
+    
+    not_urgent = client.get("/api/v1/tasks/?is_urgent=false").json()["items"]
+    assert [task["title"] for task in not_urgent] == ["Échéance lointaine"]
+    assert not_urgent[0]["is_urgent"] is False
+    
+    client.get(f"/api/v1/tasks/{urgent[0]['id']}")
+    assert [s for s in sql_statements if s.startswith(("UPDATE tasks", "INSERT INTO tasks"))] == []
+    assert client.get("/api/v1/tasks/statistics/").json()["urgent_count"] == 1
+
+def test_get_tasks_overdue_filter_boundary(client, db_session, sample_category, monkeypatch):
+    """Test du filtre is_overdue : strictement avant "maintenant", tâches terminées exclues"""
+    frozen_now = datetime(2030, 6, 1, 12, 0, 0)
+    
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen_now.replace(tzinfo=tz) if tz else frozen_now
+    
+    monkeypatch.setattr(task_module, "datetime", FrozenDatetime)
+    
+    db_session.add_all([
+        Task(title="Échue juste avant", due_date=frozen_now - timedelta(microseconds=1),
+             category_id=sample_category.id),
+        Task(title="Échue maintenant", due_date=frozen_now, category_id=sample_category.id),
+        Task(title="Échue juste après", due_date=frozen_now + timedelta(seconds=1),
+             category_id=sample_category.id),
+        Task(title="Terminée en retard", due_date=frozen_now - timedelta(days=1),
+             status=TaskStatus.TERMINEE, category_id=sample_category.id),
+    ])
+    db_session.commit()
+    
+    def titles(query):
+        response = client.get(f"/api/v1/tasks/?{query}")
+        assert response.status_code == status.HTTP_200_OK
+        return [task["title"] for task in response.json()["items"]]
+    
+    assert titles("is_overdue=true") == ["Échue juste avant"]
+    assert titles("is_overdue=false&sort_by=due_date") == [
+        "Terminée en retard", "Échue maintenant", "Échue juste après"
+    ]
+    
+    # Composable avec les autres filtres, le tri et la pagination
+    assert titles("is_overdue=false&status=En cours&sort_order=desc&size=1") == ["Échue juste après"]
+    assert titles("is_overdue=false&status=En cours&sort_order=desc&size=1&page=2") == ["Échue maintenant"]
+    page = client.get("/api/v1/tasks/?is_overdue=false&mode=cursor&size=2&with_total=true").json()
+    assert page["total"] == 3 and page["next_cursor"]
+
+def test_urgency_scheduler_processes_only_new_window(db_session, sample_category, sql_statements, tmp_path):
+    """Test du planificateur : balayage complet au premier tick, puis seulement la tranche entrée dans la fenêtre"""
+    day = datetime(2030, 6, 1, 12, 0, tzinfo=timezone.utc)
+    db_session.add_all([
+        Task(title=f"Dans {offset} jours", due_date=day + timedelta(days=offset),
+             urgent_flag=False, category_id=sample_category.id)
+        for offset in (1, 3, 4, 10)
+    ])
+    db_session.commit()
+    
+    lock_path = str(tmp_path / "urgency.lock")
+    scheduler = UrgencyScheduler(60, FileLeaderLock(lock_path), session_factory=lambda: db_session)
+    
+    def urgent_titles():
+        db_session.expire_all()
+        return sorted(t.title for t in db_session.query(Task).filter(Task.urgent_flag.is_(True)))
+    
+    # Premier tick : rattrapage complet
+    assert scheduler.tick(db_session, now=day) == 1
+    assert urgent_titles() == ["Dans 1 jours"]
+    
+    # Même jour : rien à faire, aucune requête sur les tâches
+    sql_statements.clear()
+    assert scheduler.tick(db_session, now=day) == 0
+    assert not [s for s in sql_statements if "tasks" in s]
+    
+    # Deux jours plus tard : seule la tranche [J+3, J+5) est mise à jour
+    sql_statements.clear()
+    assert scheduler.tick(db_session, now=day + timedelta(days=2)) == 2
+    assert urgent_titles() == ["Dans 1 jours", "Dans 3 jours", "Dans 4 jours"]
+    updates = [s for s in sql_statements if s.startswith("UPDATE tasks")]
+    assert len(updates) == 1 and "due_date >=" in updates[0]
+    
+    # Un seul worker leader : un second verrou sur le même fichier est refusé
+    other = FileLeaderLock(lock_path)
+    assert scheduler.run_once() == 0
+    assert other.try_acquire() is False
+    assert scheduler.stats()["leader"] is True and scheduler.stats()["ticks"] == 1
+    scheduler.leader_lock.release()
+    assert other.try_acquire() is True
+    other.release()
+
+def test_list_rows_match_task_response(client, db_session, sample_category, sql_statements):
+    """Test : la lecture sans ORM produit exactement le format de TaskResponse"""
+    other = Category(name="Autre", color="#ff0000")
+    db_session.add(other)
+    db_session.flush()
+    now = datetime.now()
+    db_session.add_all([
+        Task(title="Proche", description="Texte", due_date=now + timedelta(days=1),
+             category_id=sample_category.id, rank="i"),
+        Task(title="En retard", due_date=now - timedelta(days=3), category_id=other.id),
+        Task(title="Terminée", due_date=now - timedelta(days=1), status=TaskStatus.TERMINEE,
+             completed_at=now, category_id=other.id),
+    ])
+    db_session.commit()
+    
+    expected = {
+        task.id: TaskResponse.from_orm(task).model_dump(mode="json")
+        for task in db_session.query(Task).all()
+    }
+    
+    sql_statements.clear()
+    response = client.get("/api/v1/tasks/?size=10")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"]
+    items = response.json()["items"]
+    assert {item["id"]: item for item in items} == expected
+    # Une seule requête de lecture des tâches, sans jointure : catégories servies par le registre
+    selects = [s for s in sql_statements if s.startswith("SELECT") and "LIMIT" in s]
+    assert len(selects) == 1 and "JOIN" not in selects[0]
+    
+    for path, title in [("/api/v1/tasks/overdue/list", "En retard"), ("/api/v1/tasks/search/?q=proche", "Proche")]:
+        (item,) = client.get(path).json()
+        assert item["title"] == title and item == expected[item["id"]]
+
+def test_get_tasks_sparse_fieldsets(client, db_session, sample_category, sql_statements):
+    """Test fields= / include= sur GET /tasks : colonnes lues, jointure et clés renvoyées"""
+    now = datetime.now()
+    db_session.add_all([
+        Task(title=f"Tâche {i}", description="x" * 500, due_date=now + timedelta(days=i + 1),
+             category_id=sample_category.id, position=i)
+        for i in range(3)
+    ])
+    db_session.commit()
+    full = client.get("/api/v1/tasks/")
+    
+    kanban_fields = ["id", "title", "priority", "position", "category_id"]
+    sql_statements.clear()
+    response = client.get(f"/api/v1/tasks/?fields={','.join(kanban_fields)}")
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert [list(item) for item in items] == [kanban_fields] * 3
+    assert items[0] == {key: full.json()["items"][0][key] for key in kanban_fields}
+    select = [s for s in sql_statements if s.startswith("SELECT") and "LIMIT" in s][-1]
+    assert "description" not in select and "JOIN categories" not in select
+    assert len(response.content) < len(full.content) / 4
+    assert response.headers["etag"] != full.headers["etag"]
+    
+    # Champs calculés (colonnes nécessaires lues sans être renvoyées) et catégorie incluse
+    response = client.get("/api/v1/tasks/?fields=title,days_until_due,is_urgent&include=category")
+    item = response.json()["items"][0]
+    assert list(item) == ["title", "days_until_due", "is_urgent", "category"]
+    assert item["days_until_due"] == 1 and item["is_urgent"] is True
+    assert item["category"]["name"] == "Test Category"
+    
+    # days_until_due seul ne dépend que de due_date
+    response = client.get("/api/v1/tasks/?fields=id,days_until_due")
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["days_until_due"] for item in response.json()["items"]] == [1, 2, 3]
+    
+    # Pagination par curseur : la colonne de tri est lue pour construire le curseur
+    page = client.get("/api/v1/tasks/?fields=title&mode=cursor&size=2").json()
+    assert [list(item) for item in page["items"]] == [["title"], ["title"]]
+    following = client.get(f"/api/v1/tasks/?fields=title&cursor={page['next_cursor']}&size=2").json()
+    assert [item["title"] for item in following["items"]] == ["Tâche 2"]
+    
+    response = client.get("/api/v1/tasks/?fields=title,category")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["code"] == "INVALID_FIELDS"
+
+def test_category_registry_validates_without_queries(client, db_session, sample_category, sql_statements):
+    """Test du registre des catégories : écritures de tâches sans lecture de categories"""
+    due_date = (datetime.now() + timedelta(days=3)).isoformat()
+    category_registry.warm(db_session)
+    
+    sql_statements.clear()
+    response = client.post("/api/v1/tasks/", json={
+        "title": "Sans requête", "due_date": due_date, "category_id": sample_category.id
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    task = response.json()
+    # Aucune lecture de categories avant l'écriture (seul le compteur est rechargé pour la réponse)
+    writes = next(i for i, s in enumerate(sql_statements) if s.startswith("INSERT"))
+    assert not any("FROM categories" in s for s in sql_statements[:writes])
+    assert task["category"]["tasks_count"] == 1
+    
+    response = client.post("/api/v1/tasks/", json={
+        "title": "Inconnue", "due_date": due_date, "category_id": 9999
+    })
+    assert response.json()["code"] == "INVALID_CATEGORY"
+    
+    # Une modification de catégorie invalide le registre
+    client.put(f"/api/v1/categories/{sample_category.id}", json={"name": "Renommée"})
+    assert client.get(f"/api/v1/tasks/{task['id']}").json()["category"]["name"] == "Renommée"
+    
+    # Une catégorie créée hors de l'API est confirmée en base avant d'être refusée
+    direct = Category(name="Directe", color="#00ff00")
+    db_session.add(direct)
+    db_session.commit()
+    response = client.post("/api/v1/tasks/", json={
+        "title": "Directe", "due_date": due_date, "category_id": direct.id
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["category"]["name"] == "Directe"
+
+def test_task_writes_use_returning(client, db_session, sample_category, sql_statements):
+    """Test des écritures : INSERT/UPDATE ... RETURNING, sans relecture après commit"""
+    category_registry.warm(db_session)
+    due_date = (datetime.now() + timedelta(days=1)).isoformat()
+    
+    def verbs():
+        return [statement.split()[0] for statement in sql_statements]
+    
+    sql_statements.clear()
+    response = client.post("/api/v1/tasks/", json={
+        "title": "Retour direct", "due_date": due_date, "category_id": sample_category.id
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    task = response.json()
+    # Position et rang, INSERT ... RETURNING, compteurs, tasks_count de la catégorie
+    # Verrou des rangs (upsert), position et rang, INSERT ... RETURNING, compteurs
+    assert verbs() == ["INSERT", "SELECT", "INSERT", "INSERT", "UPDATE"]
+    assert "RETURNING" in sql_statements[2]
+    assert task["is_urgent"] is True and task["created_at"]
+    assert task["category"]["tasks_count"] == 1
+    
+    sql_statements.clear()
+    response = client.put(f"/api/v1/tasks/{task['id']}", json={
+        "title": "Modifiée", "due_date": (datetime.now() + timedelta(days=10)).isoformat()
+    })
+    updated = response.json()
+    # État avant modification, UPDATE ... RETURNING, compteurs
+    assert verbs() == ["SELECT", "UPDATE", "INSERT"]
+    assert "RETURNING" in sql_statements[1]
+    assert updated["title"] == "Modifiée" and updated["is_urgent"] is False
+    assert updated["updated_at"] is not None
+    
+    sql_statements.clear()
+    completed = client.patch(f"/api/v1/tasks/{task['id']}/complete").json()
+    assert verbs() == ["SELECT", "UPDATE", "INSERT"]
+    assert completed["status"] == "Terminée" and completed["completed_at"]
+    
+    # Remise en cours : la date de fin est effacée
+    reopened = client.put(f"/api/v1/tasks/{task['id']}", json={"status": "En cours"}).json()
+    assert reopened["completed_at"] is None
+    assert client.get(f"/api/v1/tasks/{task['id']}").json() == reopened
+    assert task_service.verify_statistics(db_session) == []
+
+def test_export_tasks_streams_filtered_rows(client, db_session, sample_category):
+    """Test GET /tasks/export : NDJSON et CSV par lots, filtres et compression gzip"""
+    now = datetime.now()
+    db_session.add_all([
+        Task(title=f"Export {i}", description="Ligne, avec \"guillemets\"", due_date=now + timedelta(days=i),
+             priority=TaskPriority.HAUTE if i % 2 else TaskPriority.BASSE,
+             category_id=sample_category.id, position=i)
+        for i in range(5)
+    ])
+    db_session.commit()
+    full = {item["id"]: item for item in client.get("/api/v1/tasks/?size=10").json()["items"]}
+    
+    # Lots plus petits que le nombre de tâches : plusieurs morceaux envoyés
+    chunk_size, task_exporter.chunk_size = task_exporter.chunk_size, 2
+    try:
+        response = client.get("/api/v1/tasks/export", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "content-encoding" not in response.headers
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == sorted(full)
+        assert all(line == {k: v for k, v in full[line["id"]].items() if k != "category"} for line in lines)
+        
+        response = client.get("/api/v1/tasks/export?format=csv&priority=Haute")
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-encoding"] == "gzip"
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["title"] for row in rows] == ["Export 1", "Export 3"]
+        assert rows[0]["description"] == "Ligne, avec \"guillemets\""
+        assert rows[0]["priority"] == "Haute" and rows[0]["is_urgent"] in ("true", "false")
+    finally:
+        task_exporter.chunk_size = chunk_size
+    
+    # Corps compressé tel qu'envoyé sur le réseau
+    with client.stream("GET", "/api/v1/tasks/export", headers={"Accept-Encoding": "gzip"}) as raw:
+        body = b"".join(raw.iter_raw())
+    assert len(gzip.decompress(body).splitlines()) == 5
+    
+    response = client.get("/api/v1/tasks/export?format=xml")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["code"] == "INVALID_EXPORT_FORMAT"
+
+def test_import_tasks_defers_rank_rebalance(client, db_session, sample_category):
+    """Test POST /tasks/import : espace des rangs épuisé, rééquilibrage après la réponse"""
+    due_date = datetime.now() + timedelta(days=10)
+    db_session.add(Task(
+        title="Dernière carte", due_date=due_date, position=1, rank="z" * MAX_KEY_LENGTH,
+        category_id=sample_category.id
+    ))
+    db_session.commit()
+    
+    csv_body = "title,due_date,category_id\n" + "".join(
+        f"Import {i},{due_date.isoformat()},{sample_category.id}\n" for i in range(3)
+    )
+    report = client.post("/api/v1/tasks/import?format=csv", content=csv_body.encode("utf-8")).json()
+    assert report["imported"] == 3
+    
+    db_session.expire_all()
+    titles = [row.title for row in db_session.query(Task.title).order_by(Task.rank)]
+    assert titles == ["Dernière carte", "Import 0", "Import 1", "Import 2"]
+    assert db_session.query(Task).filter(Task.rank.is_(None)).count() == 0
+
+def test_import_tasks_streams_batches(client, db_session, sample_category):
+    """Test POST /tasks/import : lots de taille fixe, catégories par nom, lignes rejetées"""
+    due = (datetime.now() + timedelta(days=10)).isoformat()
+    csv_body = (
+        "title,description,priority,status,due_date,category,category_id\n"
+        f"Import 1,\"Sur deux\nlignes, avec virgule\",Haute,,{due},Maison,\n"
+        f"Import 2,,,Terminée,{due},maison,\n"
+        f"X,,,,{due},Maison,\n"
+        f"Import 4,,Basse,,{due},,{sample_category.id}\n"
+        f"Import 5,,,,{due},,9999\n"
+    ).encode("utf-8")
+    
+    chunk_size, task_importer.chunk_size = task_importer.chunk_size, 2
+    try:
+        response = client.post("/api/v1/tasks/import?format=csv", content=csv_body)
+    finally:
+        task_importer.chunk_size = chunk_size
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["received"] == 5 and report["imported"] == 3 and report["failed"] == 2
+    assert report["batches"] == 3 and report["categories_created"] == 1
+    assert [error["record"] for error in report["errors"]] == [3, 5]
+    
+    tasks = {task["title"]: task for task in client.get("/api/v1/tasks/?size=10").json()["items"]}
+    maison = db_session.query(Category).filter(Category.name == "Maison").one()
+    assert tasks["Import 1"]["description"] == "Sur deux\nlignes, avec virgule"
+    assert tasks["Import 1"]["category_id"] == tasks["Import 2"]["category_id"] == maison.id
+    assert tasks["Import 2"]["completed_at"] is not None
+    assert tasks["Import 4"]["category_id"] == sample_category.id
+    assert [tasks[f"Import {i}"]["position"] for i in (1, 2, 4)] == [1, 2, 3]
+    assert tasks["Import 1"]["rank"] < tasks["Import 2"]["rank"] < tasks["Import 4"]["rank"]
+    
+    ndjson_body = "\n".join([
+        json.dumps({"title": "Import NDJSON", "due_date": due, "category": "Maison"}),
+        "{pas du json",
+    ]).encode("utf-8")
+    report = client.post("/api/v1/tasks/import?format=ndjson", content=ndjson_body).json()
+    assert report["imported"] == 1 and report["failed"] == 1 and report["categories_created"] == 0
+    assert client.get(f"/api/v1/categories/{maison.id}").json()["tasks_count"] == 3
+    
+    # Ligne que le module csv refuse (champ au-delà de field_size_limit) : rejetée, pas d'erreur 500
+    oversized = "x" * (csv.field_size_limit() + 1)
+    csv_body = (
+        "title,description,due_date,category\n"
+        f"Import trop long,{oversized},{due},Maison\n"
+        f"Import 6,,{due},Maison\n"
+    ).encode("utf-8")
+    report = client.post("/api/v1/tasks/import?format=csv", content=csv_body).json()
+    assert report["imported"] == 1 and report["failed"] == 1
+    assert report["errors"][0]["error"].startswith("Ligne CSV illisible")
+    
+    assert task_service.verify_statistics(db_session) == []
+    assert category_service.verify_task_counts(db_session) == []
+    
+    response = client.post("/api/v1/tasks/import?format=xml", content=b"")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["code"] == "INVALID_IMPORT_FORMAT"